@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark das versões iterativa e recursiva da ArvoreAVL.
+Mede a vazão (operações por segundo) de inserção, busca e remoção.
+Execute: python benchmark_avl_iterativa.py --n 10000 100000 1000000
+"""
+
+import sys
+import os
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.utils.timer import Timer
+
+
+def medir(iterativa: bool, categorias, nomes_busca, nomes_remocao) -> dict:
+    """Executa inserção, busca e remoção e devolve operações/segundo de cada fase."""
+    arvore = ArvoreAVL(iterativa=iterativa)
+    timer = Timer()
+    vazao = {}
+
+    with timer:
+        for cat in categorias:
+            arvore.inserir_publico(cat)
+    vazao["inserir"] = len(categorias) / timer.get_elapsed_time()
+
+    with timer:
+        for nome in nomes_busca:
+            arvore.buscar_publico(nome)
+    vazao["buscar"] = len(nomes_busca) / timer.get_elapsed_time()
+
+    with timer:
+        for nome in nomes_remocao:
+            arvore.remover_publico(nome)
+    vazao["remover"] = len(nomes_remocao) / timer.get_elapsed_time()
+
+    return vazao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ArvoreAVL iterativa x recursiva")
+    parser.add_argument("--n", type=int, nargs="+", default=[10_000, 100_000],
+                        help="quantidades de categorias (ex.: 10000 100000 1000000)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semente)
+    print(f"{'n':>10} | {'operação':<8} | {'recursiva (ops/s)':>18} | {'iterativa (ops/s)':>18} | {'ganho':>6}")
+    print("-" * 72)
+
+    for n in args.n:
+        nomes = [f"Categoria {i:08d}" for i in range(n)]
+        rnd.shuffle(nomes)
+        categorias = [Categoria(nome) for nome in nomes]
+        nomes_busca = rnd.sample(nomes, min(n, 100_000))
+        nomes_remocao = rnd.sample(nomes, n // 2)
+
+        recursiva = medir(False, categorias, nomes_busca, nomes_remocao)
+        iterativa = medir(True, categorias, nomes_busca, nomes_remocao)
+
+        for operacao in ("inserir", "buscar", "remover"):
+            ganho = iterativa[operacao] / recursiva[operacao]
+            print(f"{n:>10,} | {operacao:<8} | {recursiva[operacao]:>18,.0f} | "
+                  f"{iterativa[operacao]:>18,.0f} | {ganho:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do catálogo fragmentado (um processo por fragmento) contra o
+catálogo único (ArvoreAVL + RecomendacaoService no processo atual).
+Mede carga com indexação, sugestões por prefixo e listagem de produtos.
+Execute: python benchmark_catalogo_fragmentado.py --categorias 20000 --fragmentos 1 2 4
+"""
+
+import sys
+import os
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.catalogo_fragmentado import CatalogoFragmentado
+from app.services.recomendacao_service import RecomendacaoService
+from app.utils.timer import Timer
+
+
+def gerar_categorias(n: int, produtos_por_categoria: int, semente: int):
+    rnd = random.Random(semente)
+    for i in range(n):
+        produtos = [{"nome": f"Produto {i:07d}-{j}", "peso_produto": rnd.random()}
+                    for j in range(produtos_por_categoria)]
+        yield Categoria(f"Categoria {i:07d}", produtos, peso_popularidade=rnd.uniform(1, 5))
+
+
+def medir(catalogo_factory, args, prefixos) -> dict:
+    """Executa as três fases e devolve o tempo (s) de cada uma."""
+    timer = Timer()
+    tempos = {}
+    catalogo, carregar = catalogo_factory()
+
+    with timer:
+        carregar(gerar_categorias(args.categorias, args.produtos, args.semente))
+    tempos["carga+indexação"] = timer.get_elapsed_time()
+
+    with timer:
+        for prefixo in prefixos:
+            catalogo.sugerir_por_prefixo(prefixo, 7, registrar_busca=False)
+    tempos["sugestões"] = timer.get_elapsed_time()
+
+    with timer:
+        catalogo.listar_todos_produtos()
+    tempos["listar produtos"] = timer.get_elapsed_time()
+
+    if isinstance(catalogo, CatalogoFragmentado):
+        catalogo.fechar()
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catálogo único x fragmentado em processos")
+    parser.add_argument("--categorias", type=int, default=20_000)
+    parser.add_argument("--produtos", type=int, default=5, help="produtos por categoria")
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--consultas", type=int, default=2_000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semente)
+    prefixos = [f"PRODUTO {rnd.randrange(args.categorias):07d}"[:rnd.randint(9, 13)] for _ in range(args.consultas)]
+
+    def unico():
+        servico = RecomendacaoService(ArvoreAVL())
+        return servico, lambda categorias: servico.arvore.carregar_em_lote(categorias)
+
+    resultados = {"único": medir(unico, args, prefixos)}
+    for n in args.fragmentos:
+        def fragmentado(n=n):
+            catalogo = CatalogoFragmentado(n_fragmentos=n)
+            return catalogo, catalogo.carregar_em_lote
+        resultados[f"{n} fragmentos"] = medir(fragmentado, args, prefixos)
+
+    print(f"{'modo':<14} | {'carga+indexação (s)':>20} | {'sugestões (s)':>14} | {'listar produtos (s)':>20}")
+    print("-" * 78)
+    for modo, tempos in resultados.items():
+        print(f"{modo:<14} | {tempos['carga+indexação']:>20.3f} | {tempos['sugestões']:>14.3f} | "
+              f"{tempos['listar produtos']:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
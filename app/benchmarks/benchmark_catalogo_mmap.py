@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do catálogo mapeado (mmap, somente leitura) contra a inicialização
+normal: carregar o catálogo salvo, montar os índices e responder sugestões.
+Execute: python benchmark_catalogo_mmap.py --categorias 200000 --produtos 5
+"""
+
+import sys
+import os
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.catalogo_mmap import CatalogoMapeado, compilar_catalogo_mmap
+from app.services.persistencia_catalogo import carregar_catalogo, salvar_catalogo
+from app.services.recomendacao_service import RecomendacaoService
+from app.utils.timer import Timer
+
+
+def gerar_categorias(n: int, produtos_por_categoria: int, semente: int):
+    rnd = random.Random(semente)
+    for i in range(n):
+        produtos = [{"nome": f"Produto {i:07d}-{j}", "peso_produto": rnd.random()}
+                    for j in range(produtos_por_categoria)]
+        yield Categoria(f"Categoria {i:07d}", produtos, peso_popularidade=rnd.uniform(1, 5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catálogo mapeado x carga + indexação")
+    parser.add_argument("--categorias", type=int, default=200_000)
+    parser.add_argument("--produtos", type=int, default=5, help="produtos por categoria")
+    parser.add_argument("--consultas", type=int, default=5_000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semente)
+    prefixos = [f"PRODUTO {rnd.randrange(args.categorias):07d}"[:rnd.randint(8, 14)] for _ in range(args.consultas)]
+    arvore = ArvoreAVL.from_iterable(gerar_categorias(args.categorias, args.produtos, args.semente), ordenado=True)
+    timer = Timer()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        salvo = os.path.join(pasta, "catalogo.srhp")
+        mapeado = os.path.join(pasta, "catalogo.srhpmap")
+        salvar_catalogo(arvore, salvo)
+        with timer:
+            compilar_catalogo_mmap(arvore, mapeado)
+        tempo_compilacao = timer.get_elapsed_time()
+        del arvore
+
+        with timer:
+            servico = RecomendacaoService(carregar_catalogo(salvo))
+        tempo_carga = timer.get_elapsed_time()
+        with timer:
+            for prefixo in prefixos:
+                servico.sugestoes_pontuadas(prefixo, 7)
+        tempo_servico = timer.get_elapsed_time()
+        del servico
+
+        with timer:
+            catalogo = CatalogoMapeado(mapeado)
+        tempo_abertura = timer.get_elapsed_time()
+        with timer:
+            for prefixo in prefixos:
+                catalogo.sugestoes_pontuadas(prefixo, 7)
+        tempo_mapeado = timer.get_elapsed_time()
+        tamanho = os.path.getsize(mapeado)
+        catalogo.fechar()
+
+    print(f"{'modo':<22} | {'inicialização (s)':>18} | {'sugestões/s':>12}")
+    print("-" * 58)
+    print(f"{'árvore + índices':<22} | {tempo_carga:>18.3f} | {args.consultas / tempo_servico:>12,.0f}")
+    print(f"{'catálogo mapeado':<22} | {tempo_abertura:>18.6f} | {args.consultas / tempo_mapeado:>12,.0f}")
+    print(f"\nCompilação: {tempo_compilacao:.2f}s | arquivo mapeado: {tamanho / 2**20:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de memória por categoria dos nós da ArvoreAVL.
+Compara o nó atual (com __slots__) com o layout antigo (atributos em __dict__).
+Execute: python benchmark_memoria_avl.py --n 1000000
+"""
+
+import sys
+import os
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL, No
+from app.core.categoria import Categoria
+
+
+class NoComDict:
+    """Layout anterior do nó: cada instância carrega seu próprio __dict__."""
+
+    def __init__(self, categoria):
+        self.categoria = categoria
+        self.esquerda = None
+        self.direita = None
+        self.altura = 1
+        self.tamanho = 1
+
+
+def medir_nos(classe_no, n: int, categoria: Categoria) -> float:
+    """Bytes por nó alocando n nós (a categoria é compartilhada e não entra na conta)."""
+    tracemalloc.start()
+    nos = [classe_no(categoria) for _ in range(n)]
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memoria -= sys.getsizeof(nos)
+    del nos
+    return memoria / n
+
+
+def medir_arvore(n: int) -> float:
+    """Bytes por categoria gastos pela estrutura da árvore (categorias já criadas antes)."""
+    categorias = [Categoria(f"Categoria {i:07d}") for i in range(n)]
+    arvore = ArvoreAVL()
+    tracemalloc.start()
+    for cat in categorias:
+        arvore.inserir_publico(cat)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memoria / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória por categoria dos nós da ArvoreAVL")
+    parser.add_argument("--n", type=int, default=1_000_000, help="nós alocados por layout")
+    parser.add_argument("--n-arvore", type=int, default=100_000, help="categorias inseridas na árvore real")
+    args = parser.parse_args()
+
+    referencia = Categoria("Referência")
+    antigo = medir_nos(NoComDict, args.n, referencia)
+    atual = medir_nos(No, args.n, referencia)
+
+    print(f"=== Memória por nó ({args.n:,} nós) ===")
+    print(f"Nó com __dict__  : {antigo:8.1f} bytes/nó  ({antigo * args.n / 2**20:8.1f} MiB)")
+    print(f"Nó com __slots__ : {atual:8.1f} bytes/nó  ({atual * args.n / 2**20:8.1f} MiB)")
+    print(f"Economia         : {100 * (1 - atual / antigo):8.1f} %")
+
+    if args.n_arvore > 0:
+        por_categoria = medir_arvore(args.n_arvore)
+        print(f"\nArvoreAVL real ({args.n_arvore:,} categorias): {por_categoria:.1f} bytes/categoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do catálogo em disco: gravação e carga a frio (arquivo -> árvore pronta),
+comparadas à montagem das mesmas categorias a partir de dicionários em memória.
+Execute: python benchmark_persistencia.py --categorias 1000000 --produtos 5
+"""
+
+import sys
+import os
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.persistencia_catalogo import carregar_catalogo, salvar_catalogo
+from app.utils.timer import Timer
+
+
+def gerar_categorias(n: int, produtos_por_categoria: int, semente: int):
+    rnd = random.Random(semente)
+    for i in range(n):
+        produtos = [{"nome": f"Produto {i:07d}-{j}", "peso_produto": rnd.random()}
+                    for j in range(produtos_por_categoria)]
+        yield Categoria(f"Categoria {i:07d}", produtos, peso_popularidade=rnd.uniform(1, 5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gravação e carga do catálogo binário")
+    parser.add_argument("--categorias", type=int, default=100_000)
+    parser.add_argument("--produtos", type=int, default=5, help="produtos por categoria")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    timer = Timer()
+    with timer:
+        arvore = ArvoreAVL.from_iterable(gerar_categorias(args.categorias, args.produtos, args.semente),
+                                         ordenado=True)
+    tempo_montagem = timer.get_elapsed_time()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "catalogo.srhp")
+        with timer:
+            salvar_catalogo(arvore, caminho)
+        tempo_gravacao = timer.get_elapsed_time()
+        tamanho = os.path.getsize(caminho)
+
+        del arvore
+        with timer:
+            carregada = carregar_catalogo(caminho)
+        tempo_carga = timer.get_elapsed_time()
+        assert carregada.get_tamanho() == args.categorias
+
+    print(f"{'fase':<26} | {'tempo (s)':>10}")
+    print("-" * 40)
+    print(f"{'montagem em memória':<26} | {tempo_montagem:>10.2f}")
+    print(f"{'gravação':<26} | {tempo_gravacao:>10.2f}")
+    print(f"{'carga a frio do arquivo':<26} | {tempo_carga:>10.2f}")
+    print(f"\nArquivo: {tamanho / 2**20:,.1f} MiB ({tamanho / args.categorias:,.0f} bytes por categoria)")
+
+
+if __name__ == "__main__":
+    main()
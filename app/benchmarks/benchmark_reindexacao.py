@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da reindexação do RecomendacaoService: serial x paralela (processos).
+Execute: python benchmark_reindexacao.py --categorias 20000 --produtos 50 --processos 2 4 8
+"""
+
+import sys
+import os
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.recomendacao_service import RecomendacaoService
+from app.utils.timer import Timer
+
+
+def montar_arvore(n: int, produtos_por_categoria: int, semente: int) -> ArvoreAVL:
+    rnd = random.Random(semente)
+    return ArvoreAVL.from_iterable(
+        (Categoria(f"Categoria {i:07d}",
+                   [{"nome": f"Produto {rnd.randrange(n * 10):08d}", "peso_produto": rnd.random()}
+                    for _ in range(produtos_por_categoria)],
+                   peso_popularidade=rnd.uniform(1, 5))
+         for i in range(n)),
+        ordenado=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reindexação serial x paralela")
+    parser.add_argument("--categorias", type=int, default=20_000)
+    parser.add_argument("--produtos", type=int, default=50, help="produtos por categoria")
+    parser.add_argument("--processos", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    arvore = montar_arvore(args.categorias, args.produtos, args.semente)
+    servico = RecomendacaoService(arvore)
+    timer = Timer()
+    total = args.categorias * args.produtos
+
+    with timer:
+        servico.reindexar()
+    base = timer.get_elapsed_time()
+    print(f"{'modo':<14} | {'tempo (s)':>10} | {'produtos/s':>12} | {'ganho':>6}")
+    print("-" * 52)
+    print(f"{'serial':<14} | {base:>10.2f} | {total / base:>12,.0f} | {1:>5.2f}x")
+
+    for processos in args.processos:
+        with timer:
+            servico.reindexar(paralelo=True, processos=processos)
+        tempo = timer.get_elapsed_time()
+        print(f"{f'{processos} processos':<14} | {tempo:>10.2f} | {total / tempo:>12,.0f} | {base / tempo:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 """
 Interface de Linha de Comando (CLI) para o Sistema de Recomendação Hierárquica de Produtos (SRHP)
 Execute: python interface_cli.py
+Importação direta: python interface_cli.py importar produtos.csv
 """
 
 import sys
@@ -14,22 +15,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 from app.core.arvore_avl import ArvoreAVL
 from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
 from app.services.recomendacao_service import RecomendacaoService
+from app.services.persistencia_catalogo import CAMINHO_CATALOGO_PADRAO, carregar_ou_inicializar, salvar_catalogo
+from app.services.importador import formato_do_arquivo, importar_arquivo
 
 
 def carregar_dados_iniciais(arvore: ArvoreAVL):
     """Cria categorias, subcategorias e produtos iniciais para teste."""
-    bebidas = Categoria("Bebidas", ["Suco de Uva", "Refrigerante", "Água Mineral"], peso_popularidade=4.0)
-    eletronicos = Categoria("Eletrônicos", ["Celular", "Notebook", "Fone JBL"], peso_popularidade=3.0)
-    acessorios = Categoria("Acessórios", ["Cabo HDMI", "Mouse Gamer"], peso_popularidade=2.0)
-    eletronicos.adicionar_subcategoria(acessorios)
-
-    bananinha = Categoria("Bananinha", ["Banana Chips", "Banana Passa"], peso_popularidade=5.0)
-    bananas_gourmet = Categoria("Bananas Gourmet", ["Banana Flambada", "Banana com Chocolate"], peso_popularidade=2.0)
-    bananinha.adicionar_subcategoria(bananas_gourmet)
-
-    for cat in [bebidas, eletronicos, bananinha]:
-        arvore.inserir_publico(cat)
+    arvore.carregar_em_lote(criar_categorias_iniciais())
 
 
 def exibir_menu():
@@ -45,17 +39,20 @@ def exibir_menu():
     print("7. Remover subcategoria")
     print("8. Remover produto")
     print("9. Relatório de desempenho")
+    print("10. Importar produtos (CSV/JSONL)")
     print("0. Sair")
     print("==============================")
 
 
 def interface_cli():
     arvore = ArvoreAVL()
-    carregar_dados_iniciais(arvore)
+    if carregar_ou_inicializar(arvore, CAMINHO_CATALOGO_PADRAO):
+        print(f"\n📂 Catálogo carregado de '{CAMINHO_CATALOGO_PADRAO}'.")
+    else:
+        print("\n🚀 Sistema SRHP iniciado com dados de demonstração.")
     recomendador = RecomendacaoService(arvore)
     recomendador.reindexar()
 
-    print("\n🚀 Sistema SRHP iniciado com dados de demonstração.")
     arvore.imprimir_arvore()
 
     while True:
@@ -70,7 +67,6 @@ def interface_cli():
                 continue
             cat = Categoria(nome)
             arvore.inserir_publico(cat)
-            recomendador.reindexar()
             print(f"✅ Categoria '{nome}' adicionada com sucesso!")
 
         # 2️⃣ Inserir subcategoria
@@ -86,7 +82,6 @@ def interface_cli():
                 continue
             sub = Categoria(nome_sub)
             categoria.adicionar_subcategoria(sub)
-            recomendador.reindexar()
             print(f"✅ Subcategoria '{nome_sub}' adicionada em '{nome_cat}'.")
 
         # 3️⃣ Inserir produto
@@ -105,7 +100,7 @@ def interface_cli():
 
             # Inserção no nível correto
             if sub_nome:
-                sub = next((s for s in categoria.subcategorias if s.nome.lower() == sub_nome.lower()), None)
+                sub = categoria.resolver_caminho(sub_nome, ignorar_caixa=True)
                 if not sub:
                     print(f"❌ Subcategoria '{sub_nome}' não encontrada em '{nome_cat}'.")
                     continue
@@ -115,9 +110,6 @@ def interface_cli():
                 categoria.adicionar_produto(nome_produto)
                 print(f"✅ Produto '{nome_produto}' adicionado em categoria '{nome_cat}'.")
 
-            # Reindexar produtos após inserção
-            recomendador.reindexar()
-
             # Exibir atualização imediata
             print("\n📦 Atualização da árvore após inserção:")
             arvore.imprimir_arvore()
@@ -149,7 +141,6 @@ def interface_cli():
                 print("Nome vazio. Abortando.")
                 continue
             if arvore.remover_publico(nome):
-                recomendador.reindexar()
                 print(f"✅ Categoria '{nome}' removida com sucesso!")
             else:
                 print(f"❌ Categoria '{nome}' não encontrada.")
@@ -163,7 +154,6 @@ def interface_cli():
                 continue
             nome_sub = input("Nome da subcategoria a remover: ").strip()
             if categoria.remover_subcategoria(nome_sub):
-                recomendador.reindexar()
                 print(f"✅ Subcategoria '{nome_sub}' removida de '{nome_cat}'.")
             else:
                 print(f"❌ Subcategoria '{nome_sub}' não encontrada em '{nome_cat}'.")
@@ -183,15 +173,13 @@ def interface_cli():
                 continue
 
             if sub_nome:
-                sub = next((s for s in categoria.subcategorias if s.nome == sub_nome), None)
+                sub = categoria.resolver_caminho(sub_nome)
                 if sub and sub.remover_produto(nome_produto):
-                    recomendador.reindexar()
                     print(f"✅ Produto '{nome_produto}' removido de subcategoria '{sub_nome}'.")
                 else:
                     print(f"❌ Produto ou subcategoria não encontrados.")
             else:
                 if categoria.remover_produto(nome_produto):
-                    recomendador.reindexar()
                     print(f"✅ Produto '{nome_produto}' removido de categoria '{nome_cat}'.")
                 else:
                     print(f"❌ Produto '{nome_produto}' não encontrado em '{nome_cat}'.")
@@ -208,8 +196,24 @@ def interface_cli():
             for k, v in relatorio["complexidade"].items():
                 print(f" - {k}: {v}")
 
+        # 🔟 Importação em massa
+        elif opcao == "10":
+            caminho = input("Arquivo (.csv ou .jsonl): ").strip()
+            if not caminho:
+                print("Arquivo vazio. Abortando.")
+                continue
+            try:
+                resumo = importar_arquivo(caminho, formato_do_arquivo(caminho), arvore, recomendador)
+            except (OSError, ValueError) as e:
+                print(f"❌ Falha na importação: {e}")
+                continue
+            print(f"✅ {resumo['linhas']} produtos importados ({resumo['duplicadas']} já existentes, "
+                  f"{resumo['rejeitadas']} linhas rejeitadas, {resumo['categorias_novas']} categorias novas).")
+
         # 0️⃣ Sair
         elif opcao == "0":
+            salvar_catalogo(arvore, CAMINHO_CATALOGO_PADRAO)
+            print(f"💾 Catálogo salvo em '{CAMINHO_CATALOGO_PADRAO}'.")
             print("👋 Encerrando sistema SRHP...")
             break
 
@@ -217,5 +221,19 @@ def interface_cli():
             print("❌ Opção inválida. Tente novamente.")
 
 
+def importar_pela_linha_de_comando(caminho: str):
+    """python interface_cli.py importar arquivo.csv: importa para o catálogo salvo, sem abrir o menu."""
+    arvore = ArvoreAVL()
+    carregar_ou_inicializar(arvore, CAMINHO_CATALOGO_PADRAO)
+    resumo = importar_arquivo(caminho, formato_do_arquivo(caminho), arvore)
+    salvar_catalogo(arvore, CAMINHO_CATALOGO_PADRAO)
+    print(f"✅ {resumo['linhas']} produtos importados ({resumo['duplicadas']} já existentes, "
+          f"{resumo['rejeitadas']} linhas rejeitadas). "
+          f"Catálogo salvo em '{CAMINHO_CATALOGO_PADRAO}'.")
+
+
 if __name__ == "__main__":
-    interface_cli()
+    if len(sys.argv) == 3 and sys.argv[1] == "importar":
+        importar_pela_linha_de_comando(sys.argv[2])
+    else:
+        interface_cli()
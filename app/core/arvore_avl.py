@@ -2,18 +2,48 @@ import sys, os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from typing import Optional, List, Tuple
-from app.core.categoria import Categoria
+import heapq
+from functools import wraps
+from typing import Optional, List, Tuple, Callable, Iterator, Iterable
+from app.core.categoria import Categoria, dividir_caminho
+from app.utils.rwlock import TravaLeituraEscrita
+
+
+# Chave de ordenação das categorias na árvore
+def _nome_categoria(categoria: Categoria) -> str:
+    return categoria.nome
+
+
+# Executa o método segurando a trava de leitura da árvore
+def _sob_leitura(metodo):
+    @wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self.trava.leitura():
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+# Gerador que segura a trava de leitura só enquanto avança cada passo
+# (não é um retrato fixo: para percorrer sem escritas no meio, use "with arvore.trava.leitura()")
+def _passos_sob_leitura(gerador):
+    @wraps(gerador)
+    def envolvido(self, *args, **kwargs):
+        return self.trava.iterar(gerador(self, *args, **kwargs))
+    return envolvido
 
 
 class No:
     
+    # Sem __dict__ por instância: a árvore aloca um nó por categoria
+    __slots__ = ("categoria", "esquerda", "direita", "altura", "tamanho")
+    
     # Inicialização do nó
     def __init__(self, categoria: Categoria):
         self.categoria = categoria
         self.esquerda: Optional[No] = None
         self.direita: Optional[No] = None
         self.altura: int = 1
+        self.tamanho: int = 1   # nós da subárvore (estatística de ordem)
     
     # Representação em string
     def __str__(self) -> str:
@@ -23,9 +53,35 @@ class No:
 class ArvoreAVL:
     
     # Inicialização da árvore
-    def __init__(self):
+    # iterativa=True usa laços com pilha explícita; False usa a versão recursiva original
+    def __init__(self, iterativa: bool = True):
         self.raiz: Optional[No] = None
         self.tamanho: int = 0
+        self.iterativa = iterativa
+        
+        # Funções avisadas quando categorias entram ou saem da árvore
+        self._ouvintes: List[Callable] = []
+        
+        # Vários leitores em paralelo ou um escritor (API em threads + GUI)
+        self.trava = TravaLeituraEscrita()
+    
+    # Notificação de alterações
+    
+    # Registra ouvinte(evento, categoria) - eventos: categoria_inserida, categoria_removida
+    # e categorias_inseridas (carga em lote: recebe a lista de categorias novas)
+    def adicionar_ouvinte(self, ouvinte: Callable) -> None:
+        if ouvinte not in self._ouvintes:
+            self._ouvintes.append(ouvinte)
+    
+    # Remove ouvinte registrado
+    def remover_ouvinte(self, ouvinte: Callable) -> None:
+        if ouvinte in self._ouvintes:
+            self._ouvintes.remove(ouvinte)
+    
+    # Avisa todos os ouvintes
+    def _notificar(self, evento: str, categoria: Categoria) -> None:
+        for ouvinte in list(self._ouvintes):
+            ouvinte(evento, categoria)
     
     # Métodos auxiliares
     
@@ -33,10 +89,15 @@ class ArvoreAVL:
     def obter_altura(self, no: Optional[No]) -> int:
         return no.altura if no else 0
     
-    # Atualiza altura do nó
+    # Retorna quantidade de nós da subárvore
+    def obter_tamanho(self, no: Optional[No]) -> int:
+        return no.tamanho if no else 0
+    
+    # Atualiza altura (e tamanho da subárvore) do nó
     def atualizar_altura(self, no: No) -> None:
         no.altura = 1 + max(self.obter_altura(no.esquerda), 
                             self.obter_altura(no.direita))
+        no.tamanho = 1 + self.obter_tamanho(no.esquerda) + self.obter_tamanho(no.direita)
     
     # Calcula fator de balanceamento
     def fator_balanceamento(self, no: Optional[No]) -> int:
@@ -222,6 +283,279 @@ class ArvoreAVL:
         
         return resultado
     
+    # Versões iterativas (sem recursão)
+    
+    # Reequilibra o caminho (pilha de ancestrais) de baixo para cima
+    def _rebalancear_caminho(self, caminho: List[No]) -> None:
+        ajustar_altura = True
+        for i in range(len(caminho) - 1, -1, -1):
+            no = caminho[i]
+            esq = no.esquerda
+            dir = no.direita
+            no.tamanho = 1 + (esq.tamanho if esq else 0) + (dir.tamanho if dir else 0)
+            if not ajustar_altura:
+                continue
+            
+            he = esq.altura if esq else 0
+            hd = dir.altura if dir else 0
+            fb = he - hd
+            altura = 1 + (he if he > hd else hd)
+            
+            # Altura não mudou e nó balanceado: acima dele só muda o tamanho
+            if altura == no.altura and -1 <= fb <= 1:
+                ajustar_altura = False
+                continue
+            no.altura = altura
+            
+            if fb > 1 or fb < -1:
+                nova_raiz = self._balancear(no)
+                if i == 0:
+                    self.raiz = nova_raiz
+                elif caminho[i - 1].esquerda is no:
+                    caminho[i - 1].esquerda = nova_raiz
+                else:
+                    caminho[i - 1].direita = nova_raiz
+    
+    # Aplica a rotação simples ou dupla necessária no nó desbalanceado
+    def _balancear(self, no: No) -> No:
+        fb = self.fator_balanceamento(no)
+        if fb > 1:
+            if self.fator_balanceamento(no.esquerda) < 0:
+                no.esquerda = self.rotacao_esquerda(no.esquerda)
+            return self.rotacao_direita(no)
+        if fb < -1:
+            if self.fator_balanceamento(no.direita) > 0:
+                no.direita = self.rotacao_direita(no.direita)
+            return self.rotacao_esquerda(no)
+        return no
+    
+    # Insere categoria iterativamente (retorna False se o nome já existia)
+    def _inserir_iterativo(self, categoria: Categoria) -> bool:
+        nome = categoria.nome
+        caminho: List[No] = []
+        no = self.raiz
+        while no:
+            caminho.append(no)
+            atual = no.categoria.nome
+            if nome < atual:
+                no = no.esquerda
+            elif nome > atual:
+                no = no.direita
+            else:
+                return False
+        
+        novo = No(categoria)
+        self.tamanho += 1
+        if not caminho:
+            self.raiz = novo
+            return True
+        
+        pai = caminho[-1]
+        if nome < pai.categoria.nome:
+            pai.esquerda = novo
+        else:
+            pai.direita = novo
+        self._rebalancear_caminho(caminho)
+        return True
+    
+    # Busca categoria iterativamente
+    def _buscar_iterativo(self, nome: str) -> Optional[Categoria]:
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if nome == atual:
+                return no.categoria
+            no = no.esquerda if nome < atual else no.direita
+        return None
+    
+    # Remove categoria iterativamente (retorna a categoria removida ou None)
+    def _remover_iterativo(self, nome: str) -> Optional[Categoria]:
+        caminho: List[No] = []
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if nome == atual:
+                break
+            caminho.append(no)
+            no = no.esquerda if nome < atual else no.direita
+        if no is None:
+            return None
+        
+        removida = no.categoria
+        
+        # Nó com 2 filhos: recebe o sucessor, que é quem sai da árvore
+        if no.esquerda and no.direita:
+            caminho.append(no)
+            sucessor = no.direita
+            while sucessor.esquerda:
+                caminho.append(sucessor)
+                sucessor = sucessor.esquerda
+            no.categoria = sucessor.categoria
+            no = sucessor
+        
+        filho = no.esquerda if no.esquerda else no.direita
+        if not caminho:
+            self.raiz = filho
+        elif caminho[-1].esquerda is no:
+            caminho[-1].esquerda = filho
+        else:
+            caminho[-1].direita = filho
+        
+        self.tamanho -= 1
+        self._rebalancear_caminho(caminho)
+        return removida
+    
+    # Percorre os nós em ordem com pilha explícita
+    def _iter_nos_em_ordem(self, no: Optional[No]) -> Iterator[No]:
+        pilha: List[No] = []
+        while pilha or no:
+            while no:
+                pilha.append(no)
+                no = no.esquerda
+            no = pilha.pop()
+            yield no
+            no = no.direita
+    
+    # Percorre os nós em ordem decrescente com pilha explícita
+    def _iter_nos_em_ordem_reversa(self, no: Optional[No]) -> Iterator[No]:
+        pilha: List[No] = []
+        while pilha or no:
+            while no:
+                pilha.append(no)
+                no = no.direita
+            no = pilha.pop()
+            yield no
+            no = no.esquerda
+    
+    # Percorre os nós em pré-ordem com pilha explícita
+    def _iter_nos_pre_ordem(self, no: Optional[No]) -> Iterator[No]:
+        pilha = [no] if no else []
+        while pilha:
+            no = pilha.pop()
+            yield no
+            if no.direita:
+                pilha.append(no.direita)
+            if no.esquerda:
+                pilha.append(no.esquerda)
+    
+    # Carga em lote
+    
+    # Cria árvore a partir de categorias em lote (aceita geradores)
+    @classmethod
+    def from_iterable(cls, categorias: Iterable[Categoria], ordenado: bool = False,
+                      iterativa: bool = True) -> 'ArvoreAVL':
+        arvore = cls(iterativa=iterativa)
+        arvore.carregar_em_lote(categorias, ordenado=ordenado)
+        return arvore
+    
+    # Carrega várias categorias de uma vez, reconstruindo a árvore perfeitamente balanceada.
+    # Entrada ordenada por nome: O(n); caso contrário ordena antes (O(n log n)).
+    # Nomes repetidos são ignorados, como em inserir_publico. Retorna quantas entraram.
+    def carregar_em_lote(self, categorias: Iterable[Categoria], ordenado: bool = False) -> int:
+        with self.trava.escrita():
+            if ordenado:
+                lista, inseridas, total_novas = self._mesclar_ordenadas(self._validar_ordem(categorias))
+            else:
+                lista, inseridas, total_novas = self._mesclar_no_lugar(list(categorias))
+        
+            self.raiz = self._construir_balanceada(lista, 0, len(lista))
+            self.tamanho = len(lista)
+            del lista
+        
+        if inseridas:
+            self._notificar("categorias_inseridas", inseridas)
+        return total_novas
+    
+    # Mescla um fluxo já ordenado com as categorias existentes (que têm prioridade em nomes
+    # repetidos). Única lista materializada; as novas só são guardadas à parte se alguém escuta
+    def _mesclar_ordenadas(self, novas: Iterable[Categoria]):
+        fluxo = heapq.merge(
+            ((no.categoria, False) for no in self._iter_nos_em_ordem(self.raiz)),
+            ((cat, True) for cat in novas),
+            key=lambda par: par[0].nome,
+        )
+        lista: List[Categoria] = []
+        inseridas: List[Categoria] = []
+        total_novas = 0
+        for categoria, nova in fluxo:
+            if lista and lista[-1].nome == categoria.nome:
+                continue
+            lista.append(categoria)
+            if nova:
+                total_novas += 1
+                if self._ouvintes:
+                    inseridas.append(categoria)
+        return lista, inseridas, total_novas
+    
+    # Ordena as novas na própria lista e mescla as existentes nela de trás para frente:
+    # a posição de escrita nunca alcança uma nova ainda não lida, então o catálogo
+    # fica numa lista só. Em nomes repetidos vale a existente, depois a primeira nova
+    def _mesclar_no_lugar(self, lista: List[Categoria]):
+        lista.sort(key=_nome_categoria)
+        i = len(lista) - 1
+        lista.extend([None] * self.tamanho)
+        escrita = len(lista)
+        inseridas: List[Categoria] = []
+        total_novas = 0
+        ultima_nova = False
+        existentes = self._iter_nos_em_ordem_reversa(self.raiz)
+        no = next(existentes, None)
+        while i >= 0 or no is not None:
+            if no is not None and (i < 0 or no.categoria.nome >= lista[i].nome):
+                categoria, nova = no.categoria, False
+                no = next(existentes, None)
+            else:
+                categoria, nova = lista[i], True
+                i -= 1
+            if escrita < len(lista) and lista[escrita].nome == categoria.nome:
+                # Repetida: uma nova anterior na ordem substitui a que já foi escrita
+                if nova and ultima_nova:
+                    lista[escrita] = categoria
+                    if inseridas:
+                        inseridas[-1] = categoria
+                continue
+            escrita -= 1
+            lista[escrita] = categoria
+            ultima_nova = nova
+            if nova:
+                total_novas += 1
+                if self._ouvintes:
+                    inseridas.append(categoria)
+        del lista[:escrita]
+        inseridas.reverse()
+        return lista, inseridas, total_novas
+    
+    # Repassa as categorias garantindo ordem crescente de nome
+    def _validar_ordem(self, categorias: Iterable[Categoria]) -> Iterator[Categoria]:
+        anterior = None
+        for categoria in categorias:
+            if anterior is not None and categoria.nome < anterior:
+                raise ValueError(f"Categorias fora de ordem: '{categoria.nome}' após '{anterior}'")
+            anterior = categoria.nome
+            yield categoria
+    
+    # Monta subárvore balanceada com categorias[inicio:fim] (já ordenadas)
+    def _construir_balanceada(self, categorias: List[Categoria], inicio: int, fim: int) -> Optional[No]:
+        if inicio >= fim:
+            return None
+        meio = (inicio + fim) // 2
+        no = No(categorias[meio])
+        no.esquerda = self._construir_balanceada(categorias, inicio, meio)
+        no.direita = self._construir_balanceada(categorias, meio + 1, fim)
+        self.atualizar_altura(no)
+        return no
+    
+    # Copia a subárvore preservando o formato (mesmas alturas e tamanhos)
+    def _copiar_subarvore(self, no: Optional[No]) -> Optional[No]:
+        if no is None:
+            return None
+        copia = No(no.categoria)
+        copia.esquerda = self._copiar_subarvore(no.esquerda)
+        copia.direita = self._copiar_subarvore(no.direita)
+        copia.altura = no.altura
+        copia.tamanho = no.tamanho
+        return copia
+    
     # Lista todas as categorias recursivamente
     def _listar_recursivo(self, no: Optional[No], lista: List[Categoria]) -> None:
         if no:
@@ -246,19 +580,20 @@ class ArvoreAVL:
 
         # Produtos
         print(f"{indent_conteudo}├─ Produtos:")
-        if categoria.produtos:
+        if categoria.get_total_produtos():
             for p in categoria.get_produtos_ordenados_por_peso():
                 print(f"{indent_conteudo}│   • {p['nome']} (peso_produto={p['peso_produto']:.3f})")
         else:
             print(f"{indent_conteudo}│   (nenhum produto)")
 
         # Subcategorias
-        if categoria.subcategorias:
+        if categoria.get_total_subcategorias():
             print(f"{indent_conteudo}├─ Subcategorias:")
-            for i, sub in enumerate(categoria.subcategorias):
-                conector = "└─" if i == len(categoria.subcategorias) - 1 else "├─"
+            ultima = categoria.get_total_subcategorias() - 1
+            for i, sub in enumerate(categoria.iter_subcategorias()):
+                conector = "└─" if i == ultima else "├─"
                 print(f"{indent_conteudo}│   {conector} {sub.nome} (peso={sub.peso_popularidade:.3f})")
-                if sub.produtos:
+                if sub.get_total_produtos():
                     for p in sub.get_produtos_ordenados_por_peso():
                         print(f"{indent_conteudo}│      • {p['nome']} (peso_produto={p['peso_produto']:.3f})")
                 else:
@@ -278,25 +613,239 @@ class ArvoreAVL:
     
     # Insere categoria (método público)
     def inserir_publico(self, categoria: Categoria) -> None:
-        self.raiz = self.inserir(self.raiz, categoria)
+        with self.trava.escrita():
+            if self.iterativa:
+                inserida = self._inserir_iterativo(categoria)
+            else:
+                tamanho_antes = self.tamanho
+                self.raiz = self.inserir(self.raiz, categoria)
+                inserida = self.tamanho > tamanho_antes
+        # Ouvintes são avisados fora da trava (podem usar suas próprias travas)
+        if inserida:
+            self._notificar("categoria_inserida", categoria)
     
     # Busca categoria (método público)
+    @_sob_leitura
     def buscar_publico(self, nome: str) -> Optional[Categoria]:
+        if self.iterativa:
+            return self._buscar_iterativo(nome)
         return self.buscar(self.raiz, nome)
     
     # Remove categoria (método público)
     def remover_publico(self, nome: str) -> bool:
-        removido = [False]
-        self.raiz = self.remover(self.raiz, nome, removido)
-        return removido[0]
+        with self.trava.escrita():
+            if self.iterativa:
+                categoria = self._remover_iterativo(nome)
+            else:
+                categoria = self.buscar(self.raiz, nome)
+                removido = [False]
+                self.raiz = self.remover(self.raiz, nome, removido)
+        if categoria is None:
+            return False
+        self._notificar("categoria_removida", categoria)
+        return True
+    
+    # Resolve "Categoria > Sub > Sub da sub" (busca O(log n) na raiz e O(1) por nível abaixo)
+    @_sob_leitura
+    def resolver_caminho(self, caminho, ignorar_caixa: bool = False) -> Optional[Categoria]:
+        partes = dividir_caminho(caminho)
+        if not partes:
+            return None
+        categoria = self.buscar_publico(partes[0])
+        if categoria is None:
+            return None
+        return categoria.resolver_caminho(partes[1:], ignorar_caixa)
+    
+    # Percursos sob demanda (geradores com memória O(altura))
+    
+    # Itera as categorias em ordem alfabética: for cat in arvore
+    def __iter__(self) -> Iterator[Categoria]:
+        return self.iter_em_ordem()
+    
+    # Categorias em ordem alfabética
+    @_passos_sob_leitura
+    def iter_em_ordem(self) -> Iterator[Categoria]:
+        for no in self._iter_nos_em_ordem(self.raiz):
+            yield no.categoria
+    
+    # Categorias em ordem alfabética decrescente
+    @_passos_sob_leitura
+    def iter_em_ordem_reversa(self) -> Iterator[Categoria]:
+        for no in self._iter_nos_em_ordem_reversa(self.raiz):
+            yield no.categoria
+    
+    # Categorias em pré-ordem (raiz, esquerda, direita)
+    @_passos_sob_leitura
+    def iter_pre_ordem(self) -> Iterator[Categoria]:
+        for no in self._iter_nos_pre_ordem(self.raiz):
+            yield no.categoria
+    
+    # Consultas ordenadas (podam subárvores fora do intervalo: O(log n + k))
+    
+    # Categorias com inicio <= nome < fim (None = sem limite)
+    @_passos_sob_leitura
+    def iter_intervalo(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> Iterator[Categoria]:
+        pilha: List[No] = []
+        no = self.raiz
+        # Desce guardando só os nós >= inicio (os menores ficam de fora junto com sua esquerda)
+        while no:
+            if inicio is None or no.categoria.nome >= inicio:
+                pilha.append(no)
+                no = no.esquerda
+            else:
+                no = no.direita
+        while pilha:
+            no = pilha.pop()
+            if fim is not None and no.categoria.nome >= fim:
+                return
+            yield no.categoria
+            no = no.direita
+            while no:
+                pilha.append(no)
+                no = no.esquerda
+    
+    # Categorias cujo nome começa com o prefixo, em ordem alfabética
+    def iter_prefixo(self, prefixo: str) -> Iterator[Categoria]:
+        for categoria in self.iter_intervalo(prefixo):
+            if not categoria.nome.startswith(prefixo):
+                return
+            yield categoria
+    
+    # Maior categoria com nome <= nome informado
+    @_sob_leitura
+    def piso(self, nome: str) -> Optional[Categoria]:
+        melhor = None
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if atual == nome:
+                return no.categoria
+            if atual < nome:
+                melhor = no.categoria
+                no = no.direita
+            else:
+                no = no.esquerda
+        return melhor
+    
+    # Menor categoria com nome >= nome informado
+    @_sob_leitura
+    def teto(self, nome: str) -> Optional[Categoria]:
+        melhor = None
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if atual == nome:
+                return no.categoria
+            if atual > nome:
+                melhor = no.categoria
+                no = no.esquerda
+            else:
+                no = no.direita
+        return melhor
+    
+    # Menor categoria com nome estritamente maior
+    @_sob_leitura
+    def sucessor(self, nome: str) -> Optional[Categoria]:
+        melhor = None
+        no = self.raiz
+        while no:
+            if no.categoria.nome > nome:
+                melhor = no.categoria
+                no = no.esquerda
+            else:
+                no = no.direita
+        return melhor
+    
+    # Maior categoria com nome estritamente menor
+    @_sob_leitura
+    def predecessor(self, nome: str) -> Optional[Categoria]:
+        melhor = None
+        no = self.raiz
+        while no:
+            if no.categoria.nome < nome:
+                melhor = no.categoria
+                no = no.direita
+            else:
+                no = no.esquerda
+        return melhor
+    
+    # Estatística de ordem (usa o tamanho das subárvores: O(log n))
+    
+    # Categoria na posição i da ordem alfabética (0 = primeira)
+    @_sob_leitura
+    def selecionar(self, i: int) -> Optional[Categoria]:
+        if i < 0 or i >= self.tamanho:
+            return None
+        no = self.raiz
+        while no:
+            te = no.esquerda.tamanho if no.esquerda else 0
+            if i < te:
+                no = no.esquerda
+            elif i == te:
+                return no.categoria
+            else:
+                i -= te + 1
+                no = no.direita
+        return None
+    
+    # Quantidade de categorias com nome menor que o informado (posição de inserção)
+    @_sob_leitura
+    def posicao(self, nome: str) -> int:
+        rank = 0
+        no = self.raiz
+        while no:
+            if nome <= no.categoria.nome:
+                no = no.esquerda
+            else:
+                rank += 1 + (no.esquerda.tamanho if no.esquerda else 0)
+                no = no.direita
+        return rank
+    
+    # Categorias em ordem alfabética a partir da posição inicio (paginação em O(log n + k))
+    @_passos_sob_leitura
+    def iter_por_posicao(self, inicio: int = 0) -> Iterator[Categoria]:
+        pilha: List[No] = []
+        no = self.raiz
+        i = max(inicio, 0)
+        while no:
+            te = no.esquerda.tamanho if no.esquerda else 0
+            if i < te:
+                pilha.append(no)
+                no = no.esquerda
+            elif i == te:
+                pilha.append(no)
+                break
+            else:
+                i -= te + 1
+                no = no.direita
+        while pilha:
+            no = pilha.pop()
+            yield no.categoria
+            no = no.direita
+            while no:
+                pilha.append(no)
+                no = no.esquerda
     
     # Lista todas as categorias
+    @_sob_leitura
     def listar_todas(self) -> List[Categoria]:
+        if self.iterativa:
+            return [no.categoria for no in self._iter_nos_em_ordem(self.raiz)]
         categorias = []
         self._listar_recursivo(self.raiz, categorias)
         return categorias
     
+    # Retrato consistente da árvore (sem ouvintes): cópia O(n) feita sob leitura.
+    # A ArvoreAVLPersistente devolve o retrato em O(1), sem copiar nós.
+    @_sob_leitura
+    def snapshot(self) -> 'ArvoreAVL':
+        copia = ArvoreAVL(iterativa=self.iterativa)
+        copia.raiz = self._copiar_subarvore(self.raiz)
+        copia.tamanho = self.tamanho
+        return copia
+    
     # Imprime árvore visualmente + subcategorias e produtos
+    @_sob_leitura
     def imprimir_arvore(self) -> None:
         """Imprime toda a árvore AVL (categorias, subcategorias e produtos) com indentação alinhada."""
         print("\n=== Árvore AVL Detalhada (categorias, subcategorias e produtos) ===\n")
@@ -317,9 +866,15 @@ class ArvoreAVL:
         return self.tamanho
     
     # Retorna percurso em ordem
+    @_sob_leitura
     def get_em_ordem(self) -> List[Tuple[str, int]]:
+        if self.iterativa:
+            return [(no.categoria.nome, no.altura) for no in self._iter_nos_em_ordem(self.raiz)]
         return self.em_ordem(self.raiz)
     
     # Retorna percurso pré-ordem
+    @_sob_leitura
     def get_pre_ordem(self) -> List[Tuple[str, int]]:
+        if self.iterativa:
+            return [(no.categoria.nome, no.altura) for no in self._iter_nos_pre_ordem(self.raiz)]
         return self.pre_ordem(self.raiz)
@@ -0,0 +1,155 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+from contextlib import nullcontext
+from typing import Optional, List, Tuple
+from app.core.arvore_avl import ArvoreAVL, No
+from app.core.categoria import Categoria
+
+
+class _TravaSoEscrita:
+    """Leituras não travam (cada versão é imutável); escritas são serializadas entre si."""
+
+    def __init__(self):
+        self._escrita = threading.RLock()
+
+    def leitura(self):
+        return nullcontext(self)
+
+    def escrita(self):
+        return self._escrita
+
+    def iterar(self, iteravel):
+        return iter(iteravel)
+
+
+class ArvoreAVLPersistente(ArvoreAVL):
+    """
+    Variante persistente da ArvoreAVL (cópia de caminho).
+
+    Um nó publicado nunca mais é alterado: inserir e remover copiam apenas os
+    O(log n) nós do caminho até a raiz, compartilham o resto com a versão
+    anterior e publicam a nova raiz numa única atribuição. Quem leu a raiz
+    antes continua vendo aquela versão inteira, então as leituras não usam
+    trava e snapshot() custa O(1). As categorias em si são compartilhadas
+    entre as versões (o retrato é da estrutura da árvore, não dos produtos).
+    """
+
+    # Inicialização da árvore
+    # Alterações sempre pela versão iterativa com cópia de caminho
+    def __init__(self, iterativa: bool = True):
+        super().__init__(iterativa=True)
+        self.trava = _TravaSoEscrita()
+
+    # Tamanho vem da raiz da versão (nunca fica dessincronizado dela)
+    @property
+    def tamanho(self) -> int:
+        raiz = self.raiz
+        return raiz.tamanho if raiz else 0
+
+    # A base atribui o tamanho ao criar/carregar; aqui ele é derivado da raiz
+    @tamanho.setter
+    def tamanho(self, valor: int) -> None:
+        pass
+
+    # Versões
+
+    # Retrato imutável da versão atual em O(1): outra árvore com a mesma raiz e sem ouvintes
+    def snapshot(self) -> 'ArvoreAVLPersistente':
+        versao = ArvoreAVLPersistente()
+        versao.raiz = self.raiz
+        return versao
+
+    # Cópia de caminho
+
+    # Novo nó com os filhos informados (altura e tamanho calculados)
+    def _novo_no(self, categoria: Categoria, esquerda: Optional[No], direita: Optional[No]) -> No:
+        no = No(categoria)
+        no.esquerda = esquerda
+        no.direita = direita
+        self.atualizar_altura(no)
+        return no
+
+    # Monta o nó já reequilibrado, criando nós novos em vez de rotacionar os existentes
+    def _balancear_copiando(self, categoria: Categoria, esquerda: Optional[No], direita: Optional[No]) -> No:
+        he = self.obter_altura(esquerda)
+        hd = self.obter_altura(direita)
+        if he > hd + 1:
+            # Esquerda-esquerda: rotação simples à direita
+            if self.obter_altura(esquerda.esquerda) >= self.obter_altura(esquerda.direita):
+                return self._novo_no(esquerda.categoria, esquerda.esquerda,
+                                     self._novo_no(categoria, esquerda.direita, direita))
+            # Esquerda-direita: rotação dupla
+            meio = esquerda.direita
+            return self._novo_no(meio.categoria,
+                                 self._novo_no(esquerda.categoria, esquerda.esquerda, meio.esquerda),
+                                 self._novo_no(categoria, meio.direita, direita))
+        if hd > he + 1:
+            # Direita-direita: rotação simples à esquerda
+            if self.obter_altura(direita.direita) >= self.obter_altura(direita.esquerda):
+                return self._novo_no(direita.categoria,
+                                     self._novo_no(categoria, esquerda, direita.esquerda),
+                                     direita.direita)
+            # Direita-esquerda: rotação dupla
+            meio = direita.esquerda
+            return self._novo_no(meio.categoria,
+                                 self._novo_no(categoria, esquerda, meio.esquerda),
+                                 self._novo_no(direita.categoria, meio.direita, direita.direita))
+        return self._novo_no(categoria, esquerda, direita)
+
+    # Copia os ancestrais de baixo para cima sobre o novo filho; o que fica fora do caminho é compartilhado
+    def _copiar_caminho(self, caminho: List[Tuple[No, bool]], filho: Optional[No]) -> Optional[No]:
+        for no, pela_esquerda in reversed(caminho):
+            if pela_esquerda:
+                filho = self._balancear_copiando(no.categoria, filho, no.direita)
+            else:
+                filho = self._balancear_copiando(no.categoria, no.esquerda, filho)
+        return filho
+
+    # Insere categoria gerando nova versão (retorna False se o nome já existia)
+    def _inserir_iterativo(self, categoria: Categoria) -> bool:
+        nome = categoria.nome
+        caminho: List[Tuple[No, bool]] = []
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if nome == atual:
+                return False
+            pela_esquerda = nome < atual
+            caminho.append((no, pela_esquerda))
+            no = no.esquerda if pela_esquerda else no.direita
+
+        # Publicação atômica: leitores pegam a raiz antiga ou a nova, nunca uma mistura
+        self.raiz = self._copiar_caminho(caminho, No(categoria))
+        return True
+
+    # Remove categoria gerando nova versão (retorna a categoria removida ou None)
+    def _remover_iterativo(self, nome: str) -> Optional[Categoria]:
+        caminho: List[Tuple[No, bool]] = []
+        no = self.raiz
+        while no:
+            atual = no.categoria.nome
+            if nome == atual:
+                break
+            pela_esquerda = nome < atual
+            caminho.append((no, pela_esquerda))
+            no = no.esquerda if pela_esquerda else no.direita
+        if no is None:
+            return None
+
+        if no.esquerda and no.direita:
+            # Dois filhos: o sucessor sai da subárvore direita e ocupa o lugar do nó
+            ate_sucessor: List[Tuple[No, bool]] = []
+            sucessor = no.direita
+            while sucessor.esquerda:
+                ate_sucessor.append((sucessor, True))
+                sucessor = sucessor.esquerda
+            direita = self._copiar_caminho(ate_sucessor, sucessor.direita)
+            substituto = self._balancear_copiando(sucessor.categoria, no.esquerda, direita)
+        else:
+            substituto = no.esquerda if no.esquerda else no.direita
+
+        self.raiz = self._copiar_caminho(caminho, substituto)
+        return no.categoria
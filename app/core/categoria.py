@@ -1,5 +1,18 @@
-from typing import List, Dict
+from typing import List, Dict, Callable, Optional, Iterator, Union, Sequence, Tuple
 from threading import Lock
+from itertools import islice
+
+from app.core.coluna_pesos import ColunaPesos
+
+SEPARADOR_CAMINHO = ">"
+
+
+def dividir_caminho(caminho: Union[str, Sequence[str]]) -> List[str]:
+    """Quebra 'Eletrônicos > Acessórios > Cabos' nos nomes de cada nível (aceita lista pronta)."""
+    if isinstance(caminho, str):
+        caminho = caminho.split(SEPARADOR_CAMINHO)
+    return [parte.strip() for parte in caminho if parte and parte.strip()]
+
 
 class Categoria:
     # =============================================================
@@ -9,114 +22,360 @@ class Categoria:
         self.nome = nome
         self._lock = Lock()
 
-        # Cada produto é um dicionário com nome e peso
-        self.produtos: List[Dict[str, float]] = []
+        # Produtos em colunas: linha i = (self._nomes[i], self._pesos[i])
+        self._nomes: List[str] = []
+        self._pesos = ColunaPesos()
+        # Nome -> linha (a ordem das chaves é a ordem de inserção dos produtos)
+        self._linhas: Dict[str, int] = {}
+        # Nome em minúsculas -> nomes exatos (busca sem diferenciar maiúsculas)
+        self._nomes_normalizados: Dict[str, List[str]] = {}
+        # Produtos já ordenados por peso (None = precisa reordenar)
+        self._ordenados_por_peso: Optional[List[Dict[str, float]]] = None
         if produtos:
             for p in produtos:
                 if isinstance(p, dict):
-                    self.produtos.append(p)
+                    self._guardar_produto(p["nome"], p.get("peso_produto", 1.0))
                 else:
-                    self.produtos.append({"nome": p, "peso_produto": 1.0})
+                    self._guardar_produto(p, 1.0)
 
-        self.subcategorias: List['Categoria'] = []
+        # Subcategorias indexadas pelo nome (mesma estrutura dos produtos)
+        self._subcategorias: Dict[str, 'Categoria'] = {}
+        self._subcategorias_normalizadas: Dict[str, List[str]] = {}
         self.peso_popularidade = peso_popularidade
-        
+
+        # Funções avisadas a cada alteração (ex.: índices do RecomendacaoService)
+        self._ouvintes: List[Callable] = []
+
+    # =============================================================
+    # 🗂️ Armazenamento indexado de produtos
+    # =============================================================
+    # Cada produto é exposto como dicionário {"nome", "peso_produto"} montado a
+    # partir das colunas; alterações passam pelos métodos da categoria.
+
+    @property
+    def produtos(self) -> Tuple[Dict[str, float], ...]:
+        """Produtos em ordem de inserção, numa tupla (somente leitura): altere pelos
+        métodos da categoria. append/remove na tupla falham em vez de se perder."""
+        with self._lock:
+            return tuple(self.iter_produtos())
+
+    def iter_produtos(self) -> Iterator[Dict[str, float]]:
+        """Percorre os produtos sem copiar a coleção."""
+        pesos = self._pesos
+        for nome, linha in self._linhas.items():
+            yield {"nome": nome, "peso_produto": pesos[linha]}
+
+    def _guardar_produto(self, nome: str, peso: float) -> bool:
+        """Acrescenta uma linha em O(1) (retorna False se já existir produto com esse nome)."""
+        if nome in self._linhas:
+            return False
+        self._linhas[nome] = self._pesos.anexar(float(peso))
+        self._nomes.append(nome)
+        self._nomes_normalizados.setdefault(nome.lower(), []).append(nome)
+        self._ordenados_por_peso = None
+        return True
+
+    def _descartar_produto(self, nome: str) -> Optional[Dict[str, float]]:
+        """Retira a linha em O(1), movendo a última para o lugar dela (retorna o produto removido ou None)."""
+        linha = self._linhas.pop(nome, None)
+        if linha is None:
+            return None
+        produto = {"nome": nome, "peso_produto": self._pesos[linha]}
+        movida = self._pesos.remover_trocando(linha)
+        ultimo = self._nomes.pop()
+        if movida is not None:
+            self._nomes[linha] = ultimo
+            self._linhas[ultimo] = linha
+
+        nomes = self._nomes_normalizados[nome.lower()]
+        nomes.remove(nome)
+        if not nomes:
+            del self._nomes_normalizados[nome.lower()]
+        self._ordenados_por_peso = None
+        return produto
+
+    def _buscar_produto_sem_caixa(self, nome: str) -> Optional[str]:
+        """Nome exato do primeiro produto que coincide ignorando maiúsculas/minúsculas."""
+        nomes = self._nomes_normalizados.get(nome.lower())
+        return nomes[0] if nomes else None
+
+    # =============================================================
+    # 🔔 Notificação de alterações
+    # =============================================================
+    def adicionar_ouvinte(self, ouvinte: Callable) -> None:
+        """Registra ouvinte(categoria, evento, alvo) chamado após cada alteração."""
+        if ouvinte not in self._ouvintes:
+            self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte: Callable) -> None:
+        """Remove um ouvinte registrado (ignora se não existir)."""
+        if ouvinte in self._ouvintes:
+            self._ouvintes.remove(ouvinte)
+
+    def _notificar(self, evento: str, alvo: Optional[object] = None) -> None:
+        """Eventos: produto_adicionado, produto_removido, peso_produto (alvo = nome do produto),
+        subcategoria_adicionada, subcategoria_removida (alvo = subcategoria), peso_categoria
+        e pesos_produtos (todos os pesos de produtos mudaram de uma vez)."""
+        for ouvinte in list(self._ouvintes):
+            ouvinte(self, evento, alvo)
+
     def incrementar_peso_produto(self, nome_produto: str, delta: float) -> bool:
         """Encontra produto pelo nome e incrementa peso_produto (retorna True se encontrado)."""
+        encontrado = False
         with self._lock:
-            for p in self.produtos:
-                if p.get("nome") == nome_produto:
-                    # garante chave peso_produto
-                    p["peso_produto"] = float(p.get("peso_produto", 0.0)) + float(delta)
-                    return True
-        return False
+            linha = self._linhas.get(nome_produto)
+            if linha is not None:
+                self._pesos[linha] = self._pesos[linha] + float(delta)
+                self._ordenados_por_peso = None
+                encontrado = True
+        if encontrado:
+            self._notificar("peso_produto", nome_produto)
+        return encontrado
 
     def incrementar_peso_popularidade_subcategoria(self, nome_subcategoria: str, delta: float) -> bool:
         """Se existir subcategoria com esse nome, incrementa seu peso_popularidade."""
         with self._lock:
-            for sub in getattr(self, "subcategorias", []):
-                if sub.nome == nome_subcategoria:
-                    sub.peso_popularidade = float(getattr(sub, "peso_popularidade", 0.0)) + float(delta)
-                    return True
-        return False
+            alterada = self._subcategorias.get(nome_subcategoria)
+            if alterada is not None:
+                alterada.peso_popularidade = float(getattr(alterada, "peso_popularidade", 0.0)) + float(delta)
+        if alterada is None:
+            return False
+        alterada._notificar("peso_categoria")
+        return True
 
     def incrementar_peso_popularidade_categoria(self, delta: float) -> None:
         """Incrementa o peso_popularidade desta categoria (sempre aplica)."""
         with self._lock:
             self.peso_popularidade = float(getattr(self, "peso_popularidade", 0.0)) + float(delta)
+        self._notificar("peso_categoria")
+
+    def aplicar_incrementos(self, delta_categoria: float = 0.0, deltas_produtos: Optional[Dict[str, float]] = None,
+                            limite: Optional[float] = None) -> int:
+        """Aplica de uma vez incrementos acumulados (ex.: lote de eventos de popularidade).
+        deltas_produtos: nome -> soma dos incrementos (nome exato ou, se não houver, sem diferenciar maiúsculas).
+        Com limite, nenhum peso passa desse valor. Retorna quantos produtos foram alterados."""
+        alterados: Dict[str, None] = {}   # nomes alterados, sem repetição e na ordem
+        with self._lock:
+            if delta_categoria:
+                peso = float(self.peso_popularidade) + float(delta_categoria)
+                self.peso_popularidade = min(peso, limite) if limite is not None else peso
+            for nome, delta in (deltas_produtos or {}).items():
+                if nome not in self._linhas:
+                    nome = self._buscar_produto_sem_caixa(nome)
+                    if nome is None:
+                        continue
+                linha = self._linhas[nome]
+                peso = self._pesos[linha] + float(delta)
+                self._pesos[linha] = min(peso, limite) if limite is not None else peso
+                alterados[nome] = None
+            if alterados:
+                self._ordenados_por_peso = None
+
+        if delta_categoria:
+            self._notificar("peso_categoria")
+        for nome in alterados:
+            self._notificar("peso_produto", nome)
+        return len(alterados)
+
     # =============================================================
     # 🔧 Gerenciamento de produtos
     # =============================================================
-    def adicionar_produto(self, produto: str, peso_produto: float = 1.0) -> None:
-        """Adiciona produto à categoria (com peso individual)."""
-        if not any(p["nome"] == produto for p in self.produtos):
-            self.produtos.append({"nome": produto, "peso_produto": peso_produto})
+    def adicionar_produto(self, produto: str, peso_produto: float = 1.0) -> bool:
+        """Adiciona produto à categoria (com peso individual). False se ele já existia."""
+        with self._lock:
+            adicionado = self._guardar_produto(produto, peso_produto)
+        if adicionado:
+            self._notificar("produto_adicionado", produto)
+        return adicionado
 
     def remover_produto(self, produto: str) -> bool:
         """Remove produto da categoria."""
-        for p in self.produtos:
-            if p["nome"] == produto:
-                self.produtos.remove(p)
-                return True
-        return False
+        with self._lock:
+            removido = self._descartar_produto(produto)
+        if removido is None:
+            return False
+        self._notificar("produto_removido", produto)
+        return True
 
     def aumentar_peso(self, incremento: float = 0.05) -> None:
         """Aumenta o peso de popularidade da categoria."""
-        self.peso_popularidade = min(self.peso_popularidade + incremento, 10.0)
+        with self._lock:
+            self.peso_popularidade = min(self.peso_popularidade + incremento, 10.0)
+        self._notificar("peso_categoria")
 
     def aumentar_peso_produto(self, produto_nome: str, incremento: float = 0.1) -> None:
         """Aumenta o peso de um produto específico."""
-        for p in self.produtos:
-            if p["nome"].lower() == produto_nome.lower():
-                p["peso_produto"] = min(p["peso_produto"] + incremento, 10.0)
-                break
+        with self._lock:
+            nome = self._buscar_produto_sem_caixa(produto_nome)
+            if nome is None:
+                return
+            linha = self._linhas[nome]
+            self._pesos[linha] = min(self._pesos[linha] + incremento, 10.0)
+            self._ordenados_por_peso = None
+        self._notificar("peso_produto", nome)
+
+    def obter_produto(self, nome_produto: str) -> Optional[Dict]:
+        """Retorna o dicionário (cópia) do produto com esse nome (ou None)."""
+        linha = self._linhas.get(nome_produto)
+        if linha is None:
+            return None
+        return {"nome": nome_produto, "peso_produto": self._pesos[linha]}
 
     def get_total_produtos(self) -> int:
         """Total de produtos diretos nesta categoria."""
-        return len(self.produtos)
+        return len(self._linhas)
 
     def get_produtos_ordenados_por_peso(self) -> List[Dict]:
-        """Retorna os produtos ordenados do mais pesado ao mais leve."""
-        return sorted(self.produtos, key=lambda x: x["peso_produto"], reverse=True)
+        """Retorna os produtos ordenados do mais pesado ao mais leve.
+        A ordenação fica em cache até um peso ou a lista de produtos mudar; cada
+        chamada recebe cópias dos dicionários, então alterá-los não afeta o cache."""
+        with self._lock:
+            ordenados = self._ordenados_por_peso
+            if ordenados is None:
+                ordenados = sorted(self.iter_produtos(), key=lambda x: x["peso_produto"], reverse=True)
+                self._ordenados_por_peso = ordenados
+            return [dict(produto) for produto in ordenados]
+
+    # =============================================================
+    # 📈 Operações em lote sobre os pesos (vetorizadas com NumPy)
+    # =============================================================
+    def mais_populares_produtos(self, k: int) -> List[Dict]:
+        """Os k produtos de maior peso sem ordenar a categoria inteira (argpartition)."""
+        with self._lock:
+            nomes = self._nomes
+            pesos = self._pesos
+            return [{"nome": nomes[linha], "peso_produto": pesos[linha]} for linha in pesos.maiores(k)]
+
+    def decair_pesos_produtos(self, fator: float) -> None:
+        """Multiplica o peso de todos os produtos pelo fator (ex.: 0.9 para envelhecer a popularidade)."""
+        with self._lock:
+            self._pesos.multiplicar(fator)
+            self._ordenados_por_peso = None
+        self._notificar("pesos_produtos")
+
+    def normalizar_pesos_produtos(self, maximo: float = 1.0) -> None:
+        """Escala os pesos dos produtos para que o maior valha 'maximo' (mantém a ordem)."""
+        with self._lock:
+            self._pesos.normalizar(maximo)
+            self._ordenados_por_peso = None
+        self._notificar("pesos_produtos")
 
     # =============================================================
     # 📂 Subcategorias
     # =============================================================
+    @property
+    def subcategorias(self) -> Tuple['Categoria', ...]:
+        """Subcategorias em ordem de inserção, numa tupla (somente leitura): altere pelos
+        métodos da categoria."""
+        with self._lock:
+            return tuple(self._subcategorias.values())
+
+    def iter_subcategorias(self) -> Iterator['Categoria']:
+        """Percorre as subcategorias sem copiar a coleção."""
+        return iter(self._subcategorias.values())
+
+    def get_total_subcategorias(self) -> int:
+        """Total de subcategorias diretas."""
+        return len(self._subcategorias)
+
+    def obter_subcategoria(self, nome_sub: str, ignorar_caixa: bool = False) -> Optional['Categoria']:
+        """Subcategoria direta com esse nome em O(1) (ou None)."""
+        if not ignorar_caixa:
+            return self._subcategorias.get(nome_sub)
+        nomes = self._subcategorias_normalizadas.get(nome_sub.lower())
+        return self._subcategorias[nomes[0]] if nomes else None
+
+    def resolver_caminho(self, caminho: Union[str, Sequence[str]], ignorar_caixa: bool = False) -> Optional['Categoria']:
+        """Desce pelos níveis de 'Sub > Sub da sub > ...' a partir desta categoria (O(1) por nível).
+        Caminho vazio retorna a própria categoria."""
+        atual = self
+        for nome in dividir_caminho(caminho):
+            atual = atual.obter_subcategoria(nome, ignorar_caixa)
+            if atual is None:
+                return None
+        return atual
+
     def adicionar_subcategoria(self, subcategoria: 'Categoria') -> None:
         """Adiciona subcategoria, evitando duplicação."""
-        if not any(sc.nome == subcategoria.nome for sc in self.subcategorias):
-            self.subcategorias.append(subcategoria)
+        with self._lock:
+            if subcategoria.nome in self._subcategorias:
+                return
+            self._subcategorias[subcategoria.nome] = subcategoria
+            self._subcategorias_normalizadas.setdefault(subcategoria.nome.lower(), []).append(subcategoria.nome)
+        self._notificar("subcategoria_adicionada", subcategoria)
 
     def remover_subcategoria(self, nome_sub: str) -> bool:
         """Remove uma subcategoria pelo nome."""
-        for sub in self.subcategorias:
-            if sub.nome.lower() == nome_sub.lower():
-                self.subcategorias.remove(sub)
-                return True
-        return False
+        with self._lock:
+            sub = self.obter_subcategoria(nome_sub, ignorar_caixa=True)
+            if sub is None:
+                return False
+            del self._subcategorias[sub.nome]
+            nomes = self._subcategorias_normalizadas[sub.nome.lower()]
+            nomes.remove(sub.nome)
+            if not nomes:
+                del self._subcategorias_normalizadas[sub.nome.lower()]
+        self._notificar("subcategoria_removida", sub)
+        return True
 
     def imprimir_subcategorias(self, prefixo: str = "") -> None:
         """Imprime recursivamente subcategorias e produtos."""
-        for i, subcat in enumerate(self.subcategorias):
-            connector = "└── " if i == len(self.subcategorias) - 1 else "├── "
-            linha = prefixo + connector + f"{subcat.nome} ({len(subcat.produtos)} produtos, peso={subcat.peso_popularidade:.2f})"
+        ultima = self.get_total_subcategorias() - 1
+        for i, subcat in enumerate(self.iter_subcategorias()):
+            connector = "└── " if i == ultima else "├── "
+            linha = prefixo + connector + f"{subcat.nome} ({subcat.get_total_produtos()} produtos, peso={subcat.peso_popularidade:.2f})"
             print(linha)
 
-            if subcat.produtos:
-                produtos_preview = ', '.join(p["nome"] for p in subcat.produtos[:5])
-                if len(subcat.produtos) > 5:
+            if subcat.get_total_produtos():
+                produtos_preview = ', '.join(p["nome"] for p in islice(subcat.iter_produtos(), 5))
+                if subcat.get_total_produtos() > 5:
                     produtos_preview += "..."
-                print(prefixo + ("    " if i == len(self.subcategorias) - 1 else "│   ") + f"└─ Produtos: {produtos_preview}")
+                print(prefixo + ("    " if i == ultima else "│   ") + f"└─ Produtos: {produtos_preview}")
 
-            novo_prefixo = prefixo + ("    " if i == len(self.subcategorias) - 1 else "│   ")
-            if subcat.subcategorias:
+            novo_prefixo = prefixo + ("    " if i == ultima else "│   ")
+            if subcat.get_total_subcategorias():
                 subcat.imprimir_subcategorias(novo_prefixo)
 
+    # =============================================================
+    # 📦 Serialização (pickle / envio a outros processos / catálogo em disco)
+    # =============================================================
+    def exportar_produtos(self) -> Tuple[List[str], bytes]:
+        """Nomes (ordem de inserção) e pesos em float64 little-endian, lidos de uma só vez."""
+        with self._lock:
+            return list(self._linhas), self._pesos.para_bytes(self._linhas.values())
+
+    @classmethod
+    def de_colunas(cls, nome: str, nomes: List[str], pesos: bytes, peso_popularidade: float = 1.0) -> 'Categoria':
+        """Monta a categoria direto das colunas (inverso de exportar_produtos), sem inserir produto a produto."""
+        categoria = cls(nome, peso_popularidade=peso_popularidade)
+        categoria._nomes = nomes
+        categoria._pesos = ColunaPesos.de_bytes(pesos)
+        categoria._linhas = dict(zip(nomes, range(len(nomes))))
+        if len(categoria._linhas) != len(nomes):
+            raise ValueError(f"Produtos com nome repetido na categoria '{nome}'")
+        normalizados = categoria._nomes_normalizados
+        for produto in nomes:
+            normalizados.setdefault(produto.lower(), []).append(produto)
+        return categoria
+
+    def __getstate__(self) -> dict:
+        """Estado copiável: sem a trava, sem ouvintes (pertencem ao processo atual) e sem cache."""
+        with self._lock:
+            estado = self.__dict__.copy()
+        del estado["_lock"]
+        estado["_ouvintes"] = []
+        estado["_ordenados_por_peso"] = None
+        return estado
+
+    def __setstate__(self, estado: dict) -> None:
+        self.__dict__.update(estado)
+        self._lock = Lock()
+
     # =============================================================
     # 🧾 Representações e comparações
     # =============================================================
     def __str__(self) -> str:
-        return f"Categoria({self.nome}, {len(self.produtos)} produtos)"
+        return f"Categoria({self.nome}, {self.get_total_produtos()} produtos)"
 
     def __repr__(self) -> str:
         return self.__str__()
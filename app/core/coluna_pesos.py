@@ -0,0 +1,146 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import heapq
+from array import array
+from typing import Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele a coluna usa array('d') e laços em Python
+    np = None
+
+NUMPY_DISPONIVEL = np is not None
+
+
+class ColunaPesos:
+    """
+    Coluna contígua de pesos (float64), uma linha por produto.
+
+    Com NumPy os dados ficam num ndarray com capacidade extra (crescimento
+    amortizado) e as operações em lote (decaimento, normalização, top-k)
+    são vetorizadas. Sem NumPy a mesma interface funciona sobre array('d').
+    A remoção troca a linha removida pela última (O(1)), então quem usa a
+    coluna precisa atualizar o mapeamento da linha movida.
+    """
+
+    # Inicialização da coluna
+    def __init__(self, capacidade: int = 8, usar_numpy: Optional[bool] = None):
+        self.usar_numpy = NUMPY_DISPONIVEL if usar_numpy is None else (usar_numpy and NUMPY_DISPONIVEL)
+        self.tamanho: int = 0
+        if self.usar_numpy:
+            self._dados = np.empty(max(capacidade, 1), dtype=np.float64)
+        else:
+            self._dados = array("d")
+
+    # Acesso por linha
+
+    # Peso da linha
+    def __getitem__(self, linha: int) -> float:
+        return float(self._dados[linha])
+
+    # Troca o peso da linha
+    def __setitem__(self, linha: int, peso: float) -> None:
+        self._dados[linha] = peso
+
+    # Quantidade de linhas
+    def __len__(self) -> int:
+        return self.tamanho
+
+    # Pesos válidos (visão do ndarray ou o próprio array('d'))
+    def valores(self):
+        return self._dados[:self.tamanho] if self.usar_numpy else self._dados
+
+    # Inserção/remoção
+
+    # Acrescenta uma linha no final e retorna seu índice
+    def anexar(self, peso: float) -> int:
+        if self.usar_numpy:
+            if self.tamanho == len(self._dados):
+                novo = np.empty(len(self._dados) * 2, dtype=np.float64)
+                novo[:self.tamanho] = self._dados[:self.tamanho]
+                self._dados = novo
+            self._dados[self.tamanho] = peso
+        else:
+            self._dados.append(peso)
+        self.tamanho += 1
+        return self.tamanho - 1
+
+    # Remove a linha movendo a última para o lugar dela (retorna o índice de onde a última saiu, ou None)
+    def remover_trocando(self, linha: int) -> Optional[int]:
+        ultima = self.tamanho - 1
+        movida = None
+        if linha != ultima:
+            self._dados[linha] = self._dados[ultima]
+            movida = ultima
+        if not self.usar_numpy:
+            self._dados.pop()
+        self.tamanho -= 1
+        return movida
+
+    # Serialização (float64 little-endian, independente da plataforma)
+
+    # Pesos das linhas informadas (todas, na ordem das linhas, se None) como bytes
+    def para_bytes(self, linhas: Optional[Iterable[int]] = None) -> bytes:
+        if self.usar_numpy:
+            valores = self._dados[:self.tamanho]
+            if linhas is not None:
+                valores = valores[np.fromiter(linhas, dtype=np.intp)]
+            return valores.astype("<f8", copy=False).tobytes()
+        dados = self._dados if linhas is None else array("d", (self._dados[i] for i in linhas))
+        if sys.byteorder == "big":
+            dados = array("d", dados)
+            dados.byteswap()
+        return dados.tobytes()
+
+    # Coluna a partir dos bytes gerados por para_bytes
+    @classmethod
+    def de_bytes(cls, dados, usar_numpy: Optional[bool] = None) -> 'ColunaPesos':
+        n = len(dados) // 8
+        coluna = cls(n, usar_numpy)
+        if coluna.usar_numpy:
+            coluna._dados[:n] = np.frombuffer(dados, dtype="<f8", count=n)
+        else:
+            coluna._dados.frombytes(dados)
+            if sys.byteorder == "big":
+                coluna._dados.byteswap()
+        coluna.tamanho = n
+        return coluna
+
+    # Operações em lote
+
+    # Multiplica todos os pesos pelo fator (ex.: decaimento de popularidade)
+    def multiplicar(self, fator: float) -> None:
+        if self.usar_numpy:
+            self._dados[:self.tamanho] *= fator
+        else:
+            dados = self._dados
+            for i in range(self.tamanho):
+                dados[i] *= fator
+
+    # Escala os pesos para que o maior valha 'maximo' (não altera se todos forem zero)
+    def normalizar(self, maximo: float = 1.0) -> None:
+        if not self.tamanho:
+            return
+        if self.usar_numpy:
+            maior = float(np.abs(self._dados[:self.tamanho]).max())
+        else:
+            maior = max(abs(p) for p in self._dados)
+        if maior > 0:
+            self.multiplicar(maximo / maior)
+
+    # Linhas dos k maiores pesos, do maior ao menor: O(n + k log k) com argpartition
+    def maiores(self, k: int) -> List[int]:
+        k = min(k, self.tamanho)
+        if k <= 0:
+            return []
+        if self.usar_numpy:
+            valores = self._dados[:self.tamanho]
+            if k < self.tamanho:
+                candidatas = np.argpartition(-valores, k - 1)[:k]
+            else:
+                candidatas = np.arange(self.tamanho)
+            ordem = candidatas[np.argsort(-valores[candidatas], kind="stable")]
+            return ordem.tolist()
+        return heapq.nlargest(k, range(self.tamanho), key=self._dados.__getitem__)
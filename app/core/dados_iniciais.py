@@ -0,0 +1,20 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from typing import List
+from app.core.categoria import Categoria
+
+
+def criar_categorias_iniciais() -> List[Categoria]:
+    """Categorias, subcategorias e produtos de demonstração (usados quando não há catálogo salvo)."""
+    bebidas = Categoria("Bebidas", ["Suco de Uva", "Refrigerante", "Água Mineral"], peso_popularidade=4.0)
+    eletronicos = Categoria("Eletrônicos", ["Celular", "Notebook", "Fone JBL"], peso_popularidade=3.0)
+    acessorios = Categoria("Acessórios", ["Cabo HDMI", "Mouse Gamer"], peso_popularidade=2.0)
+    eletronicos.adicionar_subcategoria(acessorios)
+
+    bananinha = Categoria("Bananinha", ["Banana Chips", "Banana Passa"], peso_popularidade=5.0)
+    bananas_gourmet = Categoria("Bananas Gourmet", ["Banana Flambada", "Banana com Chocolate"], peso_popularidade=2.0)
+    bananinha.adicionar_subcategoria(bananas_gourmet)
+
+    return [bebidas, eletronicos, bananinha]
@@ -0,0 +1,264 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from typing import Optional, List, Dict, Iterator, Tuple
+from itertools import islice
+
+
+class NoIndice:
+    """Nó do índice de popularidade: guarda só a chave ordenável (-peso, identificador)."""
+
+    __slots__ = ("chave", "esquerda", "direita", "altura", "tamanho")
+
+    # Inicialização do nó
+    def __init__(self, chave: Tuple):
+        self.chave = chave
+        self.esquerda: Optional[NoIndice] = None
+        self.direita: Optional[NoIndice] = None
+        self.altura: int = 1
+        self.tamanho: int = 1   # nós da subárvore (estatística de ordem)
+
+    # Representação em string
+    def __str__(self) -> str:
+        return f"NoIndice({self.chave[1]!r}, peso={-self.chave[0]})"
+
+
+class IndicePopularidade:
+    """
+    Índice secundário ordenado por popularidade.
+
+    Árvore AVL com estatística de ordem cuja chave é (-peso, identificador):
+    o percurso em ordem vai do mais popular ao menos popular, com empates em
+    ordem do identificador. Alterar o peso de uma entrada a reposiciona em
+    O(log n) e os N primeiros (ou qualquer página) saem em O(log n + N),
+    sem ordenar a coleção a cada consulta.
+    """
+
+    # Inicialização do índice
+    def __init__(self):
+        self.raiz: Optional[NoIndice] = None
+        self._entradas: Dict = {}   # identificador -> (peso, item)
+
+    # Auxiliares de altura/tamanho/rotação
+
+    # Retorna altura do nó
+    def _altura(self, no: Optional[NoIndice]) -> int:
+        return no.altura if no else 0
+
+    # Retorna quantidade de nós da subárvore
+    def _tamanho(self, no: Optional[NoIndice]) -> int:
+        return no.tamanho if no else 0
+
+    # Atualiza altura e tamanho do nó a partir dos filhos
+    def _atualizar(self, no: NoIndice) -> None:
+        no.altura = 1 + max(self._altura(no.esquerda), self._altura(no.direita))
+        no.tamanho = 1 + self._tamanho(no.esquerda) + self._tamanho(no.direita)
+
+    # Rotação simples à direita
+    def _rotacao_direita(self, z: NoIndice) -> NoIndice:
+        y = z.esquerda
+        z.esquerda = y.direita
+        y.direita = z
+        self._atualizar(z)
+        self._atualizar(y)
+        return y
+
+    # Rotação simples à esquerda
+    def _rotacao_esquerda(self, z: NoIndice) -> NoIndice:
+        y = z.direita
+        z.direita = y.esquerda
+        y.esquerda = z
+        self._atualizar(z)
+        self._atualizar(y)
+        return y
+
+    # Atualiza o nó e aplica a rotação necessária (retorna a nova raiz da subárvore)
+    def _balancear(self, no: NoIndice) -> NoIndice:
+        self._atualizar(no)
+        fb = self._altura(no.esquerda) - self._altura(no.direita)
+        if fb > 1:
+            if self._altura(no.esquerda.esquerda) < self._altura(no.esquerda.direita):
+                no.esquerda = self._rotacao_esquerda(no.esquerda)
+            return self._rotacao_direita(no)
+        if fb < -1:
+            if self._altura(no.direita.direita) < self._altura(no.direita.esquerda):
+                no.direita = self._rotacao_direita(no.direita)
+            return self._rotacao_esquerda(no)
+        return no
+
+    # Inserção/remoção na árvore (chaves já no formato (-peso, identificador))
+
+    # Insere a chave recursivamente
+    def _inserir(self, no: Optional[NoIndice], chave: Tuple) -> NoIndice:
+        if no is None:
+            return NoIndice(chave)
+        if chave < no.chave:
+            no.esquerda = self._inserir(no.esquerda, chave)
+        else:
+            no.direita = self._inserir(no.direita, chave)
+        return self._balancear(no)
+
+    # Remove a chave recursivamente (a chave sempre existe: o dicionário de entradas garante)
+    def _remover(self, no: Optional[NoIndice], chave: Tuple) -> Optional[NoIndice]:
+        if no is None:
+            return None
+        if chave < no.chave:
+            no.esquerda = self._remover(no.esquerda, chave)
+        elif chave > no.chave:
+            no.direita = self._remover(no.direita, chave)
+        else:
+            if no.esquerda is None:
+                return no.direita
+            if no.direita is None:
+                return no.esquerda
+            # Dois filhos: recebe a chave do sucessor, que sai da subárvore direita
+            sucessor = no.direita
+            while sucessor.esquerda:
+                sucessor = sucessor.esquerda
+            no.chave = sucessor.chave
+            no.direita = self._remover(no.direita, sucessor.chave)
+        return self._balancear(no)
+
+    # Operações públicas
+
+    # Insere a entrada (se já existir, apenas atualiza peso e item; retorna True se era nova)
+    def inserir(self, identificador, peso: float, item=None) -> bool:
+        if identificador in self._entradas:
+            self.atualizar(identificador, peso, item)
+            return False
+        self._entradas[identificador] = (peso, item)
+        self.raiz = self._inserir(self.raiz, (-peso, identificador))
+        return True
+
+    # Reposiciona a entrada com o novo peso em O(log n) (retorna False se não existir)
+    def atualizar(self, identificador, peso: float, item=None) -> bool:
+        atual = self._entradas.get(identificador)
+        if atual is None:
+            return False
+        peso_antigo, item_antigo = atual
+        self._entradas[identificador] = (peso, item_antigo if item is None else item)
+        if peso != peso_antigo:
+            self.raiz = self._remover(self.raiz, (-peso_antigo, identificador))
+            self.raiz = self._inserir(self.raiz, (-peso, identificador))
+        return True
+
+    # Remove a entrada (retorna False se não existir)
+    def remover(self, identificador) -> bool:
+        atual = self._entradas.pop(identificador, None)
+        if atual is None:
+            return False
+        self.raiz = self._remover(self.raiz, (-atual[0], identificador))
+        return True
+
+    # Substitui o conteúdo por entradas (identificador, peso, item) já na ordem do ranking
+    # (maior peso primeiro; empates pelo identificador): árvore balanceada montada em O(n)
+    def carregar_ordenado(self, entradas) -> None:
+        self.limpar()
+        chaves: List[Tuple] = []
+        for identificador, peso, item in entradas:
+            chave = (-peso, identificador)
+            if chaves and chave <= chaves[-1]:
+                raise ValueError(f"Entradas fora de ordem ou repetidas: {identificador!r}")
+            chaves.append(chave)
+            self._entradas[identificador] = (peso, item)
+        self.raiz = self._construir_balanceada(chaves, 0, len(chaves))
+
+    # Monta subárvore balanceada com chaves[inicio:fim]
+    def _construir_balanceada(self, chaves: List[Tuple], inicio: int, fim: int) -> Optional[NoIndice]:
+        if inicio >= fim:
+            return None
+        meio = (inicio + fim) // 2
+        no = NoIndice(chaves[meio])
+        no.esquerda = self._construir_balanceada(chaves, inicio, meio)
+        no.direita = self._construir_balanceada(chaves, meio + 1, fim)
+        self._atualizar(no)
+        return no
+
+    # Remove tudo
+    def limpar(self) -> None:
+        self.raiz = None
+        self._entradas.clear()
+
+    # Consultas
+
+    # Peso atual da entrada (ou None)
+    def peso(self, identificador) -> Optional[float]:
+        atual = self._entradas.get(identificador)
+        return atual[0] if atual else None
+
+    # Item associado à entrada (ou None)
+    def obter(self, identificador):
+        atual = self._entradas.get(identificador)
+        return atual[1] if atual else None
+
+    # Posição da entrada no ranking (0 = mais popular; -1 se não existir)
+    def posicao(self, identificador) -> int:
+        atual = self._entradas.get(identificador)
+        if atual is None:
+            return -1
+        chave = (-atual[0], identificador)
+        rank = 0
+        no = self.raiz
+        while no:
+            if chave < no.chave:
+                no = no.esquerda
+            elif chave > no.chave:
+                rank += 1 + self._tamanho(no.esquerda)
+                no = no.direita
+            else:
+                return rank + self._tamanho(no.esquerda)
+        return -1
+
+    # Entrada (identificador, peso) na posição i do ranking (ou None)
+    def selecionar(self, i: int) -> Optional[Tuple]:
+        if i < 0 or i >= len(self._entradas):
+            return None
+        no = self.raiz
+        while no:
+            te = self._tamanho(no.esquerda)
+            if i < te:
+                no = no.esquerda
+            elif i == te:
+                return no.chave[1], -no.chave[0]
+            else:
+                i -= te + 1
+                no = no.direita
+        return None
+
+    # Percorre (identificador, peso) do mais popular ao menos popular a partir da posição inicio
+    def iterar(self, inicio: int = 0) -> Iterator[Tuple]:
+        pilha: List[NoIndice] = []
+        no = self.raiz
+        i = max(inicio, 0)
+        # Desce pelo tamanho das subárvores até a posição inicial: O(log n)
+        while no:
+            te = self._tamanho(no.esquerda)
+            if i < te:
+                pilha.append(no)
+                no = no.esquerda
+            elif i == te:
+                pilha.append(no)
+                break
+            else:
+                i -= te + 1
+                no = no.direita
+        while pilha:
+            no = pilha.pop()
+            yield no.chave[1], -no.chave[0]
+            no = no.direita
+            while no:
+                pilha.append(no)
+                no = no.esquerda
+
+    # Os n mais populares, do maior ao menor peso: O(log n + n)
+    def maiores(self, n: int) -> List[Tuple]:
+        return list(islice(self.iterar(), max(n, 0)))
+
+    # Total de entradas
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    # Verifica se o identificador está indexado
+    def __contains__(self, identificador) -> bool:
+        return identificador in self._entradas
@@ -0,0 +1,339 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import heapq
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Optional, List, Dict, Iterator, Tuple
+
+_peso = itemgetter(0)
+
+
+class NoTrie:
+    """Nó da árvore radix: a aresta que chega até ele carrega um rótulo (trecho da chave)."""
+
+    __slots__ = ("rotulo", "filhos", "itens", "melhores", "sujo")
+
+    # Inicialização do nó
+    def __init__(self, rotulo: str = ""):
+        self.rotulo = rotulo
+        self.filhos: Dict[str, 'NoTrie'] = {}   # primeiro caractere do rótulo -> filho
+        self.itens: List[Tuple] = []            # (peso, item) cuja chave termina neste nó
+        self.melhores: List[Tuple] = []         # top-k (peso, item) da subárvore, do maior ao menor
+        self.sujo: bool = True                  # melhores precisa ser recalculado
+
+    # Representação em string
+    def __str__(self) -> str:
+        return f"NoTrie({self.rotulo!r}, filhos={len(self.filhos)}, itens={len(self.itens)})"
+
+
+# Tamanho do maior prefixo comum entre duas strings
+def _prefixo_comum(a: str, b: str) -> int:
+    limite = min(len(a), len(b))
+    i = 0
+    while i < limite and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class TriePrefixos:
+    """
+    Trie compactada (árvore radix) para autocomplete.
+
+    Chaves com o mesmo início compartilham os nós do trecho comum e não há
+    limite de tamanho de prefixo. Cada chave pode guardar vários itens
+    (ex.: o mesmo produto em categorias diferentes), cada um com um peso.
+
+    Todo nó guarda os k itens de maior peso da sua subárvore, então o
+    ranking de um prefixo custa O(tamanho do prefixo + k).
+    """
+
+    # Inicialização da trie
+    def __init__(self, k: int = 15):
+        self.k = k
+        self.raiz = NoTrie()
+        self.total_itens: int = 0
+        self._lotes: int = 0
+
+    # Inserção
+
+    # Insere item sob a chave (retorna False se o item já existia)
+    def inserir(self, chave: str, item, peso=0.0) -> bool:
+        if not chave:
+            return False
+
+        no = self.raiz
+        no.sujo = True
+        resto = chave
+        while resto:
+            filho = no.filhos.get(resto[0])
+
+            # Nenhuma aresta começa com esse caractere: cria folha com o resto
+            if filho is None:
+                novo = NoTrie(resto)
+                no.filhos[resto[0]] = novo
+                no = novo
+                break
+
+            comum = _prefixo_comum(filho.rotulo, resto)
+
+            # Chave diverge no meio da aresta: divide o rótulo
+            if comum < len(filho.rotulo):
+                meio = NoTrie(filho.rotulo[:comum])
+                filho.rotulo = filho.rotulo[comum:]
+                meio.filhos[filho.rotulo[0]] = filho
+                no.filhos[resto[0]] = meio
+                filho = meio
+
+            no = filho
+            no.sujo = True
+            resto = resto[comum:]
+
+        if self._posicao(no, item) >= 0:
+            self._atualizar_melhores()
+            return False
+        no.itens.append((peso, item))
+        self.total_itens += 1
+        self._atualizar_melhores()
+        return True
+
+    # Atualização de pesos
+
+    # Troca o peso de um item já inserido (retorna False se não existir)
+    def atualizar_peso(self, chave: str, item, peso) -> bool:
+        caminho = self._caminho_exato(chave)
+        if not caminho:
+            return False
+        no = caminho[-1]
+        i = self._posicao(no, item)
+        if i < 0:
+            return False
+        if no.itens[i][0] != peso:
+            no.itens[i] = (peso, no.itens[i][1])
+            for n in caminho:
+                n.sujo = True
+            self._atualizar_melhores()
+        return True
+
+    # Agrupa várias alterações e recalcula cada nó afetado uma única vez no final
+    @contextmanager
+    def lote(self):
+        self._lotes += 1
+        try:
+            yield self
+        finally:
+            self._lotes -= 1
+            self._atualizar_melhores()
+
+    # Incorpora os itens de outra trie com o mesmo k (ex.: índices parciais montados em paralelo).
+    # Subárvores que só existem na outra são encaixadas sem cópia e mantêm o top-k já calculado;
+    # os nós dela passam a pertencer a esta trie, então 'outra' não deve mais ser usada.
+    def mesclar(self, outra: 'TriePrefixos') -> None:
+        if outra.k != self.k:
+            raise ValueError(f"Tries com k diferentes não podem ser mescladas ({self.k} != {outra.k})")
+        # Itens repetidos (mesma chave e item nas duas) são descontados ao aparecer
+        self.total_itens += outra.total_itens
+        pilha = [(self.raiz, outra.raiz)]
+        while pilha:
+            destino, origem = pilha.pop()
+            destino.sujo = True
+            for peso, item in origem.itens:
+                if self._posicao(destino, item) < 0:
+                    destino.itens.append((peso, item))
+                else:
+                    self.total_itens -= 1
+
+            for c, filho in origem.filhos.items():
+                atual = destino.filhos.get(c)
+                if atual is None:
+                    destino.filhos[c] = filho
+                    continue
+
+                comum = _prefixo_comum(atual.rotulo, filho.rotulo)
+                # Rótulo desta trie vai além do trecho comum: divide a aresta
+                if comum < len(atual.rotulo):
+                    meio = NoTrie(atual.rotulo[:comum])
+                    atual.rotulo = atual.rotulo[comum:]
+                    meio.filhos[atual.rotulo[0]] = atual
+                    destino.filhos[c] = meio
+                    atual = meio
+
+                # Rótulo da outra vai além: o resto dele vira filho de um nó vazio no mesmo ponto
+                if comum < len(filho.rotulo):
+                    filho.rotulo = filho.rotulo[comum:]
+                    ponte = NoTrie()
+                    ponte.filhos[filho.rotulo[0]] = filho
+                    filho = ponte
+                pilha.append((atual, filho))
+        self._atualizar_melhores()
+
+    # Remoção
+
+    # Remove item da chave e compacta nós que ficaram desnecessários
+    def remover(self, chave: str, item) -> bool:
+        caminho = self._caminho_exato(chave)
+        if not caminho:
+            return False
+
+        no = caminho[-1]
+        i = self._posicao(no, item)
+        if i < 0:
+            return False
+        del no.itens[i]
+        self.total_itens -= 1
+        for n in caminho:
+            n.sujo = True
+
+        # Sobe pelo caminho removendo folhas vazias e juntando nós com filho único
+        for i in range(len(caminho) - 1, 0, -1):
+            atual = caminho[i]
+            pai = caminho[i - 1]
+            if atual.itens:
+                break
+            if not atual.filhos:
+                del pai.filhos[atual.rotulo[0]]
+                continue
+            if len(atual.filhos) == 1:
+                unico = next(iter(atual.filhos.values()))
+                unico.rotulo = atual.rotulo + unico.rotulo
+                pai.filhos[unico.rotulo[0]] = unico
+            break
+        self._atualizar_melhores()
+        return True
+
+    # Remove tudo
+    def limpar(self) -> None:
+        self.raiz = NoTrie()
+        self.total_itens = 0
+        self._atualizar_melhores()
+
+    # Busca
+
+    # Retorna os itens com exatamente essa chave
+    def buscar(self, chave: str) -> List:
+        caminho = self._caminho_exato(chave)
+        return [item for _, item in caminho[-1].itens] if caminho else []
+
+    # Os itens de maior peso com o prefixo, do maior ao menor: O(|prefixo| + k)
+    def melhores(self, prefixo: str, k: Optional[int] = None) -> List:
+        return [item for _, item in self.melhores_com_peso(prefixo, k)]
+
+    # Mesmo que melhores, mas com os pares (peso, item) (ex.: para mesclar rankings de várias tries)
+    def melhores_com_peso(self, prefixo: str, k: Optional[int] = None) -> List[Tuple]:
+        k = self.k if k is None else k
+        no = self._no_do_prefixo(prefixo)
+        if no is None or k <= 0:
+            return []
+        if k <= self.k:
+            return no.melhores[:k]
+        # Pedido maior que o top-k guardado: percorre a subárvore inteira
+        return heapq.nlargest(k, self._pares(no), key=_peso)
+
+    # Percorre preguiçosamente todos os itens cuja chave começa com o prefixo
+    def buscar_prefixo(self, prefixo: str) -> Iterator:
+        no = self._no_do_prefixo(prefixo)
+        if no is None:
+            return
+        for _, item in self._pares(no):
+            yield item
+
+    # Percorre preguiçosamente as chaves armazenadas (em ordem alfabética)
+    def chaves(self) -> Iterator[str]:
+        pilha: List[Tuple[NoTrie, str]] = [(self.raiz, "")]
+        while pilha:
+            atual, prefixo = pilha.pop()
+            chave = prefixo + atual.rotulo
+            if atual.itens:
+                yield chave
+            for c in sorted(atual.filhos, reverse=True):
+                pilha.append((atual.filhos[c], chave))
+
+    # Métodos auxiliares
+
+    # Percorre os pares (peso, item) da subárvore em ordem alfabética de chave
+    def _pares(self, no: NoTrie) -> Iterator[Tuple]:
+        pilha = [no]
+        while pilha:
+            atual = pilha.pop()
+            yield from atual.itens
+            # Empilha em ordem inversa para visitar os filhos em ordem alfabética
+            for c in sorted(atual.filhos, reverse=True):
+                pilha.append(atual.filhos[c])
+
+    # Índice do item na lista do nó (-1 se ausente)
+    def _posicao(self, no: NoTrie, item) -> int:
+        for i, (_, existente) in enumerate(no.itens):
+            if existente == item:
+                return i
+        return -1
+
+    # Recalcula o top-k de um nó a partir dos seus itens e do top-k dos filhos
+    def _recalcular(self, no: NoTrie) -> None:
+        candidatos = list(no.itens)
+        for c in sorted(no.filhos):
+            candidatos.extend(no.filhos[c].melhores)
+        no.melhores = heapq.nlargest(self.k, candidatos, key=_peso)
+        no.sujo = False
+
+    # Recalcula, dos filhos para os pais, apenas os nós marcados como sujos
+    def _atualizar_melhores(self) -> None:
+        if self._lotes or not self.raiz.sujo:
+            return
+        pilha = [(self.raiz, False)]
+        while pilha:
+            no, filhos_prontos = pilha.pop()
+            if filhos_prontos:
+                self._recalcular(no)
+                continue
+            pilha.append((no, True))
+            for filho in no.filhos.values():
+                if filho.sujo:
+                    pilha.append((filho, False))
+
+    # Lista de nós da raiz até o nó que termina exatamente na chave
+    def _caminho_exato(self, chave: str) -> Optional[List[NoTrie]]:
+        if not chave:
+            return None
+        caminho = [self.raiz]
+        no = self.raiz
+        resto = chave
+        while resto:
+            filho = no.filhos.get(resto[0])
+            if filho is None or not resto.startswith(filho.rotulo):
+                return None
+            resto = resto[len(filho.rotulo):]
+            no = filho
+            caminho.append(no)
+        return caminho
+
+    # Nó cuja subárvore contém todas as chaves com o prefixo
+    def _no_do_prefixo(self, prefixo: str) -> Optional[NoTrie]:
+        no = self.raiz
+        resto = prefixo
+        while resto:
+            filho = no.filhos.get(resto[0])
+            if filho is None:
+                return None
+            if resto.startswith(filho.rotulo):
+                resto = resto[len(filho.rotulo):]
+            elif filho.rotulo.startswith(resto):
+                resto = ""
+            else:
+                return None
+            no = filho
+        return no
+
+    # Total de itens armazenados
+    def __len__(self) -> int:
+        return self.total_itens
+
+    # Quantidade de nós (útil para medir o compartilhamento de prefixos)
+    def contar_nos(self) -> int:
+        total = 0
+        pilha = [self.raiz]
+        while pilha:
+            atual = pilha.pop()
+            total += 1
+            pilha.extend(atual.filhos.values())
+        return total
@@ -1,35 +1,177 @@
 import sys
 import os
+import json
+import atexit
+import threading
+from contextlib import contextmanager
+from itertools import count, islice
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from flask import Flask, request, jsonify, render_template
-from app.core.arvore_avl import ArvoreAVL
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
+from app.core.arvore_avl_persistente import ArvoreAVLPersistente
 from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
 from app.services.recomendacao_service import RecomendacaoService
+from app.services.persistencia_catalogo import (
+    CAMINHO_CATALOGO_PADRAO, carregar_ou_inicializar, registro_do_catalogo, salvar_catalogo
+)
+from app.services.diario_alteracoes import DiarioAlteracoes, reaplicar_diario
+from app.services.catalogo_mmap import CatalogoMapeado, compilar_catalogo_mmap
+from app.services.importador import FORMATOS, formato_do_arquivo, importar_arquivo
 from app.utils.logger import Logger
+from app.utils.rwlock import TravaLeituraEscrita
 
 app = Flask(__name__)
 
 # Inicializar componentes core
 logger = Logger("SRHP-Web")
-arvore = ArvoreAVL()
+# Versões imutáveis: leituras da API percorrem um snapshot sem esperar as escritas
+arvore = ArvoreAVLPersistente()
 recomendador = RecomendacaoService(arvore)
 
+# Catálogo em disco (pesos aprendidos sobrevivem ao reinício); definido em inicializar()
+CAMINHO_CATALOGO = CAMINHO_CATALOGO_PADRAO
+# Diário das alterações feitas desde o último catálogo salvo (ativo com SRHP_CATALOGO definida)
+CAMINHO_DIARIO = f"{CAMINHO_CATALOGO}.diario"
+diario = None
+# Com SRHP_CATALOGO_MAPEADO definida, sugestões e detalhes de categoria são lidos de um
+# arquivo mapeado em memória (somente leitura), compilado na inicialização e ao salvar.
+# Uma alteração feita pela API o deixa desatualizado: até a próxima compilação, essas
+# leituras voltam para a árvore (o que foi criado é encontrado logo em seguida).
+CAMINHO_CATALOGO_MAPEADO = None
+catalogo_mapeado = None
+_contador_alteracoes = count(1)
+_ultima_alteracao = 0      # número da última alteração iniciada pela API
+_alteracao_mapeada = 0     # última alteração contida no arquivo mapeado
+# Leituras do arquivo mapeado (compartilhada) x troca pelo recompilado (exclusiva):
+# o anterior só é fechado quando nenhuma leitura o usa mais
+_trava_mapeado = TravaLeituraEscrita()
+_trava_compilacao = threading.Lock()
+
 def _carregar_dados_iniciais():
     """Carrega dados iniciais na árvore"""
-    bebidas = Categoria("Bebidas", ["Suco de Uva", "Refrigerante", "Água Mineral"], peso_popularidade=4.0)
-    eletronicos = Categoria("Eletrônicos", ["Celular", "Notebook", "Fone JBL"], peso_popularidade=3.0)
-    acessorios = Categoria("Acessórios", ["Cabo HDMI", "Mouse Gamer"], peso_popularidade=2.0)
-    eletronicos.adicionar_subcategoria(acessorios)
-    bananinha = Categoria("Bananinha", ["Banana Chips", "Banana Passa"], peso_popularidade=5.0)
-    bananas_gourmet = Categoria("Bananas Gourmet", ["Banana Flambada", "Banana com Chocolate"], peso_popularidade=2.0)
-    bananinha.adicionar_subcategoria(bananas_gourmet)
-    for c in [bebidas, eletronicos, bananinha]:
-        arvore.inserir_publico(c)
-    recomendador.reindexar()
-
-# Carregar dados iniciais
-_carregar_dados_iniciais()
+    # O recomendador indexa as categorias inseridas ao ser notificado pela árvore
+    arvore.carregar_em_lote(criar_categorias_iniciais())
+
+def inicializar(arvore_compartilhada=None):
+    """
+    Carrega o catálogo salvo (ou os dados iniciais), reaplica o diário e inicia a fila de
+    eventos. Chamada por quem sobe a API (run_api, testes), nunca na importação do módulo.
+    O caminho do catálogo vem de SRHP_CATALOGO, lida neste momento.
+    Com uma árvore compartilhada (GUI), ela já vem carregada desse mesmo catálogo: a API
+    passa a servi-la, e o diário é reaplicado nela e ligado ao recomendador que a atende.
+    """
+    global arvore, recomendador, CAMINHO_CATALOGO, CAMINHO_DIARIO, diario
+    global CAMINHO_CATALOGO_MAPEADO
+    CAMINHO_CATALOGO = os.environ.get("SRHP_CATALOGO") or CAMINHO_CATALOGO_PADRAO
+    CAMINHO_DIARIO = f"{CAMINHO_CATALOGO}.diario"
+
+    if arvore_compartilhada is not None:
+        # O construtor já indexa a árvore carregada
+        arvore = arvore_compartilhada
+        recomendador = RecomendacaoService(arvore)
+    else:
+        carregar_ou_inicializar(arvore, CAMINHO_CATALOGO)
+        recomendador.reindexar()
+
+    # Refazer, na árvore servida, as alterações registradas depois do último catálogo salvo
+    if "SRHP_CATALOGO" in os.environ:
+        # Registros até o número gravado no catálogo já estão nele (queda antes de esvaziar o diário)
+        ultimo_salvo = registro_do_catalogo(CAMINHO_CATALOGO)
+        reaplicar_diario(CAMINHO_DIARIO, arvore, recomendador, ultimo_salvo)
+        diario = DiarioAlteracoes(CAMINHO_DIARIO, ultimo_registro=ultimo_salvo)
+        recomendador.diario = diario
+
+    # Arquivo mapeado: compilado da árvore já carregada (com o diário reaplicado)
+    CAMINHO_CATALOGO_MAPEADO = os.environ.get("SRHP_CATALOGO_MAPEADO") or None
+    _recompilar_catalogo_mapeado()
+
+    # Buscas não esperam a atualização de pesos: os eventos são aplicados em lote em segundo plano
+    recomendador.iniciar_fila_eventos(intervalo=0.5, tamanho_lote=500)
+    atexit.register(encerrar)
+
+def encerrar():
+    """Aplica os eventos pendentes e, com SRHP_CATALOGO definida, salva o catálogo"""
+    global diario
+    recomendador.parar_fila_eventos()
+    if diario is not None:
+        diario.checkpoint(lambda registro: salvar_catalogo(arvore, CAMINHO_CATALOGO, registro))
+        diario.fechar()
+        diario = None
+        recomendador.diario = None
+    _fechar_catalogo_mapeado()
+
+def _fechar_catalogo_mapeado():
+    global catalogo_mapeado
+    with _trava_mapeado.escrita():
+        anterior, catalogo_mapeado = catalogo_mapeado, None
+    if anterior is not None:
+        anterior.fechar()
+
+def _recompilar_catalogo_mapeado():
+    """
+    Regrava o arquivo mapeado com a árvore atual (temporário trocado com os.replace:
+    mapeamentos abertos seguem no arquivo antigo) e passa a ler dele. O anterior é
+    fechado depois da troca, feita sem nenhuma leitura em andamento.
+    """
+    global catalogo_mapeado, _alteracao_mapeada
+    if not CAMINHO_CATALOGO_MAPEADO:
+        return
+    with _trava_compilacao:
+        # Alterações iniciadas durante a compilação podem não estar no arquivo
+        ultima = _ultima_alteracao
+        compilar_catalogo_mmap(arvore, CAMINHO_CATALOGO_MAPEADO)
+        novo = CatalogoMapeado(CAMINHO_CATALOGO_MAPEADO)
+        with _trava_mapeado.escrita():
+            anterior, catalogo_mapeado = catalogo_mapeado, novo
+            _alteracao_mapeada = ultima
+    if anterior is not None:
+        anterior.fechar()
+
+@contextmanager
+def _catalogo_mapeado_em_dia():
+    """Arquivo mapeado para uma leitura, ou None se inativo ou desatualizado (use a árvore)"""
+    with _trava_mapeado.leitura():
+        em_dia = catalogo_mapeado is not None and _alteracao_mapeada == _ultima_alteracao
+        yield catalogo_mapeado if em_dia else None
+
+def _marcar_alteracao():
+    """Deixa o arquivo mapeado desatualizado antes de a alteração ficar visível"""
+    global _ultima_alteracao
+    _ultima_alteracao = next(_contador_alteracoes)
+
+@contextmanager
+def _alteracao():
+    """Alteração feita pela API: com o diário ativo, não roda junto com um checkpoint"""
+    _marcar_alteracao()
+    if diario is None:
+        yield
+    else:
+        with diario.alteracao():
+            yield
+
+def _registrar(operacao, *args):
+    """Grava a alteração no diário (se ativo) antes de responder ao cliente"""
+    if diario is not None:
+        diario.registrar(operacao, *args)
+
+def _quer_stream():
+    """?stream=1 ou Accept: application/x-ndjson pedem a resposta em NDJSON"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'sim'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def _resposta_ndjson(objetos):
+    """Um objeto JSON por linha, enviado à medida que é gerado (transferência em partes)"""
+    linhas = (json.dumps(objeto, ensure_ascii=False) + '\n' for objeto in objetos)
+    return Response(stream_with_context(linhas), mimetype='application/x-ndjson')
+
+def _fim_do_prefixo(prefixo):
+    """Menor string maior que todas as que começam com o prefixo (limite exclusivo do intervalo)"""
+    prefixo = prefixo.rstrip(chr(0x10FFFF))
+    if not prefixo:
+        return None
+    return prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
 
 # ==========================================
 # ROTAS WEB (Interface)
@@ -49,19 +191,25 @@ def get_produtos():
     try:
         pagina = int(request.args.get('pagina', 1))
         limite = int(request.args.get('limite', 50))
-
-        todos_produtos = recomendador.listar_todos_produtos()
         inicio = (pagina - 1) * limite
-        fim = inicio + limite
 
-        produtos_paginados = todos_produtos[inicio:fim]
+        if _quer_stream():
+            # NDJSON: do início da página até o fim do ranking (ou só 'limite' itens, se informado)
+            produtos = recomendador.iterar_produtos_por_popularidade(inicio)
+            if 'limite' in request.args:
+                produtos = islice(produtos, limite)
+            return _resposta_ndjson(produtos)
+
+        # Ranking por popularidade: desce direto até a página (O(log n + limite))
+        total = recomendador.total_produtos_indexados()
+        produtos_paginados = list(islice(recomendador.iterar_produtos_por_popularidade(inicio), limite))
 
         return jsonify({
             'produtos': produtos_paginados,
-            'total': len(todos_produtos),
+            'total': total,
             'pagina': pagina,
             'limite': limite,
-            'paginas_totais': (len(todos_produtos) + limite - 1) // limite
+            'paginas_totais': (total + limite - 1) // limite
         })
     except Exception as e:
         logger.error(f"Erro ao listar produtos: {str(e)}")
@@ -77,7 +225,19 @@ def buscar_produtos():
         if not prefixo:
             return jsonify({'erro': 'Parâmetro de busca "q" é obrigatório'}), 400
 
-        resultados = recomendador.sugerir_por_prefixo(prefixo, limite=limite)
+        # ordenar=false percorre a trie sob demanda (ordem alfabética, sem ranking por peso)
+        if request.args.get('ordenar', 'true').lower() in ('false', '0', 'nao', 'não'):
+            resultados = list(islice(recomendador.iterar_por_prefixo(prefixo), limite))
+        else:
+            with _catalogo_mapeado_em_dia() as mapeado:
+                if mapeado is not None:
+                    resultados = mapeado.sugerir_por_prefixo(prefixo, limite)
+            if mapeado is None:
+                resultados = recomendador.sugerir_por_prefixo(prefixo, limite=limite)
+            elif resultados:
+                # A busca conta para os pesos como no caminho da árvore (vão para o arquivo ao salvar)
+                primeiro = resultados[0]
+                recomendador.publicar_eventos([(primeiro['categoria'], primeiro['nome'], 'busca')])
 
         return jsonify({
             'query': prefixo,
@@ -107,15 +267,18 @@ def criar_produto():
         if not categoria:
             return jsonify({'erro': f'Categoria "{categoria_nome}" não encontrada'}), 404
 
-        if subcategoria_nome:
-            subcategoria = next((s for s in categoria.subcategorias if s.nome.lower() == subcategoria_nome.lower()), None)
-            if not subcategoria:
-                return jsonify({'erro': f'Subcategoria "{subcategoria_nome}" não encontrada'}), 404
-            subcategoria.adicionar_produto(dados['nome'])
-        else:
-            categoria.adicionar_produto(dados['nome'])
-
-        recomendador.reindexar()
+        with _alteracao():
+            if subcategoria_nome:
+                # Aceita subcategorias em qualquer nível: "Acessórios > Cabos"
+                subcategoria = categoria.resolver_caminho(subcategoria_nome, ignorar_caixa=True)
+                if not subcategoria:
+                    return jsonify({'erro': f'Subcategoria "{subcategoria_nome}" não encontrada'}), 404
+                subcategoria.adicionar_produto(dados['nome'])
+                caminho = f"{categoria.nome} > {subcategoria_nome}"
+            else:
+                categoria.adicionar_produto(dados['nome'])
+                caminho = categoria.nome
+            _registrar('produto_criado', caminho, dados['nome'])
 
         logger.info(f"Produto criado: {dados['nome']} em {categoria_nome}")
         return jsonify({
@@ -141,35 +304,23 @@ def atualizar_produto(categoria, produto):
         produto_encontrado = False
         subcategoria_nome = None
 
-        # Verificar subcategorias primeiro
-        for sub in categoria_obj.subcategorias:
-            if sub.remover_produto(produto):  # remove temporariamente para verificar se existe
-                sub.adicionar_produto(produto)  # readiciona
+        # Verificar subcategorias primeiro (consulta O(1) por subcategoria, sem remover/readicionar)
+        for sub in categoria_obj.iter_subcategorias():
+            if sub.obter_produto(produto) is not None:
                 subcategoria_nome = sub.nome
                 produto_encontrado = True
                 break
 
         # Se não encontrou em subcategorias, verificar na categoria principal
         if not produto_encontrado:
-            if categoria_obj.remover_produto(produto):  # remove temporariamente
-                categoria_obj.adicionar_produto(produto)  # readiciona
-                produto_encontrado = True
+            produto_encontrado = categoria_obj.obter_produto(produto) is not None
 
         if not produto_encontrado:
             return jsonify({'erro': f'Produto "{produto}" não encontrado'}), 404
 
-        # Aplicar incrementos conforme regras SRHP
-        categoria_obj.aumentar_peso(0.008)
-
-        if subcategoria_nome:
-            subcategoria = next((s for s in categoria_obj.subcategorias if s.nome == subcategoria_nome), None)
-            if subcategoria:
-                subcategoria.aumentar_peso(0.003)
-                subcategoria.aumentar_peso_produto(produto, 0.005)
-        else:
-            categoria_obj.aumentar_peso_produto(produto, 0.005)
-
-        recomendador.reindexar()
+        # Aplicar incrementos conforme regras SRHP (evento "clique")
+        caminho = f"{categoria_obj.nome} > {subcategoria_nome}" if subcategoria_nome else categoria_obj.nome
+        recomendador.registrar_eventos([(caminho, produto, 'clique')])
 
         logger.info(f"Produto atualizado: {produto} em {categoria}")
         return jsonify({
@@ -188,6 +339,31 @@ def atualizar_produto(categoria, produto):
         logger.error(f"Erro ao atualizar produto: {str(e)}")
         return jsonify({'erro': 'Erro interno do servidor'}), 500
 
+@app.route('/api/eventos', methods=['POST'])
+def registrar_eventos():
+    """Registra um lote de eventos de popularidade (busca/clique)"""
+    try:
+        dados = request.get_json()
+        if not dados or not isinstance(dados.get('eventos'), list):
+            return jsonify({'erro': 'Lista "eventos" é obrigatória'}), 400
+
+        eventos = []
+        for evento in dados['eventos']:
+            if not isinstance(evento, dict) or not evento.get('caminho') or not evento.get('produto'):
+                return jsonify({'erro': 'Cada evento precisa de "caminho" e "produto"'}), 400
+            eventos.append((evento['caminho'], evento['produto'], evento.get('tipo', 'clique')))
+
+        aceitos = recomendador.registrar_eventos(eventos)
+        return jsonify({
+            'mensagem': 'Eventos registrados com sucesso',
+            'recebidos': len(eventos),
+            'aceitos': aceitos
+        })
+
+    except Exception as e:
+        logger.error(f"Erro ao registrar eventos: {str(e)}")
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
+
 @app.route('/api/produtos/<categoria>/<produto>', methods=['DELETE'])
 def deletar_produto(categoria, produto):
     """Remove um produto"""
@@ -196,19 +372,21 @@ def deletar_produto(categoria, produto):
         if not categoria_obj:
             return jsonify({'erro': f'Categoria "{categoria}" não encontrada'}), 404
 
-        removido = categoria_obj.remover_produto(produto)
+        with _alteracao():
+            removido = categoria_obj.remover_produto(produto)
+            caminho = categoria_obj.nome
 
-        if not removido:
-            # Tentar remover de subcategorias
-            for sub in categoria_obj.subcategorias:
-                if sub.remover_produto(produto):
-                    removido = True
-                    break
+            if not removido:
+                # Tentar remover de subcategorias
+                for sub in categoria_obj.iter_subcategorias():
+                    if sub.remover_produto(produto):
+                        removido = True
+                        caminho = f"{categoria_obj.nome} > {sub.nome}"
+                        break
 
-        if not removido:
-            return jsonify({'erro': f'Produto "{produto}" não encontrado'}), 404
-
-        recomendador.reindexar()
+            if not removido:
+                return jsonify({'erro': f'Produto "{produto}" não encontrado'}), 404
+            _registrar('produto_removido', caminho, produto)
 
         logger.info(f"Produto removido: {produto} de {categoria}")
         return jsonify({
@@ -227,22 +405,68 @@ def deletar_produto(categoria, produto):
 
 @app.route('/api/categorias', methods=['GET'])
 def get_categorias():
-    """Lista todas as categorias"""
+    """Lista as categorias em ordem alfabética (com filtros opcionais de prefixo/intervalo)"""
     try:
+        prefixo = request.args.get('prefixo')
+        inicio = request.args.get('inicio')
+        fim = request.args.get('fim')
+        apos = request.args.get('apos')
+        pagina = request.args.get('pagina', type=int)
+        limite = request.args.get('limite', type=int)
+        if pagina is not None and pagina < 1:
+            return jsonify({'erro': 'Página deve ser maior ou igual a 1'}), 400
+        if pagina is not None and not limite:
+            limite = 50
+
+        # "apos" continua a paginação alfabética a partir da última categoria recebida
+        seguinte = arvore.sucessor(apos) if apos else None
+        if seguinte is not None and (inicio is None or seguinte.nome > inicio):
+            inicio = seguinte.nome
+
+        # Prefixo vira intervalo [prefixo, fim_do_prefixo)
+        if prefixo:
+            if inicio is None or prefixo > inicio:
+                inicio = prefixo
+            limite_prefixo = _fim_do_prefixo(prefixo)
+            if limite_prefixo is not None and (fim is None or limite_prefixo < fim):
+                fim = limite_prefixo
+
+        # Posições do intervalo na ordem alfabética (estatística de ordem: O(log n))
+        primeira = arvore.posicao(inicio) if inicio is not None else 0
+        ultima = arvore.posicao(fim) if fim is not None else arvore.get_tamanho()
+        total_categorias = max(ultima - primeira, 0)
+
+        if apos and seguinte is None:
+            origem = iter(())
+        elif pagina is not None:
+            deslocamento = (pagina - 1) * limite
+            origem = islice(arvore.iter_por_posicao(primeira + deslocamento),
+                            max(total_categorias - deslocamento, 0))
+        else:
+            origem = arvore.iter_intervalo(inicio, fim)
+
         categorias = []
-        for cat in arvore.listar_todas():
+        for cat in islice(origem, limite):
             categorias.append({
                 'nome': cat.nome,
                 'peso_popularidade': cat.peso_popularidade,
-                'produtos_count': len(cat.get_produtos_ordenados_por_peso()),
+                'produtos_count': cat.get_total_produtos(),
                 'subcategorias_count': len(cat.subcategorias),
                 'subcategorias': [s.nome for s in cat.subcategorias]
             })
 
-        return jsonify({
+        resposta = {
             'categorias': categorias,
-            'total': len(categorias)
-        })
+            'total': len(categorias),
+            'total_categorias': total_categorias
+        }
+        if pagina is not None:
+            resposta['pagina'] = pagina
+            resposta['limite'] = limite
+            resposta['paginas_totais'] = (total_categorias + limite - 1) // limite
+        elif limite and len(categorias) == limite:
+            resposta['proxima'] = categorias[-1]['nome']
+        return jsonify(resposta)
     except Exception as e:
         logger.error(f"Erro ao listar categorias: {str(e)}")
         return jsonify({'erro': 'Erro interno do servidor'}), 500
@@ -264,8 +488,9 @@ def criar_categoria():
             return jsonify({'erro': f'Categoria "{nome}" já existe'}), 409
 
         categoria = Categoria(nome)
-        arvore.inserir_publico(categoria)
-        recomendador.reindexar()
+        with _alteracao():
+            arvore.inserir_publico(categoria)
+            _registrar('categoria_criada', nome)
 
         logger.info(f"Categoria criada: {nome}")
         return jsonify({
@@ -284,18 +509,27 @@ def criar_categoria():
 def get_categoria(nome):
     """Obtém detalhes de uma categoria específica"""
     try:
-        categoria = arvore.buscar_publico(nome)
+        with _catalogo_mapeado_em_dia() as mapeado:
+            categoria = (mapeado if mapeado is not None else arvore).buscar_publico(nome)
         if not categoria:
             return jsonify({'erro': f'Categoria "{nome}" não encontrada'}), 404
 
-        produtos = categoria.get_produtos_ordenados_por_peso()
+        # "top" limita cada lista aos k produtos de maior peso (sem ordenar a categoria inteira)
+        top = request.args.get('top', type=int)
+
+        def produtos_de(cat):
+            if top is not None:
+                return cat.mais_populares_produtos(top)
+            return cat.get_produtos_ordenados_por_peso()
+
+        produtos = produtos_de(categoria)
         subcategorias = []
 
         for sub in categoria.subcategorias:
             subcategorias.append({
                 'nome': sub.nome,
                 'peso_popularidade': sub.peso_popularidade,
-                'produtos': sub.get_produtos_ordenados_por_peso()
+                'produtos': produtos_de(sub)
             })
 
         return jsonify({
@@ -320,9 +554,9 @@ def atualizar_categoria(nome):
             return jsonify({'erro': f'Categoria "{nome}" não encontrada'}), 404
 
         # Aplicar incremento de peso conforme regras SRHP
-        categoria.aumentar_peso(0.01)
-
-        recomendador.reindexar()
+        with _alteracao():
+            categoria.aumentar_peso(0.01)
+            _registrar('peso_categoria', categoria.nome, 0.01)
 
         logger.info(f"Categoria atualizada: {nome}")
         return jsonify({
@@ -340,11 +574,11 @@ def atualizar_categoria(nome):
 def deletar_categoria(nome):
     """Remove uma categoria"""
     try:
-        removida = arvore.remover_publico(nome)
-        if not removida:
-            return jsonify({'erro': f'Categoria "{nome}" não encontrada'}), 404
-
-        recomendador.reindexar()
+        with _alteracao():
+            removida = arvore.remover_publico(nome)
+            if not removida:
+                return jsonify({'erro': f'Categoria "{nome}" não encontrada'}), 404
+            _registrar('categoria_removida', nome)
 
         logger.info(f"Categoria removida: {nome}")
         return jsonify({
@@ -373,7 +607,7 @@ def get_subcategorias(categoria):
             subcategorias.append({
                 'nome': sub.nome,
                 'peso_popularidade': sub.peso_popularidade,
-                'produtos_count': len(sub.get_produtos_ordenados_por_peso())
+                'produtos_count': sub.get_total_produtos()
             })
 
         return jsonify({
@@ -404,12 +638,13 @@ def criar_subcategoria(categoria):
             return jsonify({'erro': 'Nome da subcategoria não pode ser vazio'}), 400
 
         # Verificar se já existe
-        if any(s.nome.lower() == nome_sub.lower() for s in categoria_obj.subcategorias):
+        if categoria_obj.obter_subcategoria(nome_sub, ignorar_caixa=True):
             return jsonify({'erro': f'Subcategoria "{nome_sub}" já existe em "{categoria}"'}), 409
 
         subcategoria = Categoria(nome_sub)
-        categoria_obj.adicionar_subcategoria(subcategoria)
-        recomendador.reindexar()
+        with _alteracao():
+            categoria_obj.adicionar_subcategoria(subcategoria)
+            _registrar('subcategoria_criada', categoria_obj.nome, nome_sub)
 
         logger.info(f"Subcategoria criada: {nome_sub} em {categoria}")
         return jsonify({
@@ -433,17 +668,12 @@ def deletar_subcategoria(categoria, subcategoria):
         if not categoria_obj:
             return jsonify({'erro': f'Categoria "{categoria}" não encontrada'}), 404
 
-        removida = False
-        for s in list(categoria_obj.subcategorias):
-            if s.nome.lower() == subcategoria.lower():
-                categoria_obj.subcategorias.remove(s)
-                removida = True
-                break
+        with _alteracao():
+            removida = categoria_obj.remover_subcategoria(subcategoria)
 
-        if not removida:
-            return jsonify({'erro': f'Subcategoria "{subcategoria}" não encontrada em "{categoria}"'}), 404
-
-        recomendador.reindexar()
+            if not removida:
+                return jsonify({'erro': f'Subcategoria "{subcategoria}" não encontrada em "{categoria}"'}), 404
+            _registrar('subcategoria_removida', categoria_obj.nome, subcategoria)
 
         logger.info(f"Subcategoria removida: {subcategoria} de {categoria}")
         return jsonify({
@@ -460,40 +690,55 @@ def deletar_subcategoria(categoria, subcategoria):
 # API REST - COLEÇÃO (ÁRVORE COMPLETA)
 # ==========================================
 
+def _dados_colecao(cat):
+    """Categoria (com subcategorias e produtos ordenados por peso) no formato de /api/colecao"""
+    return {
+        'nome': cat.nome,
+        'peso_popularidade': cat.peso_popularidade,
+        'produtos': cat.get_produtos_ordenados_por_peso(),
+        'subcategorias': [
+            {
+                'nome': sub.nome,
+                'peso_popularidade': sub.peso_popularidade,
+                'produtos': sub.get_produtos_ordenados_por_peso()
+            }
+            for sub in cat.subcategorias
+        ]
+    }
+
 @app.route('/api/colecao', methods=['GET'])
 def get_colecao():
     """Obtém a coleção completa (árvore AVL)"""
     try:
-        relatorio = recomendador.gerar_relatorio_performance()
+        # Uma única versão da árvore para os metadados e a listagem
+        versao = arvore.snapshot()
+
+        if _quer_stream():
+            # NDJSON: metadados na primeira linha, depois uma categoria por linha, em ordem alfabética
+            def linhas():
+                yield {'metadata': {
+                    'total_categorias': versao.get_tamanho(),
+                    'total_produtos': recomendador.total_produtos_indexados()
+                }}
+                for cat in versao:
+                    yield _dados_colecao(cat)
+            return _resposta_ndjson(linhas())
+
+        relatorio = recomendador.gerar_relatorio_performance(versao)
 
         colecao = {
             'metadata': {
-                'total_categorias': arvore.get_tamanho(),
+                'total_categorias': versao.get_tamanho(),
                 'altura_arvore': relatorio.get('altura'),
                 'balanceada': relatorio.get('balanceada'),
-                'total_produtos': len(recomendador.listar_todos_produtos()),
+                'total_produtos': recomendador.contar_produtos(versao),
                 'complexidade': relatorio.get('complexidade', {})
             },
             'categorias': []
         }
 
-        for cat in arvore.listar_todas():
-            categoria_data = {
-                'nome': cat.nome,
-                'peso_popularidade': cat.peso_popularidade,
-                'produtos': cat.get_produtos_ordenados_por_peso(),
-                'subcategorias': []
-            }
-
-            for sub in cat.subcategorias:
-                sub_data = {
-                    'nome': sub.nome,
-                    'peso_popularidade': sub.peso_popularidade,
-                    'produtos': sub.get_produtos_ordenados_por_peso()
-                }
-                categoria_data['subcategorias'].append(sub_data)
-
-            colecao['categorias'].append(categoria_data)
+        for cat in versao:
+            colecao['categorias'].append(_dados_colecao(cat))
 
         return jsonify(colecao)
 
@@ -501,16 +746,82 @@ def get_colecao():
         logger.error(f"Erro ao obter coleção: {str(e)}")
         return jsonify({'erro': 'Erro interno do servidor'}), 500
 
+@app.route('/api/colecao/salvar', methods=['POST'])
+def salvar_colecao():
+    """Grava a coleção atual (com os pesos) no catálogo em disco"""
+    try:
+        recomendador.aplicar_eventos_pendentes()
+        if diario is not None:
+            # Catálogo salvo e diário esvaziado no mesmo ponto
+            total = diario.checkpoint(lambda registro: salvar_catalogo(arvore, CAMINHO_CATALOGO, registro))
+        else:
+            total = salvar_catalogo(arvore, CAMINHO_CATALOGO)
+        _recompilar_catalogo_mapeado()
+        return jsonify({
+            'mensagem': 'Coleção salva com sucesso',
+            'total_categorias': total
+        })
+
+    except Exception as e:
+        logger.error(f"Erro ao salvar coleção: {str(e)}")
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
+
+@app.route('/api/importar', methods=['POST'])
+def importar_colecao():
+    """Importa produtos em massa de um CSV/JSONL (arquivo 'arquivo' em multipart ou o corpo da requisição)"""
+    try:
+        enviado = request.files.get('arquivo')
+        formato = request.args.get('formato', '').lower()
+        if not formato and enviado is not None and enviado.filename:
+            try:
+                formato = formato_do_arquivo(enviado.filename)
+            except ValueError:
+                formato = ''
+        if formato not in FORMATOS:
+            return jsonify({'erro': f'Formato obrigatório: {", ".join(FORMATOS)}'}), 400
+
+        # Lido em blocos direto do stream da requisição, sem guardar o arquivo inteiro
+        origem = enviado.stream if enviado is not None else request.stream
+        recomendador.aplicar_eventos_pendentes()
+        _marcar_alteracao()
+
+        def importar_e_salvar(registro):
+            resumo = importar_arquivo(origem, formato, arvore, recomendador)
+            salvar_catalogo(arvore, CAMINHO_CATALOGO, registro)
+            return resumo
+
+        if diario is not None:
+            # A importação não passa pelo diário: termina com o catálogo salvo (checkpoint)
+            resumo = diario.checkpoint(importar_e_salvar)
+        else:
+            resumo = importar_arquivo(origem, formato, arvore, recomendador)
+
+        logger.info(f"Importação ({formato}): {resumo['linhas']} linhas")
+        return jsonify({
+            'mensagem': 'Importação concluída',
+            'formato': formato,
+            **resumo
+        })
+
+    except Exception as e:
+        logger.error(f"Erro ao importar coleção: {str(e)}")
+        return jsonify({'erro': 'Erro interno do servidor'}), 500
+
 @app.route('/api/colecao/reset', methods=['POST'])
 def reset_colecao():
     """Reseta a coleção para os dados iniciais"""
     try:
-        # Limpar árvore atual
-        for cat in arvore.listar_todas():
-            arvore.remover_publico(cat.nome)
+        # Eventos ainda na fila referem-se à coleção atual
+        recomendador.aplicar_eventos_pendentes()
+
+        with _alteracao():
+            # Limpar árvore atual
+            for cat in arvore.listar_todas():
+                arvore.remover_publico(cat.nome)
 
-        # Recarregar dados iniciais
-        _carregar_dados_iniciais()
+            # Recarregar dados iniciais
+            _carregar_dados_iniciais()
+            _registrar('colecao_resetada')
 
         logger.info("Coleção resetada para dados iniciais")
         return jsonify({
@@ -530,19 +841,21 @@ def reset_colecao():
 def get_estatisticas():
     """Obtém estatísticas gerais do sistema"""
     try:
-        relatorio = recomendador.gerar_relatorio_performance()
-        produtos = recomendador.listar_todos_produtos()
+        versao = arvore.snapshot()
+        relatorio = recomendador.gerar_relatorio_performance(versao)
 
         estatisticas = {
             'arvore_avl': {
                 'altura': relatorio.get('altura'),
                 'balanceada': relatorio.get('balanceada'),
-                'total_categorias': arvore.get_tamanho()
+                'total_categorias': versao.get_tamanho()
             },
             'produtos': {
-                'total': len(produtos),
-                'categorias_com_produtos': len([c for c in arvore.listar_todas() if c.get_produtos_ordenados_por_peso()])
+                'total': recomendador.contar_produtos(versao),
+                'categorias_com_produtos': sum(1 for c in versao if c.get_total_produtos()),
+                'mais_populares': recomendador.produtos_mais_populares(5)
             },
+            'categorias_mais_populares': recomendador.categorias_mais_populares(5),
             'complexidade': relatorio.get('complexidade', {}),
             'timestamp': str(request.args.get('timestamp', 'now'))
         }
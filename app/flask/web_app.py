@@ -6,7 +6,6 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 from flask import Flask
 from flask_cors import CORS
-from app.services.recomendacao_service import RecomendacaoService
 
 # Configurações da aplicação
 # app.config['JSON_SORT_KEYS'] = False  # Movido para depois do import
@@ -30,12 +29,10 @@ def run_api(arvore_compartilhada=None):
     Inicia a API.
     :param arvore_compartilhada: Instância opcional de ArvoreAVL para compartilhar estado.
     """
-    if arvore_compartilhada:
+    if arvore_compartilhada is not None:
         print("🔗 Conectando Web API à árvore compartilhada...")
-        routes_module.arvore = arvore_compartilhada
-        routes_module.recomendador = RecomendacaoService(arvore_compartilhada)
-        # Reindexar para garantir sincronia inicial
-        routes_module.recomendador.reindexar()
+    # Catálogo (ou a árvore compartilhada), diário e fila de eventos
+    routes_module.inicializar(arvore_compartilhada)
 
     print("🚀 Iniciando SRHP Web API...")
     print("📡 Servidor rodando em: http://127.0.0.1:5000")
@@ -11,9 +11,10 @@ from tkinter import messagebox, simpledialog
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import SUCCESS, INFO, PRIMARY, WARNING, DANGER, SECONDARY
 
-from app.core.arvore_avl import ArvoreAVL
-from app.core.categoria import Categoria
+from app.core.arvore_avl_persistente import ArvoreAVLPersistente
+from app.core.categoria import Categoria, dividir_caminho
 from app.services.recomendacao_service import RecomendacaoService
+from app.services.persistencia_catalogo import CAMINHO_CATALOGO_PADRAO, carregar_ou_inicializar, salvar_catalogo
 from app.utils.logger import Logger
 from app.utils.timer import Timer
 from app.flask.web_app import run_api
@@ -34,7 +35,7 @@ class SRHPGui(ttk.Window):
         # === Core ===
         self.logger = Logger("SRHP-GUI")
         self.timer = Timer()
-        self.arvore = ArvoreAVL()
+        self.arvore = ArvoreAVLPersistente()   # compartilhada com a API: leituras sem trava
         self.recomendador = RecomendacaoService(self.arvore)
         self._carregar_dados_iniciais()
         self.recomendador.reindexar()
@@ -43,6 +44,7 @@ class SRHPGui(ttk.Window):
         # === UI ===
         self._montar_interface()
         self._atualizar_status_info()
+        self.protocol("WM_DELETE_WINDOW", self._ao_fechar)
         self.logger.info("Interface gráfica (ttkbootstrap) inicializada com sucesso.")
 
         # === Web API ===
@@ -62,16 +64,18 @@ class SRHPGui(ttk.Window):
     # Dados iniciais
     # --------------------------------------------------------------------------
     def _carregar_dados_iniciais(self):
-        """Popula a árvore com dados padrão"""
-        bebidas = Categoria("Bebidas", ["Suco de Uva", "Refrigerante", "Água Mineral"], peso_popularidade=4.0)
-        eletronicos = Categoria("Eletrônicos", ["Celular", "Notebook", "Fone JBL"], peso_popularidade=3.0)
-        acessorios = Categoria("Acessórios", ["Cabo HDMI", "Mouse Gamer"], peso_popularidade=2.0)
-        eletronicos.adicionar_subcategoria(acessorios)
-        bananinha = Categoria("Bananinha", ["Banana Chips", "Banana Passa"], peso_popularidade=5.0)
-        bananas_gourmet = Categoria("Bananas Gourmet", ["Banana Flambada", "Banana com Chocolate"], peso_popularidade=2.0)
-        bananinha.adicionar_subcategoria(bananas_gourmet)
-        for c in [bebidas, eletronicos, bananinha]:
-            self.arvore.inserir_publico(c)
+        """Popula a árvore com o catálogo salvo ou, se não houver, com dados padrão"""
+        if carregar_ou_inicializar(self.arvore, CAMINHO_CATALOGO_PADRAO):
+            self.logger.info(f"Catálogo carregado de '{CAMINHO_CATALOGO_PADRAO}'")
+
+    def _ao_fechar(self):
+        """Salva o catálogo (pesos aprendidos incluídos) antes de fechar a janela"""
+        try:
+            self.recomendador.parar_fila_eventos()
+            salvar_catalogo(self.arvore, CAMINHO_CATALOGO_PADRAO)
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar catálogo: {str(e)}")
+        self.destroy()
 
     # --------------------------------------------------------------------------
     # Interface principal
@@ -189,7 +193,7 @@ class SRHPGui(ttk.Window):
         nome_prod = produto["nome"]
         caminho = produto["categoria"]
 
-        partes = [p.strip() for p in caminho.split(">")] if caminho else []
+        partes = dividir_caminho(caminho) if caminho else []
         cat_nome = partes[0] if partes else None
         sub_nome = partes[-1] if len(partes) > 1 else None
 
@@ -207,37 +211,22 @@ class SRHPGui(ttk.Window):
 
         sub = None
         if sub_nome and sub_nome != cat_nome:
-            sub = next((s for s in cat.subcategorias if s.nome == sub_nome), None)
+            sub = cat.resolver_caminho(partes[1:])
             if sub:
                 peso_sub_ant = sub.peso_popularidade
-                p = next((p for p in sub.get_produtos_ordenados_por_peso() if p["nome"] == nome_prod), None)
+                p = sub.obter_produto(nome_prod)
                 if p:
                     peso_prod_ant = p["peso_produto"]
         else:
-            p = next((p for p in cat.get_produtos_ordenados_por_peso() if p["nome"] == nome_prod), None)
+            p = cat.obter_produto(nome_prod)
             if p:
                 peso_prod_ant = p["peso_produto"]
 
         # ------------------------------------------------------------------
         #  🚀 Aplicando AS REGRAS OFICIAIS (CORRETAS)
         # ------------------------------------------------------------------
-        # Categoria: +0.008
-        cat.aumentar_peso(0.008)
-
-        # Subcategoria: +0.003 (se existir)
-        if sub:
-            sub.aumentar_peso(0.003)
-
-        # Produto: +0.005 (sempre)
-        if sub:
-            sub.aumentar_peso_produto(nome_prod, 0.005)
-        else:
-            cat.aumentar_peso_produto(nome_prod, 0.005)
-
-        # ------------------------------------------------------------------
-        # Reindexar após alterações
-        # ------------------------------------------------------------------
-        self.recomendador.reindexar()
+        # Categoria: +0.008 | Subcategoria: +0.003 (se existir) | Produto: +0.005 (sempre)
+        self.recomendador.registrar_eventos([(caminho, nome_prod, "clique")])
 
         # ------------------------------------------------------------------
         # Depois (captura)
@@ -248,11 +237,11 @@ class SRHPGui(ttk.Window):
 
         if sub:
             peso_sub_dep = sub.peso_popularidade
-            p = next((p for p in sub.get_produtos_ordenados_por_peso() if p["nome"] == nome_prod), None)
+            p = sub.obter_produto(nome_prod)
             if p:
                 peso_prod_dep = p["peso_produto"]
         else:
-            p = next((p for p in cat.get_produtos_ordenados_por_peso() if p["nome"] == nome_prod), None)
+            p = cat.obter_produto(nome_prod)
             if p:
                 peso_prod_dep = p["peso_produto"]
 
@@ -316,7 +305,6 @@ class SRHPGui(ttk.Window):
             return
         cat = Categoria(nome)
         self.arvore.inserir_publico(cat)
-        self.recomendador.reindexar()
         self.logger.info(f"Categoria adicionada='{nome}' | Complexidade=O(log n)")
         self._atualizar_status_info()
         messagebox.showinfo("OK", f"Categoria '{nome}' adicionada.")
@@ -335,7 +323,7 @@ class SRHPGui(ttk.Window):
             return
 
         if sub_nome:
-            sub = next((s for s in cat.subcategorias if s.nome.lower() == sub_nome.lower()), None)
+            sub = cat.obter_subcategoria(sub_nome, ignorar_caixa=True)
             if not sub:
                 criar = messagebox.askyesno("Subcategoria não existe", "Deseja criá-la?")
                 if criar:
@@ -348,7 +336,6 @@ class SRHPGui(ttk.Window):
         else:
             cat.adicionar_produto(prod_nome)
 
-        self.recomendador.reindexar()
         self.logger.info(f"Produto adicionado='{prod_nome}' em '{cat_nome}' | Complexidade=O(1)")
         self._atualizar_status_info()
         self._on_search_key()
@@ -366,7 +353,6 @@ class SRHPGui(ttk.Window):
             return
         ok = cat.remover_produto(prod_nome)
         if ok:
-            self.recomendador.reindexar()
             self.logger.info(f"Produto removido='{prod_nome}' | Complexidade=O(1)")
             self._atualizar_status_info()
             messagebox.showinfo("OK", f"Produto '{prod_nome}' removido.")
@@ -380,7 +366,6 @@ class SRHPGui(ttk.Window):
             return
         ok = self.arvore.remover_publico(nome)
         if ok:
-            self.recomendador.reindexar()
             self.logger.info(f"Categoria removida='{nome}' | Complexidade=O(log n)")
             self._atualizar_status_info()
             messagebox.showinfo("OK", f"Categoria '{nome}' removida.")
@@ -400,13 +385,12 @@ class SRHPGui(ttk.Window):
         if not sub_nome:
             return
 
-        if any(s.nome.lower() == sub_nome.lower() for s in cat.subcategorias):
+        if cat.obter_subcategoria(sub_nome, ignorar_caixa=True):
             messagebox.showwarning("Duplicada", f"A subcategoria '{sub_nome}' já existe em '{cat_nome}'.")
             return
 
         sub = Categoria(sub_nome)
         cat.adicionar_subcategoria(sub)
-        self.recomendador.reindexar()
         self.logger.info(f"Subcategoria adicionada='{sub_nome}' em '{cat_nome}' | Complexidade=O(1)")
         self._atualizar_status_info()
         messagebox.showinfo("OK", f"Subcategoria '{sub_nome}' adicionada em '{cat_nome}'.")
@@ -424,15 +408,9 @@ class SRHPGui(ttk.Window):
         if not sub_nome:
             return
 
-        removida = False
-        for s in list(cat.subcategorias):
-            if s.nome.lower() == sub_nome.lower():
-                cat.subcategorias.remove(s)
-                removida = True
-                break
+        removida = cat.remover_subcategoria(sub_nome)
 
         if removida:
-            self.recomendador.reindexar()
             self.logger.info(f"Subcategoria removida='{sub_nome}' de '{cat_nome}' | Complexidade=O(1)")
             self._atualizar_status_info()
             messagebox.showinfo("OK", f"Subcategoria '{sub_nome}' removida de '{cat_nome}'.")
@@ -476,7 +454,7 @@ class SRHPGui(ttk.Window):
 
         nome = info.get("nome", "—")
         caminho = info.get("categoria", "—")
-        partes = [p.strip() for p in caminho.split(">")] if caminho else []
+        partes = dividir_caminho(caminho) if caminho else []
         cat_nome = partes[0] if partes else None
         sub_nome = partes[-1] if len(partes) > 1 else None
 
@@ -490,14 +468,14 @@ class SRHPGui(ttk.Window):
         if cat:
             peso_cat = cat.peso_popularidade
             if sub_nome and sub_nome != cat_nome:
-                sub = next((s for s in cat.subcategorias if s.nome == sub_nome), None)
+                sub = cat.resolver_caminho(partes[1:])
                 if sub:
                     peso_sub = sub.peso_popularidade
-                    prod = next((p for p in sub.get_produtos_ordenados_por_peso() if p["nome"] == nome), None)
+                    prod = sub.obter_produto(nome)
                     if prod:
                         peso_prod = prod["peso_produto"]
             else:
-                prod = next((p for p in cat.get_produtos_ordenados_por_peso() if p["nome"] == nome), None)
+                prod = cat.obter_produto(nome)
                 if prod:
                     peso_prod = prod["peso_produto"]
 
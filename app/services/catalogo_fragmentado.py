@@ -0,0 +1,232 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import heapq
+import multiprocessing
+import threading
+import zlib
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria, dividir_caminho
+from app.services.recomendacao_service import RecomendacaoService
+from app.utils.logger import Logger
+
+_pontuacao = itemgetter(0)
+
+
+def _ordem_ranking(produto: Dict) -> Tuple:
+    """Mesma ordem do ranking de produtos do serviço: maior peso primeiro, depois nome e caminho."""
+    return (-produto["peso_popularidade"], produto["nome"], produto["categoria"])
+
+
+# =============================================================
+# ⚙️ PROCESSO DE CADA FRAGMENTO
+# =============================================================
+def _comando_inserir(arvore, servico, categoria):
+    if arvore.buscar_publico(categoria.nome) is not None:
+        return False
+    arvore.inserir_publico(categoria)
+    return True
+
+
+_COMANDOS = {
+    "carregar": lambda arvore, servico, categorias: arvore.carregar_em_lote(categorias),
+    "inserir": _comando_inserir,
+    "remover": lambda arvore, servico, nome: arvore.remover_publico(nome),
+    "buscar": lambda arvore, servico, nome: arvore.buscar_publico(nome),
+    "sugerir": lambda arvore, servico, prefixo, limite: servico.sugestoes_pontuadas(prefixo, limite),
+    "produtos": lambda arvore, servico: servico.listar_todos_produtos(),
+    "mais_populares": lambda arvore, servico, n: servico.produtos_mais_populares(n),
+    "eventos": lambda arvore, servico, eventos: servico.registrar_eventos(eventos),
+    "tamanho": lambda arvore, servico: (arvore.get_tamanho(), servico.total_produtos_indexados()),
+}
+
+
+def _executar_fragmento(conexao, k_sugestoes: int) -> None:
+    """Laço do processo: cada fragmento tem sua própria ArvoreAVL e seus próprios índices."""
+    arvore = ArvoreAVL()
+    servico = RecomendacaoService(arvore, k_sugestoes=k_sugestoes)
+    while True:
+        try:
+            comando, args = conexao.recv()
+        except EOFError:
+            return
+        if comando == "parar":
+            conexao.send(("ok", None))
+            return
+        try:
+            conexao.send(("ok", _COMANDOS[comando](arvore, servico, *args)))
+        except Exception as e:
+            conexao.send(("erro", f"{type(e).__name__}: {e}"))
+
+
+# =============================================================
+# 🧭 COORDENADOR
+# =============================================================
+class CatalogoFragmentado:
+    """
+    Catálogo dividido em N processos (fragmentos), cada um com sua ArvoreAVL
+    e seu RecomendacaoService.
+
+    A categoria raiz vai para o fragmento crc32(nome) % N, junto com toda a
+    sua hierarquia. Consultas que envolvem o catálogo todo (sugestões por
+    prefixo, listagem de produtos) são enviadas a todos os fragmentos de uma
+    vez, executadas em paralelo e mescladas em k vias pelo peso. As
+    categorias devolvidas por buscar_publico são cópias: alterações nelas
+    não voltam para o fragmento.
+    """
+
+    def __init__(self, n_fragmentos: Optional[int] = None, k_sugestoes: int = 15):
+        self.n_fragmentos = max(1, n_fragmentos or os.cpu_count() or 1)
+        self.logger = Logger(__name__)
+
+        # 'spawn': processos limpos, seguros mesmo com threads (Flask, fila de eventos) no pai
+        contexto = multiprocessing.get_context("spawn")
+        self._conexoes = []
+        self._processos = []
+        # Um pedido por vez em cada canal; vários fragmentos são travados sempre em ordem crescente
+        self._travas = [threading.Lock() for _ in range(self.n_fragmentos)]
+        for i in range(self.n_fragmentos):
+            local, remota = contexto.Pipe()
+            processo = contexto.Process(target=_executar_fragmento, args=(remota, k_sugestoes),
+                                        name=f"fragmento-catalogo-{i}", daemon=True)
+            processo.start()
+            remota.close()
+            self._conexoes.append(local)
+            self._processos.append(processo)
+        self.logger.info(f"Catálogo fragmentado iniciado com {self.n_fragmentos} processos")
+
+    # =============================================================
+    # 🔌 COMUNICAÇÃO COM OS FRAGMENTOS
+    # =============================================================
+    def fragmento_de(self, nome: str) -> int:
+        """Fragmento dono da categoria raiz (crc32 é estável entre processos, ao contrário de hash())."""
+        return zlib.crc32(nome.encode("utf-8")) % self.n_fragmentos
+
+    @staticmethod
+    def _valor(resposta):
+        situacao, valor = resposta
+        if situacao == "erro":
+            raise RuntimeError(f"Erro no fragmento: {valor}")
+        return valor
+
+    def _chamar(self, indice: int, comando: str, *args):
+        with self._travas[indice]:
+            self._conexoes[indice].send((comando, args))
+            return self._valor(self._conexoes[indice].recv())
+
+    def _chamar_varios(self, pedidos: Dict[int, Tuple]) -> Dict[int, object]:
+        """Envia {fragmento: (comando, args)} a todos antes de esperar: os fragmentos trabalham em paralelo."""
+        indices = sorted(pedidos)
+        enviados = []
+        for i in indices:
+            self._travas[i].acquire()
+        try:
+            try:
+                for i in indices:
+                    self._conexoes[i].send(pedidos[i])
+                    enviados.append(i)
+            finally:
+                # Todas as respostas são lidas antes de qualquer erro subir: uma resposta
+                # deixada no canal seria lida pelo próximo pedido, defasando os seguintes
+                respostas = {i: self._conexoes[i].recv() for i in enviados}
+            return {i: self._valor(respostas[i]) for i in indices}
+        finally:
+            for i in indices:
+                self._travas[i].release()
+
+    def _chamar_todos(self, comando: str, *args) -> List:
+        respostas = self._chamar_varios({i: (comando, args) for i in range(self.n_fragmentos)})
+        return [respostas[i] for i in range(self.n_fragmentos)]
+
+    # =============================================================
+    # 🌳 CATEGORIAS
+    # =============================================================
+    def carregar_em_lote(self, categorias: Iterable[Categoria]) -> int:
+        """Distribui as categorias pelos fragmentos e carrega cada grupo em lote (retorna quantas entraram)."""
+        grupos: Dict[int, List[Categoria]] = {}
+        for categoria in categorias:
+            grupos.setdefault(self.fragmento_de(categoria.nome), []).append(categoria)
+        respostas = self._chamar_varios({i: ("carregar", (grupo,)) for i, grupo in grupos.items()})
+        return sum(respostas.values())
+
+    def inserir_publico(self, categoria: Categoria) -> bool:
+        return self._chamar(self.fragmento_de(categoria.nome), "inserir", categoria)
+
+    def remover_publico(self, nome: str) -> bool:
+        return self._chamar(self.fragmento_de(nome), "remover", nome)
+
+    def buscar_publico(self, nome: str) -> Optional[Categoria]:
+        return self._chamar(self.fragmento_de(nome), "buscar", nome)
+
+    def get_tamanho(self) -> int:
+        return sum(categorias for categorias, _ in self._chamar_todos("tamanho"))
+
+    def total_produtos_indexados(self) -> int:
+        return sum(produtos for _, produtos in self._chamar_todos("tamanho"))
+
+    # =============================================================
+    # 🔍 BUSCA E RECOMENDAÇÃO
+    # =============================================================
+    def sugerir_por_prefixo(self, prefixo: str, limite: int = 7, registrar_busca: bool = True) -> List[Dict]:
+        """Top-k de cada fragmento mesclado pela pontuação: o resultado é o mesmo de um índice único."""
+        if not prefixo or limite <= 0:
+            return []
+        parciais = self._chamar_todos("sugerir", prefixo, limite)
+        sugestoes = [item for _, item in
+                     islice(heapq.merge(*parciais, key=_pontuacao, reverse=True), limite)]
+
+        if sugestoes and registrar_busca:
+            primeiro = sugestoes[0]
+            self.registrar_eventos([(primeiro.get("categoria", ""), primeiro.get("nome"), "busca")])
+        return sugestoes
+
+    def listar_todos_produtos(self) -> List[Dict]:
+        """Todos os produtos, na ordem global de peso (mescla em k vias das listas já ordenadas)."""
+        return list(heapq.merge(*self._chamar_todos("produtos"), key=_ordem_ranking))
+
+    def produtos_mais_populares(self, n: int = 10) -> List[Dict]:
+        """Os n produtos de maior peso: cada fragmento devolve só o seu top-n."""
+        parciais = self._chamar_todos("mais_populares", n)
+        return list(islice(heapq.merge(*parciais, key=_ordem_ranking), max(n, 0)))
+
+    def registrar_eventos(self, eventos: Iterable[Tuple[str, str, str]]) -> int:
+        """Encaminha cada evento (caminho, produto, tipo) ao fragmento da categoria raiz do caminho."""
+        grupos: Dict[int, List[Tuple]] = {}
+        for evento in eventos:
+            partes = dividir_caminho(evento[0]) if evento[0] else []
+            if partes:
+                grupos.setdefault(self.fragmento_de(partes[0]), []).append(evento)
+        if not grupos:
+            return 0
+        return sum(self._chamar_varios({i: ("eventos", (grupo,)) for i, grupo in grupos.items()}).values())
+
+    # =============================================================
+    # ⏹️ ENCERRAMENTO
+    # =============================================================
+    def fechar(self, timeout: float = 5.0) -> None:
+        """Encerra os processos dos fragmentos."""
+        for i, conexao in enumerate(self._conexoes):
+            with self._travas[i]:
+                try:
+                    conexao.send(("parar", ()))
+                    conexao.recv()
+                except (EOFError, OSError, BrokenPipeError):
+                    pass
+                conexao.close()
+        for processo in self._processos:
+            processo.join(timeout)
+            if processo.is_alive():
+                processo.terminate()
+        self._conexoes = []
+        self._processos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,309 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import heapq
+import mmap
+import struct
+from array import array
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.persistencia_catalogo import _escrever_categoria, _ler_categoria
+from app.utils.logger import Logger
+
+logger = Logger(__name__)
+
+# =============================================================
+# 📐 FORMATO DO ARQUIVO MAPEADO (little-endian, seções alinhadas em 8 bytes)
+# =============================================================
+# Cabeçalho: assinatura, versão, quantidade de categorias raiz, de produtos e de caminhos,
+#            seguidos da posição de cada seção no arquivo.
+# Textos são guardados como um vetor de posições (uint64, n + 1) e um bloco UTF-8 contínuo.
+# Os produtos ficam ordenados pela chave em maiúsculas (ordem de bytes UTF-8 = ordem de str),
+# então um prefixo corresponde a um intervalo contínuo, achado por busca binária.
+ASSINATURA_MMAP = b"SRHPMAP\0"
+VERSAO_FORMATO_MMAP = 1
+_SECOES = (
+    "nomes_categorias_pos", "nomes_categorias",       # raízes em ordem alfabética
+    "registros_pos", "registros",                     # registros de persistencia_catalogo
+    "chaves_pos", "chaves",                           # nome do produto em maiúsculas
+    "nomes_produtos_pos", "nomes_produtos",
+    "caminhos_pos", "caminhos", "caminho_do_produto",
+    "peso_categoria", "peso_produto",
+    "ordem_pontuacao",                                # produtos do maior ao menor peso
+    "posicao_na_ordem",                               # inverso de ordem_pontuacao
+)
+_CABECALHO = struct.Struct("<8sH6xQQQ" + "Q" * len(_SECOES))
+
+
+# =============================================================
+# 💾 COMPILAÇÃO
+# =============================================================
+def _para_bytes(vetor: array) -> bytes:
+    if sys.byteorder == "big":
+        vetor = array(vetor.typecode, vetor)
+        vetor.byteswap()
+    return vetor.tobytes()
+
+
+def _tabela_textos(textos) -> Tuple[bytes, bytes]:
+    codificados = [t if isinstance(t, bytes) else t.encode("utf-8") for t in textos]
+    posicoes = array("Q", accumulate(map(len, codificados), initial=0))
+    return _para_bytes(posicoes), b"".join(codificados)
+
+
+def _gravar_secao(arquivo, dados: bytes) -> int:
+    arquivo.write(b"\0" * (-arquivo.tell() % 8))
+    posicao = arquivo.tell()
+    arquivo.write(dados)
+    return posicao
+
+
+def compilar_catalogo_mmap(arvore: ArvoreAVL, caminho: str) -> int:
+    """
+    Grava a árvore (categorias, produtos, pesos e índice de prefixos) no formato
+    lido por CatalogoMapeado. O arquivo é montado num temporário e trocado ao final.
+    Retorna quantos produtos foram indexados.
+    """
+    raizes = list(arvore.snapshot())   # já em ordem alfabética
+
+    caminhos: List[str] = []
+    produtos = []   # (chave, nome, caminho, peso da categoria, peso do produto)
+    pilha = [(raiz, raiz.nome) for raiz in reversed(raizes)]
+    while pilha:
+        categoria, caminho_categoria = pilha.pop()
+        indice_caminho = len(caminhos)
+        caminhos.append(caminho_categoria)
+        for produto in categoria.produtos:
+            produtos.append((produto["nome"].upper().encode("utf-8"), produto["nome"], indice_caminho,
+                             categoria.peso_popularidade, produto["peso_produto"]))
+        for sub in reversed(categoria.subcategorias):
+            pilha.append((sub, f"{caminho_categoria} > {sub.nome}"))
+    produtos.sort(key=lambda p: (p[0], p[2]))
+
+    peso_categoria = array("d", (p[3] for p in produtos))
+    peso_produto = array("d", (p[4] for p in produtos))
+    ordem = array("I", sorted(range(len(produtos)),
+                              key=lambda i: (-peso_categoria[i], -peso_produto[i], i)))
+    posicao_na_ordem = array("I", bytes(4 * len(ordem)))
+    for posicao, i in enumerate(ordem):
+        posicao_na_ordem[i] = posicao
+
+    posicoes = dict.fromkeys(_SECOES, 0)
+    temporario = f"{caminho}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(b"\0" * _CABECALHO.size)   # reescrito ao final, com as posições
+
+        pos_nomes, bloco_nomes = _tabela_textos(raiz.nome for raiz in raizes)
+        posicoes["nomes_categorias_pos"] = _gravar_secao(arquivo, pos_nomes)
+        posicoes["nomes_categorias"] = _gravar_secao(arquivo, bloco_nomes)
+
+        inicio_registros = []
+        posicoes["registros"] = _gravar_secao(arquivo, b"")
+        for raiz in raizes:
+            inicio_registros.append(arquivo.tell())
+            _escrever_categoria(arquivo, raiz)
+        inicio_registros.append(arquivo.tell())
+        posicoes["registros_pos"] = _gravar_secao(arquivo, _para_bytes(array("Q", inicio_registros)))
+
+        for secao, textos in (("chaves", (p[0] for p in produtos)),
+                              ("nomes_produtos", (p[1] for p in produtos)),
+                              ("caminhos", caminhos)):
+            pos_textos, bloco = _tabela_textos(textos)
+            posicoes[f"{secao}_pos"] = _gravar_secao(arquivo, pos_textos)
+            posicoes[secao] = _gravar_secao(arquivo, bloco)
+
+        posicoes["caminho_do_produto"] = _gravar_secao(arquivo, _para_bytes(array("I", (p[2] for p in produtos))))
+        posicoes["peso_categoria"] = _gravar_secao(arquivo, _para_bytes(peso_categoria))
+        posicoes["peso_produto"] = _gravar_secao(arquivo, _para_bytes(peso_produto))
+        posicoes["ordem_pontuacao"] = _gravar_secao(arquivo, _para_bytes(ordem))
+        posicoes["posicao_na_ordem"] = _gravar_secao(arquivo, _para_bytes(posicao_na_ordem))
+
+        arquivo.seek(0)
+        arquivo.write(_CABECALHO.pack(ASSINATURA_MMAP, VERSAO_FORMATO_MMAP, len(raizes), len(produtos),
+                                      len(caminhos), *(posicoes[s] for s in _SECOES)))
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+    logger.info(f"Catálogo mapeado compilado em '{caminho}': {len(raizes)} categorias raiz, "
+                f"{len(produtos)} produtos")
+    return len(produtos)
+
+
+# =============================================================
+# 📖 LEITURA (somente leitura, direto das páginas mapeadas)
+# =============================================================
+class CatalogoMapeado:
+    """
+    Catálogo somente leitura aberto com mmap a partir de um arquivo gerado por
+    compilar_catalogo_mmap.
+
+    Abrir custa O(1): nada é desserializado, as consultas fazem busca binária
+    direto nos vetores mapeados e vários processos que abrem o mesmo arquivo
+    compartilham as mesmas páginas do cache do sistema. Como nada muda depois
+    de aberto, consultas simultâneas não precisam de trava. buscar_publico
+    devolve uma Categoria montada na hora: alterações nela não voltam ao arquivo.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._dados = memoryview(self._mapa)
+        self._visoes: List[memoryview] = [self._dados]
+        try:
+            self._abrir()
+        except (ValueError, TypeError, struct.error) as e:
+            self.fechar()
+            raise ValueError(f"'{caminho}' não é um catálogo mapeado válido: {e}") from e
+
+    def _abrir(self) -> None:
+        if len(self._dados) < _CABECALHO.size:
+            raise ValueError("arquivo menor que o cabeçalho")
+        assinatura, versao, n_categorias, n_produtos, n_caminhos, *posicoes = _CABECALHO.unpack_from(self._dados, 0)
+        if assinatura != ASSINATURA_MMAP:
+            raise ValueError("assinatura desconhecida")
+        if versao != VERSAO_FORMATO_MMAP:
+            raise ValueError(f"versão não suportada: {versao}")
+        secoes = dict(zip(_SECOES, posicoes))
+
+        self.n_categorias = n_categorias
+        self.n_produtos = n_produtos
+        self._pos_nomes_categorias = self._vetor(secoes["nomes_categorias_pos"], n_categorias + 1, "Q")
+        self._nomes_categorias = secoes["nomes_categorias"]
+        self._pos_registros = self._vetor(secoes["registros_pos"], n_categorias + 1, "Q")
+        self._pos_chaves = self._vetor(secoes["chaves_pos"], n_produtos + 1, "Q")
+        self._chaves = secoes["chaves"]
+        self._pos_nomes_produtos = self._vetor(secoes["nomes_produtos_pos"], n_produtos + 1, "Q")
+        self._nomes_produtos = secoes["nomes_produtos"]
+        self._pos_caminhos = self._vetor(secoes["caminhos_pos"], n_caminhos + 1, "Q")
+        self._caminhos = secoes["caminhos"]
+        self._caminho_do_produto = self._vetor(secoes["caminho_do_produto"], n_produtos, "I")
+        self._peso_categoria = self._vetor(secoes["peso_categoria"], n_produtos, "d")
+        self._peso_produto = self._vetor(secoes["peso_produto"], n_produtos, "d")
+        self._ordem = self._vetor(secoes["ordem_pontuacao"], n_produtos, "I")
+        self._posicao_na_ordem = self._vetor(secoes["posicao_na_ordem"], n_produtos, "I")
+
+    def _vetor(self, posicao: int, n: int, formato: str):
+        """Vetor sobre as páginas mapeadas (em máquinas big-endian, uma cópia convertida)."""
+        tamanho = n * struct.calcsize(formato)
+        if posicao + tamanho > len(self._dados):
+            raise ValueError("seção fora do arquivo")
+        visao = self._dados[posicao:posicao + tamanho].cast(formato)
+        self._visoes.append(visao)
+        if sys.byteorder == "big":
+            copia = array(formato, visao)
+            copia.byteswap()
+            return copia
+        return visao
+
+    def _texto(self, posicoes, bloco: int, i: int) -> bytes:
+        return self._mapa[bloco + posicoes[i]:bloco + posicoes[i + 1]]
+
+    @staticmethod
+    def _primeiro(n: int, condicao: Callable[[int], bool], inicio: int = 0) -> int:
+        """Busca binária: menor i em [inicio, n) com condicao(i) verdadeira (n se nenhum)."""
+        fim = n
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if condicao(meio):
+                fim = meio
+            else:
+                inicio = meio + 1
+        return inicio
+
+    # =============================================================
+    # 🌳 CATEGORIAS
+    # =============================================================
+    def get_tamanho(self) -> int:
+        return self.n_categorias
+
+    def nomes_categorias(self) -> Iterator[str]:
+        """Nomes das categorias raiz em ordem alfabética."""
+        for i in range(self.n_categorias):
+            yield str(self._texto(self._pos_nomes_categorias, self._nomes_categorias, i), "utf-8")
+
+    def buscar_publico(self, nome: str) -> Optional[Categoria]:
+        """Busca binária pelo nome da categoria raiz: O(log n), montando só a categoria encontrada."""
+        alvo = nome.encode("utf-8")
+        i = self._primeiro(self.n_categorias,
+                           lambda j: self._texto(self._pos_nomes_categorias, self._nomes_categorias, j) >= alvo)
+        if i == self.n_categorias or self._texto(self._pos_nomes_categorias, self._nomes_categorias, i) != alvo:
+            return None
+        categoria, _ = _ler_categoria(self._dados, self._pos_registros[i])
+        return categoria
+
+    # =============================================================
+    # 🔍 SUGESTÕES POR PREFIXO
+    # =============================================================
+    def total_produtos_indexados(self) -> int:
+        return self.n_produtos
+
+    def _intervalo_prefixo(self, prefixo: bytes) -> Tuple[int, int]:
+        """Produtos cuja chave começa com o prefixo formam o intervalo [inicio, fim)."""
+        tamanho = len(prefixo)
+        inicio = self._primeiro(self.n_produtos,
+                                lambda i: self._texto(self._pos_chaves, self._chaves, i) >= prefixo)
+        fim = self._primeiro(self.n_produtos,
+                             lambda i: self._texto(self._pos_chaves, self._chaves, i)[:tamanho] > prefixo,
+                             inicio)
+        return inicio, fim
+
+    def _item(self, i: int) -> Tuple[Tuple[float, float], Dict]:
+        caminho = self._caminho_do_produto[i]
+        return ((self._peso_categoria[i], self._peso_produto[i]),
+                {"nome": str(self._texto(self._pos_nomes_produtos, self._nomes_produtos, i), "utf-8"),
+                 "categoria": str(self._texto(self._pos_caminhos, self._caminhos, caminho), "utf-8")})
+
+    def sugestoes_pontuadas(self, prefixo: str, limite: int = 7) -> List[Tuple]:
+        """Pares (pontuação, sugestão) do top-k do prefixo, na mesma forma do RecomendacaoService."""
+        if not prefixo or limite <= 0:
+            return []
+        inicio, fim = self._intervalo_prefixo(prefixo.upper().encode("utf-8"))
+        quantidade = fim - inicio
+        if quantidade == 0:
+            return []
+
+        escolhidos = None
+        if quantidade * quantidade > self.n_produtos * limite:
+            # Intervalo longo: percorre o começo da ordem global de peso, no máximo
+            # 'quantidade' posições (o custo do caminho curto), até achar 'limite' produtos
+            escolhidos = []
+            for i in self._ordem[:quantidade]:
+                if inicio <= i < fim:
+                    escolhidos.append(i)
+                    if len(escolhidos) == limite:
+                        break
+            if len(escolhidos) < limite:
+                escolhidos = None
+        if escolhidos is None:
+            # Intervalo curto (ou prefixo raro entre os mais pesados): as menores posições
+            # na ordem global de peso dentro do intervalo
+            ordem = self._ordem
+            escolhidos = [ordem[p] for p in heapq.nsmallest(limite, self._posicao_na_ordem[inicio:fim])]
+        return [self._item(i) for i in escolhidos]
+
+    def sugerir_por_prefixo(self, prefixo: str, limite: int = 7) -> List[Dict]:
+        return [item for _, item in self.sugestoes_pontuadas(prefixo, limite)]
+
+    # =============================================================
+    # ⏹️ ENCERRAMENTO
+    # =============================================================
+    def fechar(self) -> None:
+        """Libera as visões e desfaz o mapeamento do arquivo."""
+        for visao in reversed(self._visoes):
+            visao.release()
+        self._visoes = []
+        if not self._mapa.closed:
+            self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,271 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import json
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.utils.logger import Logger
+from app.utils.rwlock import TravaLeituraEscrita
+
+logger = Logger(__name__)
+
+# Cada registro: tamanho e crc32 do conteúdo (uint32, little-endian) + lista JSON
+# [número, operação, *argumentos]. O número cresce sem reiniciar no checkpoint: o catálogo
+# salvo guarda o último que contém, e a reaplicação pula os que já estão nele.
+# Registros antigos, sem número ([operação, *argumentos]), são sempre reaplicados.
+_REGISTRO = struct.Struct("<II")
+
+
+def _codificar(numero: int, operacao: str, args: tuple) -> bytes:
+    conteudo = json.dumps([numero, operacao, *args], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _REGISTRO.pack(len(conteudo), zlib.crc32(conteudo)) + conteudo
+
+
+def _separar_numero(registro: list) -> Tuple[Optional[int], list]:
+    """(número, [operação, *argumentos]); número None em registros sem numeração."""
+    if registro and isinstance(registro[0], int):
+        return registro[0], registro[1:]
+    return None, registro
+
+
+def _ler_registros(dados: bytes) -> Tuple[List[list], int]:
+    """Registros íntegros do diário e o tamanho do trecho válido (um final cortado é descartado)."""
+    registros = []
+    pos = 0
+    while pos + _REGISTRO.size <= len(dados):
+        tamanho, crc = _REGISTRO.unpack_from(dados, pos)
+        inicio = pos + _REGISTRO.size
+        conteudo = dados[inicio:inicio + tamanho]
+        if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+            break
+        registros.append(json.loads(conteudo))
+        pos = inicio + tamanho
+    return registros, pos
+
+
+class DiarioAlteracoes:
+    """
+    Diário (write-ahead log) das alterações no catálogo: só acrescenta registros ao final.
+
+    Quem altera o catálogo registra a operação e espera ela chegar ao disco.
+    Uma thread de fundo grava os registros acumulados de uma vez, com um único
+    fsync por lote (group commit): com muitas escritas simultâneas, o custo do
+    fsync é dividido entre elas. Na inicialização, reaplicar_diario refaz as
+    operações sobre o último catálogo salvo; checkpoint salva o catálogo e
+    esvazia o diário.
+
+    'ultimo_registro' é o número gravado no catálogo salvo (registro_do_catalogo):
+    a numeração continua a partir dele ou do último registro já no arquivo.
+    """
+
+    def __init__(self, caminho: str, intervalo: float = 0.002, ultimo_registro: int = 0):
+        self.caminho = caminho
+        self.intervalo = intervalo   # janela para juntar mais registros no mesmo fsync
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._arquivo = open(caminho, "ab")
+        for registro in _ler_registros(_conteudo(caminho))[0]:
+            numero, _ = _separar_numero(registro)
+            if numero is not None:
+                ultimo_registro = max(ultimo_registro, numero)
+
+        # Alterações (compartilhada) x checkpoint (exclusiva): o catálogo salvo e o diário
+        # esvaziado correspondem exatamente ao mesmo ponto
+        self._trava = TravaLeituraEscrita()
+
+        self._condicao = threading.Condition()
+        self._pendentes = bytearray()
+        self._ultimo = ultimo_registro    # número do último registro aceito
+        self._duravel = ultimo_registro   # número do último registro já gravado com fsync
+        self._erro: Optional[OSError] = None
+        self._ativo = True
+        self.lotes_gravados = 0
+        self._thread = threading.Thread(target=self._executar, name="diario-alteracoes", daemon=True)
+        self._thread.start()
+
+    # =============================================================
+    # ✍️ REGISTRO
+    # =============================================================
+    @contextmanager
+    def alteracao(self):
+        """Envolve a alteração em memória e o seu registro (não roda junto com um checkpoint)."""
+        with self._trava.leitura():
+            yield self
+
+    def registrar(self, operacao: str, *args, esperar: bool = True) -> int:
+        """Acrescenta a operação ao diário; com esperar=True, só retorna depois do fsync."""
+        with self._condicao:
+            if not self._ativo:
+                raise RuntimeError("Diário de alterações fechado")
+            # Numerado e acrescentado juntos: a ordem no arquivo é a ordem dos números
+            numero = self._ultimo + 1
+            self._pendentes += _codificar(numero, operacao, args)
+            self._ultimo = numero
+            self._condicao.notify_all()
+        if esperar:
+            self._esperar(numero)
+        return numero
+
+    def sincronizar(self) -> None:
+        """Espera todos os registros aceitos até agora chegarem ao disco."""
+        with self._condicao:
+            numero = self._ultimo
+        self._esperar(numero)
+
+    def _esperar(self, numero: int) -> None:
+        with self._condicao:
+            while self._duravel < numero and self._erro is None:
+                self._condicao.wait()
+            if self._erro is not None:
+                raise self._erro
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._pendentes and self._ativo:
+                    self._condicao.wait()
+                if not self._pendentes:
+                    return
+                # Janela de agrupamento: outros registros entram no mesmo fsync
+                prazo = time.monotonic() + self.intervalo
+                while self._ativo and time.monotonic() < prazo:
+                    self._condicao.wait(prazo - time.monotonic())
+                lote = bytes(self._pendentes)
+                self._pendentes.clear()
+                ate = self._ultimo
+            try:
+                self._arquivo.write(lote)
+                self._arquivo.flush()
+                os.fsync(self._arquivo.fileno())
+            except OSError as e:
+                logger.error(f"Falha ao gravar o diário '{self.caminho}': {str(e)}")
+                with self._condicao:
+                    self._erro = e
+                    self._condicao.notify_all()
+                return
+            with self._condicao:
+                self._duravel = ate
+                self.lotes_gravados += 1
+                self._condicao.notify_all()
+
+    # =============================================================
+    # 📌 CHECKPOINT E ENCERRAMENTO
+    # =============================================================
+    def checkpoint(self, salvar: Callable[[int], object]):
+        """
+        Bloqueia novas alterações, salva o catálogo com salvar(ultimo_registro) e esvazia
+        o diário. 'salvar' grava o número recebido no catálogo (salvar_catalogo(...,
+        registro_diario=n)): se o processo cair depois de salvar e antes de esvaziar, a
+        reaplicação pula esses registros em vez de aplicá-los duas vezes.
+        """
+        with self._trava.escrita():
+            self.sincronizar()
+            resultado = salvar(self._ultimo)
+            self._arquivo.truncate(0)
+            os.fsync(self._arquivo.fileno())
+        logger.info(f"Checkpoint: diário '{self.caminho}' esvaziado")
+        return resultado
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e fecha o arquivo."""
+        with self._condicao:
+            if not self._ativo:
+                return
+            self._ativo = False
+            self._condicao.notify_all()
+        self._thread.join()
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+# =============================================================
+# 🔁 REAPLICAÇÃO NA INICIALIZAÇÃO
+# =============================================================
+def _resolver(arvore: ArvoreAVL, caminho: str) -> Optional[Categoria]:
+    return arvore.resolver_caminho(caminho, ignorar_caixa=True)
+
+
+def _criar_categoria(arvore, recomendador, nome):
+    if arvore.buscar_publico(nome) is None:
+        arvore.inserir_publico(Categoria(nome))
+
+
+def _criar_subcategoria(arvore, recomendador, caminho, nome):
+    pai = _resolver(arvore, caminho)
+    if pai is not None and pai.obter_subcategoria(nome, ignorar_caixa=True) is None:
+        pai.adicionar_subcategoria(Categoria(nome))
+
+
+def _resetar_colecao(arvore, recomendador):
+    for categoria in arvore.listar_todas():
+        arvore.remover_publico(categoria.nome)
+    arvore.carregar_em_lote(criar_categorias_iniciais())
+
+
+def _aplicar_em(metodo: str):
+    """Operação aplicada na categoria do caminho (ignorada se ela não existir mais)."""
+    def aplicar(arvore, recomendador, caminho, *args):
+        categoria = _resolver(arvore, caminho)
+        if categoria is not None:
+            getattr(categoria, metodo)(*args)
+    return aplicar
+
+
+_OPERACOES = {
+    "categoria_criada": _criar_categoria,
+    "categoria_removida": lambda arvore, recomendador, nome: arvore.remover_publico(nome),
+    "subcategoria_criada": _criar_subcategoria,
+    "subcategoria_removida": _aplicar_em("remover_subcategoria"),
+    "produto_criado": _aplicar_em("adicionar_produto"),
+    "produto_removido": _aplicar_em("remover_produto"),
+    "peso_categoria": _aplicar_em("aumentar_peso"),
+    "eventos": lambda arvore, recomendador, eventos: recomendador.registrar_eventos(
+        [tuple(evento) for evento in eventos]),
+    "colecao_resetada": _resetar_colecao,
+}
+
+
+def _conteudo(caminho: str) -> bytes:
+    if not os.path.exists(caminho):
+        return b""
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+
+def reaplicar_diario(caminho: str, arvore: ArvoreAVL, recomendador, ultimo_salvo: int = 0) -> int:
+    """
+    Refaz sobre a árvore (já carregada do último catálogo salvo) as operações do
+    diário. Registros com número até 'ultimo_salvo' (registro_do_catalogo) já estão
+    no catálogo e são pulados. Um registro final incompleto (queda no meio da
+    gravação) é descartado e cortado do arquivo. Retorna quantas operações foram reaplicadas.
+    """
+    dados = _conteudo(caminho)
+    registros, valido = _ler_registros(dados)
+    if valido < len(dados):
+        logger.warning(f"Diário '{caminho}': {len(dados) - valido} bytes finais incompletos descartados")
+        with open(caminho, "r+b") as arquivo:
+            arquivo.truncate(valido)
+
+    reaplicados = 0
+    for registro in registros:
+        numero, (operacao, *args) = _separar_numero(registro)
+        if numero is not None and numero <= ultimo_salvo:
+            continue
+        _OPERACOES[operacao](arvore, recomendador, *args)
+        reaplicados += 1
+    if reaplicados:
+        logger.info(f"Diário '{caminho}': {reaplicados} operações reaplicadas")
+    return reaplicados
@@ -0,0 +1,132 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from app.utils.logger import Logger
+
+
+class FilaEventosPopularidade:
+    """
+    Fila de eventos de popularidade com uma thread de fundo.
+
+    Quem publica só acrescenta o evento na fila e segue em frente; a thread
+    aplica os eventos acumulados em lote quando a fila atinge 'tamanho_lote'
+    ou a cada 'intervalo' segundos (o que vier primeiro). Só uma aplicação
+    acontece por vez, o que limita a disputa pela escrita na árvore.
+    """
+
+    def __init__(self, aplicar: Callable[[List[Tuple]], int], intervalo: float = 0.5,
+                 tamanho_lote: int = 1000, nome: str = "fila-eventos-popularidade"):
+        self._aplicar = aplicar               # recebe a lista de eventos (ex.: registrar_eventos)
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.nome = nome
+        self.logger = Logger(__name__)
+
+        self._pendentes: List[Tuple] = []
+        self._condicao = threading.Condition()
+        self._trava_aplicacao = threading.Lock()  # uma aplicação de lote por vez
+        self._thread: Optional[threading.Thread] = None
+        self._ativa = False
+
+        self.total_publicados = 0
+        self.total_aplicados = 0
+        self.lotes_aplicados = 0
+
+    # =============================================================
+    # ▶️ CICLO DE VIDA
+    # =============================================================
+    def iniciar(self) -> 'FilaEventosPopularidade':
+        """Inicia a thread de fundo (sem efeito se já estiver rodando)."""
+        with self._condicao:
+            if self._ativa:
+                return self
+            self._ativa = True
+        self._thread = threading.Thread(target=self._executar, name=self.nome, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, aplicar_pendentes: bool = True, timeout: Optional[float] = None) -> None:
+        """Encerra a thread; por padrão aplica o que ainda estiver na fila."""
+        with self._condicao:
+            self._ativa = False
+            self._condicao.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if aplicar_pendentes:
+            self.flush()
+        else:
+            with self._condicao:
+                self._pendentes = []
+
+    @property
+    def ativa(self) -> bool:
+        return self._ativa
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    # =============================================================
+    # 📥 PUBLICAÇÃO
+    # =============================================================
+    def publicar(self, evento: Tuple) -> bool:
+        """Enfileira um evento (caminho, produto, tipo) e retorna imediatamente."""
+        return self.publicar_varios((evento,))
+
+    def publicar_varios(self, eventos: Iterable[Tuple]) -> bool:
+        """
+        Enfileira vários eventos de uma vez. Retorna False, sem enfileirar, se a fila
+        não estiver ativa: a verificação e o acréscimo acontecem sob a mesma trava que
+        parar() usa, então nada entra depois da última aplicação e se perde.
+        """
+        eventos = list(eventos)
+        with self._condicao:
+            if not self._ativa:
+                return False
+            self._pendentes.extend(eventos)
+            self.total_publicados += len(eventos)
+            if len(self._pendentes) >= self.tamanho_lote:
+                self._condicao.notify()
+        return True
+
+    def __len__(self) -> int:
+        with self._condicao:
+            return len(self._pendentes)
+
+    # =============================================================
+    # 📤 APLICAÇÃO
+    # =============================================================
+    def flush(self) -> int:
+        """Aplica agora, na thread de quem chamou, tudo o que foi publicado até aqui."""
+        with self._trava_aplicacao:
+            with self._condicao:
+                lote, self._pendentes = self._pendentes, []
+            return self._aplicar_lote(lote)
+
+    def _aplicar_lote(self, lote: List[Tuple]) -> int:
+        if not lote:
+            return 0
+        try:
+            aplicados = self._aplicar(lote)
+        except Exception as e:
+            self.logger.error(f"Erro ao aplicar lote de {len(lote)} eventos: {str(e)}", exc_info=True)
+            return 0
+        self.total_aplicados += len(lote)
+        self.lotes_aplicados += 1
+        return aplicados
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                if self._ativa and len(self._pendentes) < self.tamanho_lote:
+                    self._condicao.wait(self.intervalo)
+                if not self._ativa:
+                    return
+            self.flush()
@@ -0,0 +1,181 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import csv
+import io
+import json
+from contextlib import nullcontext
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import SEPARADOR_CAMINHO, Categoria, dividir_caminho
+from app.utils.coleta_lixo import coleta_de_lixo_pausada
+from app.utils.logger import Logger
+
+logger = Logger(__name__)
+
+FORMATOS = ("csv", "jsonl")
+
+# Linha lida do arquivo: (caminho da categoria, produto, peso)
+Linha = Tuple[List[str], str, float]
+
+
+# =============================================================
+# 📄 LEITURA DAS LINHAS (uma por vez, sem carregar o arquivo)
+# =============================================================
+def _linha(caminho_completo: str, peso) -> Linha:
+    """'Categoria > Sub > Produto' e peso -> (['Categoria', 'Sub'], 'Produto', peso)."""
+    partes = dividir_caminho(caminho_completo)
+    if len(partes) < 2:
+        raise ValueError(f"Caminho sem categoria ou produto: '{caminho_completo}'")
+    peso = 1.0 if peso in (None, "") else float(peso)
+    return partes[:-1], partes[-1], peso
+
+
+def _parece_cabecalho(colunas: List[str]) -> bool:
+    """'caminho,peso': nenhum separador de caminho e segunda coluna que não é número."""
+    if len(colunas) < 2 or SEPARADOR_CAMINHO in colunas[0]:
+        return False
+    try:
+        float(colunas[1])
+    except ValueError:
+        return True
+    return False
+
+
+def ler_csv(arquivo: TextIO) -> Iterator[Optional[Linha]]:
+    """
+    Linhas 'Categoria > Sub > Produto,peso' (peso opcional, 1.0 por padrão).
+    Um cabeçalho na primeira linha é ignorado; linhas inválidas viram None
+    (inclusive a primeira, quando não tem cara de cabeçalho).
+    """
+    for numero, colunas in enumerate(csv.reader(arquivo)):
+        if not colunas or not colunas[0].strip():
+            continue
+        try:
+            yield _linha(colunas[0], colunas[1].strip() if len(colunas) > 1 else None)
+        except ValueError:
+            if numero > 0 or not _parece_cabecalho(colunas):
+                yield None
+
+
+def ler_jsonl(arquivo: TextIO) -> Iterator[Optional[Linha]]:
+    """
+    Um objeto por linha: {"caminho": "Categoria > Sub > Produto", "peso": 2.5}
+    ou {"categoria": "Categoria > Sub", "produto": "Produto", "peso": 2.5}.
+    Linhas inválidas viram None.
+    """
+    for texto in arquivo:
+        if not texto.strip():
+            continue
+        try:
+            dados = json.loads(texto)
+            if "caminho" in dados:
+                yield _linha(dados["caminho"], dados.get("peso"))
+            else:
+                yield _linha(f"{dados['categoria']} > {dados['produto']}", dados.get("peso"))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield None
+
+
+_LEITORES = {"csv": ler_csv, "jsonl": ler_jsonl}
+
+
+def formato_do_arquivo(nome: str) -> str:
+    """Formato pela extensão do arquivo (.csv, .jsonl/.ndjson)."""
+    extensao = os.path.splitext(nome)[1].lower()
+    if extensao == ".csv":
+        return "csv"
+    if extensao in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Formato de importação não reconhecido: '{nome}'")
+
+
+# =============================================================
+# 📥 IMPORTAÇÃO
+# =============================================================
+def _categoria_destino(raiz: Categoria, subcategorias: List[str]) -> Categoria:
+    categoria = raiz
+    for nome in subcategorias:
+        sub = categoria.obter_subcategoria(nome, ignorar_caixa=True)
+        if sub is None:
+            sub = Categoria(nome)
+            categoria.adicionar_subcategoria(sub)
+        categoria = sub
+    return categoria
+
+
+def _categoria_raiz(nome: str, arvore: ArvoreAVL, novas: Dict[str, Categoria],
+                    existentes: Dict[str, Categoria]) -> Categoria:
+    """
+    Categoria raiz do nome, ignorando maiúsculas/minúsculas como nas subcategorias.
+    A busca exata na árvore vem primeiro; só quando ela falha as raízes existentes
+    são indexadas pelo nome em minúsculas (uma vez por importação).
+    """
+    chave = nome.lower()
+    raiz = novas.get(chave) or arvore.buscar_publico(nome)
+    if raiz is not None:
+        return raiz
+    if not existentes:
+        existentes.update((categoria.nome.lower(), categoria) for categoria in arvore.iter_em_ordem_reversa())
+    raiz = existentes.get(chave)
+    if raiz is None:
+        raiz = novas[chave] = Categoria(nome)
+    return raiz
+
+
+def importar_linhas(linhas: Iterable[Optional[Linha]], arvore: ArvoreAVL, recomendador=None,
+                    tamanho_bloco: int = 10_000) -> Dict[str, int]:
+    """
+    Importa as linhas em blocos: produtos de categorias que já existem são acrescentados
+    nelas; categorias raiz novas são montadas fora da árvore e entram de uma vez com
+    carregar_em_lote. Com um recomendador, os índices são reconstruídos uma única vez
+    ao final. Só as categorias ficam em memória, nunca o arquivo inteiro.
+    Retorna o resumo {'linhas', 'duplicadas', 'rejeitadas', 'categorias_novas'}:
+    'linhas' conta só os produtos acrescentados; os que já existiam na categoria
+    ficam como estavam e entram em 'duplicadas'.
+    """
+    novas: Dict[str, Categoria] = {}
+    existentes: Dict[str, Categoria] = {}
+    resumo = {"linhas": 0, "duplicadas": 0, "rejeitadas": 0, "categorias_novas": 0}
+    linhas = iter(linhas)
+
+    suspensao = recomendador.importacao_em_lote() if recomendador is not None else nullcontext()
+    with suspensao, coleta_de_lixo_pausada():
+        while True:
+            bloco = list(islice(linhas, tamanho_bloco))
+            if not bloco:
+                break
+            for linha in bloco:
+                if linha is None:
+                    resumo["rejeitadas"] += 1
+                    continue
+                caminho, produto, peso = linha
+                raiz = _categoria_raiz(caminho[0], arvore, novas, existentes)
+                if _categoria_destino(raiz, caminho[1:]).adicionar_produto(produto, peso):
+                    resumo["linhas"] += 1
+                else:
+                    resumo["duplicadas"] += 1
+            logger.info(f"Importação: {resumo['linhas']} linhas processadas")
+
+        resumo["categorias_novas"] = arvore.carregar_em_lote(novas.values())
+
+    logger.info(f"Importação concluída: {resumo['linhas']} linhas, {resumo['duplicadas']} duplicadas, "
+                f"{resumo['rejeitadas']} rejeitadas, "
+                f"{resumo['categorias_novas']} categorias novas")
+    return resumo
+
+
+def importar_arquivo(arquivo, formato: str, arvore: ArvoreAVL, recomendador=None,
+                     tamanho_bloco: int = 10_000) -> Dict[str, int]:
+    """Importa de um caminho ou de um arquivo aberto (texto ou binário, UTF-8) no formato 'csv' ou 'jsonl'."""
+    if formato not in _LEITORES:
+        raise ValueError(f"Formato de importação não suportado: '{formato}'")
+    if isinstance(arquivo, str):
+        with open(arquivo, "r", encoding="utf-8-sig", newline="") as texto:
+            return importar_linhas(_LEITORES[formato](texto), arvore, recomendador, tamanho_bloco)
+    if not isinstance(arquivo, io.TextIOBase):
+        arquivo = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    return importar_linhas(_LEITORES[formato](arquivo), arvore, recomendador, tamanho_bloco)
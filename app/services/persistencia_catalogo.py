@@ -0,0 +1,173 @@
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import struct
+from typing import Iterator, Optional, Tuple
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.utils.coleta_lixo import coleta_de_lixo_pausada
+from app.utils.logger import Logger
+
+logger = Logger(__name__)
+
+# Catálogo salvo: variável SRHP_CATALOGO ou data/catalogo.srhp na raiz do projeto
+CAMINHO_CATALOGO_PADRAO = os.environ.get(
+    "SRHP_CATALOGO",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../..", "data", "catalogo.srhp")),
+)
+
+# =============================================================
+# 📐 FORMATO BINÁRIO (little-endian)
+# =============================================================
+# Cabeçalho: assinatura, versão do formato, quantidade de categorias raiz e número do último
+#            registro do diário de alterações já contido no catálogo (0 = nenhum; só na versão 2)
+# Categoria: peso_popularidade, bytes do nome, produtos, bytes dos nomes de produtos, subcategorias;
+#            seguem o nome, os nomes de produtos separados por \0 e os pesos (float64 cada).
+#            As subcategorias vêm logo depois, no mesmo formato (pré-ordem).
+# As raízes são gravadas em ordem alfabética: a leitura usa a carga em lote O(n).
+ASSINATURA = b"SRHPCAT\0"
+VERSAO_FORMATO = 2
+_CABECALHO = struct.Struct("<8sHQQ")
+_CABECALHO_V1 = struct.Struct("<8sHQ")   # ainda lido: catálogos salvos antes do diário numerado
+_CATEGORIA = struct.Struct("<dIIII")
+_SEPARADOR = "\0"
+
+
+# =============================================================
+# 💾 GRAVAÇÃO
+# =============================================================
+def _escrever_categoria(arquivo, categoria: Categoria) -> None:
+    nomes, pesos = categoria.exportar_produtos()
+    if any(_SEPARADOR in nome for nome in nomes):
+        raise ValueError(f"Nome de produto com caractere nulo na categoria '{categoria.nome}'")
+    nome = categoria.nome.encode("utf-8")
+    bloco_nomes = _SEPARADOR.join(nomes).encode("utf-8")
+    subcategorias = categoria.subcategorias
+
+    arquivo.write(_CATEGORIA.pack(categoria.peso_popularidade, len(nome), len(nomes),
+                                  len(bloco_nomes), len(subcategorias)))
+    arquivo.write(nome)
+    arquivo.write(bloco_nomes)
+    arquivo.write(pesos)
+    for sub in subcategorias:
+        _escrever_categoria(arquivo, sub)
+
+
+def salvar_catalogo(arvore: ArvoreAVL, caminho: str = CAMINHO_CATALOGO_PADRAO, registro_diario: int = 0) -> int:
+    """
+    Grava todas as categorias (hierarquia, produtos e pesos) em 'caminho'.
+    Escreve categoria por categoria num arquivo temporário e o troca pelo definitivo
+    ao final, então uma falha no meio não corrompe o catálogo anterior.
+    'registro_diario' é o número do último registro do diário já aplicado na árvore
+    (ver DiarioAlteracoes.checkpoint). Retorna quantas categorias raiz foram gravadas.
+    """
+    versao = arvore.snapshot()   # estrutura fixa durante a gravação
+    total = versao.get_tamanho()
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(_CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, total, registro_diario))
+        for categoria in versao:
+            _escrever_categoria(arquivo, categoria)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+    logger.info(f"Catálogo salvo em '{caminho}': {total} categorias raiz")
+    return total
+
+
+# =============================================================
+# 📂 LEITURA
+# =============================================================
+def _ler_categoria(dados: memoryview, pos: int) -> Tuple[Categoria, int]:
+    peso, tam_nome, n_produtos, tam_nomes, n_subcategorias = _CATEGORIA.unpack_from(dados, pos)
+    pos += _CATEGORIA.size
+    nome = str(dados[pos:pos + tam_nome], "utf-8")
+    pos += tam_nome
+    nomes = str(dados[pos:pos + tam_nomes], "utf-8").split(_SEPARADOR) if n_produtos else []
+    pos += tam_nomes
+    if len(nomes) != n_produtos:
+        raise ValueError(f"Catálogo corrompido na categoria '{nome}'")
+    pesos = dados[pos:pos + 8 * n_produtos]
+    pos += 8 * n_produtos
+    if pos > len(dados):
+        raise ValueError(f"Catálogo truncado na categoria '{nome}'")
+
+    categoria = Categoria.de_colunas(nome, nomes, pesos, peso)
+    for _ in range(n_subcategorias):
+        sub, pos = _ler_categoria(dados, pos)
+        categoria.adicionar_subcategoria(sub)
+    return categoria, pos
+
+
+def _ler_raizes(dados: memoryview, pos: int, total: int) -> Iterator[Categoria]:
+    for _ in range(total):
+        try:
+            categoria, pos = _ler_categoria(dados, pos)
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Catálogo corrompido: {e}") from e
+        yield categoria
+    if pos != len(dados):
+        raise ValueError("Catálogo corrompido: dados sobrando no final do arquivo")
+
+
+def _ler_cabecalho(dados, caminho: str) -> Tuple[int, int, int]:
+    """(categorias raiz, último registro do diário, início da primeira categoria)."""
+    if len(dados) < _CABECALHO_V1.size:
+        raise ValueError(f"'{caminho}' não é um catálogo SRHP")
+    assinatura, versao_formato, total = _CABECALHO_V1.unpack_from(dados, 0)
+    if assinatura != ASSINATURA:
+        raise ValueError(f"'{caminho}' não é um catálogo SRHP")
+    if versao_formato == 1:
+        return total, 0, _CABECALHO_V1.size
+    if versao_formato != VERSAO_FORMATO or len(dados) < _CABECALHO.size:
+        raise ValueError(f"Versão de catálogo não suportada: {versao_formato}")
+    _, _, total, registro_diario = _CABECALHO.unpack_from(dados, 0)
+    return total, registro_diario, _CABECALHO.size
+
+
+def registro_do_catalogo(caminho: str = CAMINHO_CATALOGO_PADRAO) -> int:
+    """
+    Número do último registro do diário contido no catálogo salvo (só o cabeçalho é lido).
+    0 se o arquivo não existir, for inválido ou anterior ao diário numerado.
+    """
+    try:
+        with open(caminho, "rb") as arquivo:
+            return _ler_cabecalho(arquivo.read(_CABECALHO.size), caminho)[1]
+    except (OSError, ValueError):
+        return 0
+
+
+def carregar_catalogo(caminho: str = CAMINHO_CATALOGO_PADRAO, arvore: Optional[ArvoreAVL] = None) -> ArvoreAVL:
+    """
+    Lê um catálogo gravado por salvar_catalogo e o carrega em lote na árvore
+    (uma nova ArvoreAVL se nenhuma for informada). Levanta ValueError se o
+    arquivo não for um catálogo válido.
+    """
+    with open(caminho, "rb") as arquivo:
+        dados = memoryview(arquivo.read())
+    total, _, inicio = _ler_cabecalho(dados, caminho)
+
+    arvore = arvore if arvore is not None else ArvoreAVL()
+    with coleta_de_lixo_pausada():
+        arvore.carregar_em_lote(_ler_raizes(dados, inicio, total), ordenado=True)
+    logger.info(f"Catálogo carregado de '{caminho}': {total} categorias raiz")
+    return arvore
+
+
+def carregar_ou_inicializar(arvore: ArvoreAVL, caminho: str = CAMINHO_CATALOGO_PADRAO) -> bool:
+    """Carrega o catálogo salvo, se existir; senão usa os dados iniciais. Retorna True se veio do disco."""
+    if os.path.exists(caminho):
+        try:
+            carregar_catalogo(caminho, arvore)
+            return True
+        except (OSError, ValueError) as e:
+            logger.error(f"Não foi possível carregar o catálogo '{caminho}': {str(e)}")
+    arvore.carregar_em_lote(criar_categorias_iniciais())
+    return False
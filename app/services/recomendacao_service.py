@@ -8,9 +8,48 @@ class RecomendacaoService:
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from app.core.arvore_avl import ArvoreAVL
+from app.core.trie_prefixos import TriePrefixos
+from app.core.indice_popularidade import IndicePopularidade
+from app.core.categoria import dividir_caminho
+from app.services.fila_eventos import FilaEventosPopularidade
 from app.utils.timer import Timer
 from app.utils.logger import Logger
-from typing import List, Dict, Optional
+from app.utils.rwlock import TravaLeituraEscrita
+from app.utils.coleta_lixo import coleta_de_lixo_pausada
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+from itertools import islice, repeat
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import multiprocessing
+from contextlib import contextmanager
+
+
+# Incrementos de popularidade por tipo de evento (regras SRHP)
+# busca: sugestão aceita no autocomplete | clique: produto selecionado pelo usuário
+REGRAS_EVENTOS = {
+    "busca": {"categoria": 0.002, "subcategoria": 0.001, "produto": 0.001,
+              "produto_na_raiz": True, "limite": None},
+    "clique": {"categoria": 0.008, "subcategoria": 0.003, "produto": 0.005,
+               "produto_na_raiz": False, "limite": 10.0},
+}
+
+
+def _ordem_ranking(entrada: Tuple) -> Tuple:
+    """Ordem do ranking de produtos para entradas (identificador, peso, item)."""
+    return (-entrada[1], entrada[0])
+
+
+def _indexar_bloco(categorias: List, k_sugestoes: int) -> Tuple:
+    """
+    Executado num processo do pool: indexa os produtos de um bloco de categorias raiz.
+    Retorna a trie parcial, as entradas do ranking de produtos (já ordenadas) e o
+    mapa nome -> caminho, prontos para serem mesclados no processo principal.
+    """
+    with coleta_de_lixo_pausada():
+        parcial = RecomendacaoService(ArvoreAVL(), k_sugestoes=k_sugestoes)
+        ranking = parcial._indexar_raizes(categorias)
+        parcial._parar_de_observar()
+        return parcial.indice_produtos, ranking, parcial.indice_categorias
 
 
 class RecomendacaoService:
@@ -19,48 +58,96 @@ class RecomendacaoService:
     Agora totalmente recursivo para indexar todas as categorias e subcategorias.
     """
 
-    def __init__(self, arvore_avl: ArvoreAVL):
+    def __init__(self, arvore_avl: ArvoreAVL, k_sugestoes: int = 15):
         self.arvore = arvore_avl
         self.timer = Timer()
         self.logger = Logger(__name__)
 
-        self.indice_produtos = {}     # {'BA': [produtos...], 'N': [...]}
+        # 'BANANA CHIPS' -> [{'nome': ..., 'categoria': ...}], com top-k por nó
+        self.indice_produtos = TriePrefixos(k=k_sugestoes)
         self.indice_categorias = {}   # {'fone jbl': 'Eletrônicos > Acessórios'}
 
-    # =============================================================
-    # 🔧 CONSTRUÇÃO E MANUTENÇÃO DE ÍNDICES
-    # =============================================================
-    
-    def _construir_indices(self):
-        self.logger.info("Construindo índices de produtos...")
-        self.indice_produtos.clear()
-        self.indice_categorias.clear()
+        # Rankings por popularidade mantidos a cada alteração de peso (sem ordenar na consulta)
+        self.ranking_produtos = IndicePopularidade()     # (nome, caminho) -> peso_produto
+        self.ranking_categorias = IndicePopularidade()   # caminho -> peso_popularidade (item = categoria)
 
-        def percorrer_categoria(categoria, caminho_pai=""):
-            caminho = f"{caminho_pai} > {categoria.nome}" if caminho_pai else categoria.nome
+        # Ouvintes registrados em cada categoria indexada: id(categoria) -> (categoria, ouvinte)
+        self._ouvintes_categorias = {}
 
-            for produto in categoria.produtos:
-                self._adicionar_ao_indice(produto, caminho)
+        # Durante a construção completa, entradas do ranking de produtos a carregar de uma vez
+        self._carga_ranking: Optional[List[Tuple]] = None
+        self._carga_categorias: Optional[List[Tuple]] = None   # idem, ranking de categorias
 
-            for subcat in categoria.subcategorias:
-                percorrer_categoria(subcat, caminho)
+        # Fila opcional: eventos de busca aplicados em segundo plano (None = síncrono)
+        self.fila_eventos: Optional[FilaEventosPopularidade] = None
+
+        # Diário opcional (DiarioAlteracoes): lotes de eventos aplicados são gravados nele
+        self.diario = None
 
-        def percorrer_no(no):
-            if not no:
-                return
-            percorrer_no(no.esquerda)
-            percorrer_categoria(no.categoria)
-            percorrer_no(no.direita)
+        # Protege trie e rankings: consultas em paralelo, alterações/reindexação exclusivas.
+        # Ordem das travas: serviço -> árvore -> categoria (nunca o contrário)
+        self.trava = TravaLeituraEscrita()
 
-        percorrer_no(self.arvore.raiz)
+        # Inserções/remoções na árvore atualizam os índices sem reindexar tudo
+        self.arvore.adicionar_ouvinte(self._ao_alterar_arvore)
 
-        total = len(self.indice_categorias)
+        # Árvore já carregada: os índices precisam refletir o que existe
+        if not self.arvore.esta_vazia():
+            self._construir_indices()
+
+    # =============================================================
+    # 🔧 CONSTRUÇÃO E MANUTENÇÃO DE ÍNDICES
+    # =============================================================
+    
+    def _construir_indices(self):
+        self.logger.info("Construindo índices de produtos...")
+        with self.trava.escrita(), coleta_de_lixo_pausada():
+            self._parar_de_observar()
+            self.indice_produtos.limpar()
+            self.indice_categorias.clear()
+            self.ranking_categorias.limpar()
+
+            self._carga_categorias = []
+            try:
+                self.ranking_produtos.carregar_ordenado(self._indexar_raizes(self.arvore.listar_todas()))
+                self.ranking_categorias.carregar_ordenado(sorted(self._carga_categorias, key=_ordem_ranking))
+            finally:
+                self._carga_categorias = None
+
+            total = len(self.indice_categorias)
         self.logger.info(f"Índices construídos com sucesso: {total} produtos indexados.")
-        print(f"🧩 [DEBUG] Total de produtos indexados: {total}")
         if total > 0:
-            print(f"🔑 Prefixos disponíveis: {list(self.indice_produtos.keys())[:10]}")
-
-    def _adicionar_ao_indice(self, produto, caminho_categoria: str):
+            self.logger.debug(f"Chaves indexadas: {list(islice(self.indice_produtos.chaves(), 10))}")
+
+    def _indexar_raizes(self, raizes: Iterable) -> List[Tuple]:
+        """
+        Indexa as categorias raiz (e subcategorias) na trie de uma vez: o top-k de cada nó é
+        calculado uma única vez, ao final. Retorna as entradas do ranking de produtos já
+        ordenadas, para montar o índice em O(n) em vez de n inserções.
+        """
+        self._carga_ranking = []
+        try:
+            with self.indice_produtos.lote():
+                for categoria in raizes:
+                    self._indexar_categoria(categoria)
+            entradas = self._carga_ranking
+        finally:
+            self._carga_ranking = None
+        entradas.sort(key=_ordem_ranking)
+        return entradas
+
+    @staticmethod
+    def _pontuacao(categoria, produto) -> tuple:
+        """Peso usado no ranking: popularidade da categoria que contém o produto e, no empate, do produto."""
+        peso_categoria = getattr(categoria, "peso_popularidade", 0.0) if categoria else 0.0
+        peso_produto = produto.get("peso_produto", 0.0) if isinstance(produto, dict) else 0.0
+        return (peso_categoria, peso_produto)
+
+    @staticmethod
+    def _peso_produto(produto) -> float:
+        return float(produto.get("peso_produto", 0.0)) if isinstance(produto, dict) else 0.0
+
+    def _adicionar_ao_indice(self, produto, caminho_categoria: str, categoria=None):
         if not produto:
             return
 
@@ -68,27 +155,141 @@ class RecomendacaoService:
             produto_nome = produto.get("nome", "")
         else:
             produto_nome = str(produto)
+            if categoria is not None:
+                produto = categoria.obter_produto(produto_nome) or produto
 
         if not produto_nome:
             return
 
-        produto_upper = produto_nome.upper()
-        max_prefixo = min(len(produto_upper), 10)
-        for i in range(1, max_prefixo + 1):
-            prefixo = produto_upper[:i]
-            if prefixo not in self.indice_produtos:
-                self.indice_produtos[prefixo] = []
+        # Um único registro por produto; os prefixos são compartilhados pelos nós da trie
+        produto_info = {
+            "nome": produto_nome,
+            "categoria": caminho_categoria
+        }
+        self.indice_produtos.inserir(produto_nome.upper(), produto_info,
+                                     self._pontuacao(categoria, produto))
 
-            produto_info = {
-                "nome": produto_nome,
-                "categoria": caminho_categoria
-            }
+        self.indice_categorias[produto_nome.lower()] = caminho_categoria
+        entrada = ((produto_nome, caminho_categoria), self._peso_produto(produto), None)
+        if self._carga_ranking is not None:
+            self._carga_ranking.append(entrada)
+        else:
+            self.ranking_produtos.inserir(*entrada)
 
-            if not any(p['nome'] == produto_nome and p['categoria'] == caminho_categoria
-                       for p in self.indice_produtos[prefixo]):
-                self.indice_produtos[prefixo].append(produto_info)
+    def _remover_do_indice(self, produto_nome: str, caminho_categoria: str):
+        if not produto_nome:
+            return
 
-        self.indice_categorias[produto_nome.lower()] = caminho_categoria
+        self.indice_produtos.remover(produto_nome.upper(),
+                                     {"nome": produto_nome, "categoria": caminho_categoria})
+
+        if self.indice_categorias.get(produto_nome.lower()) == caminho_categoria:
+            del self.indice_categorias[produto_nome.lower()]
+        self.ranking_produtos.remover((produto_nome, caminho_categoria))
+
+    # =============================================================
+    # ♻️ MANUTENÇÃO INCREMENTAL (evita reindexar tudo a cada alteração)
+    # =============================================================
+    def _indexar_categoria(self, categoria, caminho_pai: str = ""):
+        """Indexa os produtos da categoria e de suas subcategorias e passa a observá-las."""
+        caminho = f"{caminho_pai} > {categoria.nome}" if caminho_pai else categoria.nome
+
+        with self.indice_produtos.lote():
+            for produto in categoria.produtos:
+                self._adicionar_ao_indice(produto, caminho, categoria)
+
+            self._observar(categoria, caminho)
+            entrada = (caminho, categoria.peso_popularidade, categoria)
+            if self._carga_categorias is not None:
+                self._carga_categorias.append(entrada)
+            else:
+                self.ranking_categorias.inserir(*entrada)
+
+            for subcat in categoria.subcategorias:
+                self._indexar_categoria(subcat, caminho)
+
+    def _desindexar_categoria(self, categoria, caminho_pai: str = ""):
+        """Retira do índice os produtos da categoria (e subcategorias) e deixa de observá-las."""
+        caminho = f"{caminho_pai} > {categoria.nome}" if caminho_pai else categoria.nome
+
+        for produto in categoria.produtos:
+            nome = produto.get("nome", "") if isinstance(produto, dict) else str(produto)
+            self._remover_do_indice(nome, caminho)
+
+        registro = self._ouvintes_categorias.pop(id(categoria), None)
+        if registro:
+            categoria.remover_ouvinte(registro[1])
+        self.ranking_categorias.remover(caminho)
+
+        for subcat in categoria.subcategorias:
+            self._desindexar_categoria(subcat, caminho)
+
+    def _observar(self, categoria, caminho: str):
+        registro = self._ouvintes_categorias.pop(id(categoria), None)
+        if registro:
+            categoria.remover_ouvinte(registro[1])
+
+        def ouvinte(cat, evento, alvo):
+            self._ao_alterar_categoria(caminho, cat, evento, alvo)
+
+        categoria.adicionar_ouvinte(ouvinte)
+        self._ouvintes_categorias[id(categoria)] = (categoria, ouvinte)
+
+    def _parar_de_observar(self):
+        for categoria, ouvinte in self._ouvintes_categorias.values():
+            categoria.remover_ouvinte(ouvinte)
+        self._ouvintes_categorias.clear()
+
+    def _ao_alterar_categoria(self, caminho: str, categoria, evento: str, alvo):
+        """Aplica no índice apenas a alteração ocorrida na categoria do caminho informado."""
+        with self.trava.escrita():
+            self._aplicar_alteracao_categoria(caminho, categoria, evento, alvo)
+
+    def _aplicar_alteracao_categoria(self, caminho: str, categoria, evento: str, alvo):
+        if evento == "produto_adicionado":
+            self._adicionar_ao_indice(alvo, caminho, categoria)
+        elif evento == "produto_removido":
+            self._remover_do_indice(alvo, caminho)
+        elif evento == "subcategoria_adicionada":
+            self._indexar_categoria(alvo, caminho)
+        elif evento == "subcategoria_removida":
+            self._desindexar_categoria(alvo, caminho)
+        elif evento == "peso_produto":
+            self._reposicionar_produto(categoria, caminho, categoria.obter_produto(alvo))
+        elif evento == "pesos_produtos":
+            with self.indice_produtos.lote():
+                for produto in categoria.produtos:
+                    self._reposicionar_produto(categoria, caminho, produto)
+        elif evento == "peso_categoria":
+            self.ranking_categorias.atualizar(caminho, categoria.peso_popularidade)
+            # O peso da categoria só entra na pontuação da trie: o ranking de produtos
+            # usa apenas o peso do produto e não muda aqui
+            with self.indice_produtos.lote():
+                for produto in categoria.iter_produtos():
+                    self._reposicionar_na_trie(categoria, caminho, produto)
+
+    def _reposicionar_produto(self, categoria, caminho: str, produto):
+        """Atualiza o peso do produto no top-k dos nós da trie no caminho do seu nome."""
+        if not produto:
+            return
+        self._reposicionar_na_trie(categoria, caminho, produto)
+        self.ranking_produtos.atualizar((produto.get("nome", ""), caminho), self._peso_produto(produto))
+
+    def _reposicionar_na_trie(self, categoria, caminho: str, produto):
+        nome = produto.get("nome", "")
+        self.indice_produtos.atualizar_peso(nome.upper(), {"nome": nome, "categoria": caminho},
+                                            self._pontuacao(categoria, produto))
+
+    def _ao_alterar_arvore(self, evento: str, categoria):
+        with self.trava.escrita():
+            if evento == "categoria_inserida":
+                self._indexar_categoria(categoria)
+            elif evento == "categorias_inseridas":
+                with self.indice_produtos.lote():
+                    for cat in categoria:
+                        self._indexar_categoria(cat)
+            elif evento == "categoria_removida":
+                self._desindexar_categoria(categoria)
 
 
     # =============================================================
@@ -96,77 +297,53 @@ class RecomendacaoService:
     # =============================================================
     def buscar_categoria_recursiva(self, nome: str) -> Optional[object]:
         self.timer.start()
-        resultado = self.arvore.buscar(self.arvore.raiz, nome)
+        resultado = self.arvore.buscar_publico(nome)
         self.timer.stop()
 
         if resultado:
-            resultado.peso_popularidade += 1.0
+            resultado.incrementar_peso_popularidade_categoria(1.0)
             self.logger.info(f"Categoria '{nome}' encontrada (peso +1).")
         else:
             self.logger.warning(f"Categoria '{nome}' não encontrada.")
         return resultado
 
-    def sugerir_por_prefixo(self, prefixo: str, limite: int = 7) -> List[Dict]:
+    def iterar_por_prefixo(self, prefixo: str) -> Iterator[Dict]:
+        """Percorre sob demanda os produtos cujo nome começa com o prefixo (sem ordenar)."""
+        if not prefixo:
+            return iter(())
+        return self.trava.iterar(self.indice_produtos.buscar_prefixo(prefixo.upper()))
+
+    def sugestoes_pontuadas(self, prefixo: str, limite: int = 7) -> List[Tuple]:
+        """Pares (pontuação, sugestão) do top-k do prefixo, sem registrar a busca (para mesclar índices)."""
+        if not prefixo:
+            return []
+        with self.trava.leitura():
+            return self.indice_produtos.melhores_com_peso(prefixo.upper(), limite)
+
+    def sugerir_por_prefixo(self, prefixo: str, limite: int = 7, registrar_busca: bool = True) -> List[Dict]:
         self.timer.start()
 
         if not prefixo:
             return []
 
-        prefixo_upper = prefixo.upper()
-        candidatos = self.indice_produtos.get(prefixo_upper, [])
+        # Top-k já ordenado por peso guardado no nó do prefixo: O(|prefixo| + k),
+        # sem argpartition na consulta (o prefixo cruza categorias)
+        with self.trava.leitura():
+            sugestoes = self.indice_produtos.melhores(prefixo.upper(), limite)
 
-        if not candidatos:
+        if not sugestoes:
             print("  (Nenhum produto encontrado com esse prefixo)")
             return []
 
-        def peso_do_produto(p):
-            caminho = p.get("categoria", "")
-            topo = caminho.split('>')[0].strip() if caminho else ""
-            cat = self.arvore.buscar(self.arvore.raiz, topo) if topo else None
-            if not cat:
-                return 0.0
-            if '>' in caminho:
-                sub_nome = caminho.split('>')[-1].strip()
-                for sc in cat.subcategorias:
-                    if sc.nome == sub_nome:
-                        return getattr(sc, "peso_popularidade", cat.peso_popularidade)
-            return getattr(cat, "peso_popularidade", 0.0)
-
-        candidatos_sorted = sorted(candidatos, key=lambda x: peso_do_produto(x), reverse=True)
-        sugestoes = candidatos_sorted[:limite]
-
         # ============================================================
         # 🚀 REGRAS DE PESQUISA (SEU PEDIDO)
         # Produto: +0.001
         # Subcategoria: +0.001
         # Categoria: +0.002
         # ============================================================
-        if sugestoes:
+        if registrar_busca:
             primeiro = sugestoes[0]
-            caminho = primeiro.get("categoria", "")
-            partes = [p.strip() for p in caminho.split(">")] if caminho else []
-
-            cat_nome = partes[0] if partes else None
-            sub_nome = partes[-1] if len(partes) > 1 else None
-            prod_nome = primeiro.get("nome")
-
-            cat = self.arvore.buscar(self.arvore.raiz, cat_nome)
-            if cat:
-                # Categoria +0.002
-                cat.peso_popularidade += 0.002
-
-                # Produto +0.001
-                cat.incrementar_peso_produto(prod_nome, 0.001)
-
-                # Subcategoria +0.001
-                if sub_nome and sub_nome != cat_nome:
-                    sub = next((s for s in cat.subcategorias if s.nome == sub_nome), None)
-                    if sub:
-                        sub.peso_popularidade += 0.001
-                        sub.incrementar_peso_produto(prod_nome, 0.001)
-
-            # Atualizar índices
-            self.reindexar()
+            self.publicar_eventos([(primeiro.get("categoria", ""), primeiro.get("nome"), "busca")])
 
         print("📦 Produtos encontrados:")
         for i, s in enumerate(sugestoes, start=1):
@@ -185,7 +362,11 @@ class RecomendacaoService:
     # =============================================================
     # 🧮 RELATÓRIO DE PERFORMANCE
     # =============================================================
-    def gerar_relatorio_performance(self) -> dict:
+    def gerar_relatorio_performance(self, arvore: Optional[ArvoreAVL] = None) -> dict:
+        """Relatório da árvore; 'arvore' permite reaproveitar um snapshot já obtido pelo chamador."""
+        # Uma única versão da árvore: nenhuma rotação acontece no meio da verificação
+        arvore = arvore if arvore is not None else self.arvore.snapshot()
+
         def calcular_altura(no):
             if no is None:
                 return 0
@@ -194,14 +375,14 @@ class RecomendacaoService:
         def verificar_balanceamento(no):
             if no is None:
                 return True
-            fb = self.arvore.fator_balanceamento(no)
+            fb = arvore.fator_balanceamento(no)
             if fb < -1 or fb > 1:
                 return False
             return verificar_balanceamento(no.esquerda) and verificar_balanceamento(no.direita)
 
-        total_categorias = self.arvore.get_tamanho()
-        altura_arvore = calcular_altura(self.arvore.raiz)
-        balanceada = verificar_balanceamento(self.arvore.raiz)
+        total_categorias = arvore.get_tamanho()
+        altura_arvore = calcular_altura(arvore.raiz)
+        balanceada = verificar_balanceamento(arvore.raiz)
 
         complexidade = {
             "total_categorias": "O(1)",
@@ -209,7 +390,8 @@ class RecomendacaoService:
             "balanceada": "O(n)",
             "buscar_categoria": "O(log n)",
             "inserir_categoria": "O(log n)",
-            "sugerir_por_prefixo": "O(1) + O(k)"
+            "sugerir_por_prefixo": "O(|prefixo| + k)",
+            "mais_populares": "O(log n + k)"
         }
 
         return {
@@ -219,39 +401,243 @@ class RecomendacaoService:
             "complexidade": complexidade
         }
 
-    def reindexar(self):
+    # =============================================================
+    # 📉 AJUSTES EM LOTE DE POPULARIDADE
+    # =============================================================
+    def registrar_eventos(self, eventos: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Aplica um lote de eventos (caminho, produto, tipo) com tipo 'busca' ou 'clique'.
+        Os incrementos são somados por categoria/produto e aplicados uma única vez
+        cada, com os índices recalculados ao final. Retorna quantos eventos foram aceitos.
+        Com um diário ativo, o lote aplicado é gravado nele antes de retornar.
+        """
+        if self.diario is not None:
+            eventos = list(eventos)
+            with self.diario.alteracao():
+                aceitos = self._aplicar_eventos(eventos)
+                if aceitos:
+                    self.diario.registrar("eventos", eventos)
+            return aceitos
+        return self._aplicar_eventos(eventos)
+
+    def _aplicar_eventos(self, eventos: Iterable[Tuple[str, str, str]]) -> int:
+        # (id da categoria, limite) -> [categoria, delta da categoria, {produto: delta}]
+        acumulado: Dict[Tuple, list] = {}
+        resolvidos: Dict[str, Tuple] = {}   # caminho -> (categoria raiz, subcategoria)
+        aceitos = 0
+
+        def acumular(categoria, limite, delta_categoria, produto=None, delta_produto=0.0):
+            item = acumulado.get((id(categoria), limite))
+            if item is None:
+                item = acumulado[(id(categoria), limite)] = [categoria, 0.0, {}]
+            item[1] += delta_categoria
+            if produto:
+                item[2][produto] = item[2].get(produto, 0.0) + delta_produto
+
+        for caminho, produto, tipo in eventos:
+            regra = REGRAS_EVENTOS.get(tipo)
+            if regra is None:
+                continue
+
+            if caminho not in resolvidos:
+                partes = dividir_caminho(caminho) if caminho else []
+                cat = self.arvore.buscar_publico(partes[0]) if partes else None
+                sub = None
+                if cat and len(partes) > 1 and partes[-1] != partes[0]:
+                    sub = cat.resolver_caminho(partes[1:])
+                resolvidos[caminho] = (cat, sub)
+            cat, sub = resolvidos[caminho]
+            if cat is None:
+                continue
+
+            limite = regra["limite"]
+            if sub is not None:
+                acumular(cat, limite, regra["categoria"],
+                         produto if regra["produto_na_raiz"] else None, regra["produto"])
+                acumular(sub, limite, regra["subcategoria"], produto, regra["produto"])
+            else:
+                acumular(cat, limite, regra["categoria"], produto, regra["produto"])
+            aceitos += 1
+
+        # Incrementos sem teto primeiro; os com teto (limite) por último
+        grupos = sorted(acumulado.items(), key=lambda par: par[0][1] is not None)
+        with self.trava.escrita(), self.indice_produtos.lote():
+            for (_, limite), (categoria, delta_categoria, deltas_produtos) in grupos:
+                categoria.aplicar_incrementos(delta_categoria, deltas_produtos, limite)
+
+        if aceitos:
+            self.logger.info(f"{aceitos} eventos de popularidade aplicados em {len(acumulado)} categorias")
+        return aceitos
+
+    def _percorrer_categorias(self, categoria=None) -> Iterator:
+        """Todas as categorias e subcategorias (em profundidade)."""
+        raizes = [categoria] if categoria is not None else self.arvore
+        for cat in raizes:
+            yield cat
+            for sub in cat.iter_subcategorias():
+                yield from self._percorrer_categorias(sub)
+
+    def publicar_eventos(self, eventos: Iterable[Tuple[str, str, str]]) -> None:
+        """Envia os eventos para a fila em segundo plano (se ativa) ou os aplica na hora."""
+        eventos = list(eventos)
+        fila = self.fila_eventos
+        # Fila parando (ou já parada) recusa o lote: ele é aplicado aqui mesmo
+        if fila is None or not fila.publicar_varios(eventos):
+            self.registrar_eventos(eventos)
+
+    def iniciar_fila_eventos(self, intervalo: float = 0.5, tamanho_lote: int = 1000) -> FilaEventosPopularidade:
+        """Passa a aplicar os eventos publicados numa thread de fundo, a cada intervalo ou lote cheio."""
+        if self.fila_eventos is None:
+            self.fila_eventos = FilaEventosPopularidade(self.registrar_eventos, intervalo, tamanho_lote)
+        self.fila_eventos.intervalo = intervalo
+        self.fila_eventos.tamanho_lote = tamanho_lote
+        return self.fila_eventos.iniciar()
+
+    def parar_fila_eventos(self) -> None:
+        """Encerra a fila aplicando o que estiver pendente; volta ao modo síncrono."""
+        if self.fila_eventos is not None:
+            self.fila_eventos.parar()
+            self.fila_eventos = None
+
+    def aplicar_eventos_pendentes(self) -> int:
+        """Aplica imediatamente os eventos que ainda estão na fila."""
+        return self.fila_eventos.flush() if self.fila_eventos is not None else 0
+
+    def decair_popularidade(self, fator: float = 0.9) -> None:
+        """Multiplica o peso de todos os produtos pelo fator (vetorizado por categoria)."""
+        with self.trava.escrita(), self.indice_produtos.lote():
+            for categoria in list(self._percorrer_categorias()):
+                categoria.decair_pesos_produtos(fator)
+        self.logger.info(f"Popularidade dos produtos decaída por {fator}")
+
+    def normalizar_popularidade(self, maximo: float = 1.0) -> None:
+        """Escala os pesos de produtos de cada categoria para que o maior valha 'maximo'."""
+        with self.trava.escrita(), self.indice_produtos.lote():
+            for categoria in list(self._percorrer_categorias()):
+                categoria.normalizar_pesos_produtos(maximo)
+        self.logger.info(f"Popularidade dos produtos normalizada (máximo={maximo})")
+
+    def reindexar(self, paralelo: bool = False, processos: Optional[int] = None):
+        """Reconstrói os índices; paralelo=True divide as categorias raiz entre processos (catálogos grandes)."""
         self.logger.warning("Reindexando produtos...")
-        self._construir_indices()
-
-    def listar_todos_produtos(self) -> List[Dict]:
-        """Retorna uma lista plana de todos os produtos indexados"""
-        todos = []
-        # Usar o índice de categorias para evitar duplicatas
-        # indice_categorias mapeia 'nome_produto_lower' -> 'caminho'
-        # Mas precisamos dos nomes originais. Vamos reconstruir a partir da árvore.
-        
+        if paralelo:
+            self._construir_indices_paralelo(processos)
+        else:
+            self._construir_indices()
+
+    @contextmanager
+    def importacao_em_lote(self):
+        """
+        Suspende a indexação incremental durante uma carga grande: produtos e categorias
+        acrescentados não passam pelos índices um a um, que são reconstruídos uma única
+        vez ao final (até lá, as consultas veem os índices de antes da carga).
+        """
+        with self.trava.escrita():
+            self._parar_de_observar()
+            self.arvore.remover_ouvinte(self._ao_alterar_arvore)
+        try:
+            yield self
+        finally:
+            self.arvore.adicionar_ouvinte(self._ao_alterar_arvore)
+            self._construir_indices()
+
+    def _construir_indices_paralelo(self, processos: Optional[int] = None):
+        """
+        Monta tries parciais em processos separados (blocos contíguos de categorias raiz)
+        e as mescla: subárvores de prefixo que só um bloco tem são encaixadas sem cópia.
+        Ouvintes e ranking de categorias ficam no processo principal, que é dono dos objetos.
+        """
+        processos = max(1, processos or os.cpu_count() or 1)
+        self.logger.info(f"Construindo índices de produtos em {processos} processos...")
+        with self.trava.escrita(), coleta_de_lixo_pausada():
+            raizes = self.arvore.listar_todas()
+            # Mais blocos que processos: um bloco grande não deixa os outros processos ociosos
+            tamanho_bloco = max(1, -(-len(raizes) // (processos * 4)))
+            blocos = [raizes[i:i + tamanho_bloco] for i in range(0, len(raizes), tamanho_bloco)]
+
+            self._parar_de_observar()
+            self.indice_produtos.limpar()
+            self.indice_categorias.clear()
+            self.ranking_categorias.limpar()
+
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+                parciais = list(executor.map(_indexar_bloco, blocos, repeat(self.indice_produtos.k)))
+
+            # Blocos em ordem alfabética: o último a definir um nome vence, como na construção serial
+            with self.indice_produtos.lote():
+                for trie, _, indice in parciais:
+                    self.indice_produtos.mesclar(trie)
+                    self.indice_categorias.update(indice)
+            self.ranking_produtos.carregar_ordenado(
+                heapq.merge(*(ranking for _, ranking, _ in parciais), key=_ordem_ranking))
+
+            for categoria in raizes:
+                self._observar_hierarquia(categoria)
+
+        self.logger.info(f"Índices construídos com sucesso: {len(self.indice_categorias)} produtos indexados.")
+
+    def _observar_hierarquia(self, categoria, caminho_pai: str = ""):
+        """Observa a categoria e suas subcategorias e as coloca no ranking (sem indexar produtos)."""
+        caminho = f"{caminho_pai} > {categoria.nome}" if caminho_pai else categoria.nome
+        self._observar(categoria, caminho)
+        self.ranking_categorias.inserir(caminho, categoria.peso_popularidade, categoria)
+        for subcat in categoria.subcategorias:
+            self._observar_hierarquia(subcat, caminho)
+
+    def iterar_produtos(self, arvore: Optional[ArvoreAVL] = None) -> Iterator[Dict]:
+        """Percorre sob demanda todos os produtos (categorias em ordem alfabética, sem montar listas).
+        'arvore' permite percorrer um snapshot em vez da árvore atual."""
         def coletar_produtos(categoria, caminho_pai=""):
             caminho = f"{caminho_pai} > {categoria.nome}" if caminho_pai else categoria.nome
-            
+
             for produto in categoria.produtos:
                 nome = produto.get("nome") if isinstance(produto, dict) else str(produto)
                 peso = produto.get("peso_produto", 0.0) if isinstance(produto, dict) else 0.0
-                todos.append({
+                yield {
                     "nome": nome,
                     "categoria": caminho,
                     "peso_popularidade": peso
-                })
-                
+                }
+
             for sub in categoria.subcategorias:
-                coletar_produtos(sub, caminho)
-                
-        def percorrer_no(no):
-            if not no: return
-            percorrer_no(no.esquerda)
-            coletar_produtos(no.categoria)
-            percorrer_no(no.direita)
-            
-        percorrer_no(self.arvore.raiz)
-        
-        # Ordenar por peso global
-        return sorted(todos, key=lambda x: x['peso_popularidade'], reverse=True)
+                yield from coletar_produtos(sub, caminho)
+
+        for categoria in (arvore if arvore is not None else self.arvore):
+            yield from coletar_produtos(categoria)
+
+    def contar_produtos(self, arvore: Optional[ArvoreAVL] = None) -> int:
+        """Total de produtos do catálogo, sem materializar a lista."""
+        return sum(1 for _ in self.iterar_produtos(arvore))
+
+    def iterar_produtos_por_popularidade(self, inicio: int = 0) -> Iterator[Dict]:
+        """Percorre os produtos indexados do mais ao menos popular a partir da posição inicio (O(log n) até o primeiro)."""
+        for (nome, caminho), peso in self.trava.iterar(self.ranking_produtos.iterar(inicio)):
+            yield {
+                "nome": nome,
+                "categoria": caminho,
+                "peso_popularidade": peso
+            }
+
+    def total_produtos_indexados(self) -> int:
+        """Total de produtos no ranking de popularidade (O(1))."""
+        with self.trava.leitura():
+            return len(self.ranking_produtos)
+
+    def produtos_mais_populares(self, n: int = 10) -> List[Dict]:
+        """Os n produtos de maior peso, sem ordenar o catálogo."""
+        return list(islice(self.iterar_produtos_por_popularidade(), max(n, 0)))
+
+    def categorias_mais_populares(self, n: int = 10) -> List[Dict]:
+        """As n categorias/subcategorias de maior peso_popularidade."""
+        with self.trava.leitura():
+            return [
+                {"nome": self.ranking_categorias.obter(caminho).nome, "caminho": caminho, "peso_popularidade": peso}
+                for caminho, peso in self.ranking_categorias.maiores(n)
+            ]
+
+    def listar_todos_produtos(self) -> List[Dict]:
+        """Retorna uma lista plana de todos os produtos indexados"""
+        # Já vem na ordem de peso global do ranking (mantido a cada alteração):
+        # nada a ordenar nem a selecionar aqui, ao contrário do top-k por categoria
+        return list(self.iterar_produtos_por_popularidade())
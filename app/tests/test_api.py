@@ -1,2 +1,209 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+
+
 def test_api():
     assert callable(print)
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    pytest.importorskip("flask")
+    import app.flask.routes as routes
+    # Catálogo e diário num diretório temporário, nunca em data/
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("SRHP_CATALOGO", str(tmp_path_factory.mktemp("api") / "catalogo.srhp"))
+        routes.inicializar()
+        yield routes
+        routes.encerrar()
+
+
+@pytest.fixture
+def cliente(api):
+    cliente = api.app.test_client()
+    cliente.post('/api/colecao/reset')
+    return cliente
+
+
+def test_categorias_paginacao_alfabetica_e_prefixo(cliente):
+    pagina = cliente.get('/api/categorias?limite=2').get_json()
+    assert [c['nome'] for c in pagina['categorias']] == ['Bananinha', 'Bebidas']
+    assert pagina['proxima'] == 'Bebidas'
+
+    seguinte = cliente.get('/api/categorias?limite=2&apos=Bebidas').get_json()
+    assert [c['nome'] for c in seguinte['categorias']] == ['Eletrônicos']
+    assert 'proxima' not in seguinte
+
+    prefixo = cliente.get('/api/categorias?prefixo=Be').get_json()
+    assert [c['nome'] for c in prefixo['categorias']] == ['Bebidas']
+
+
+def test_categorias_paginacao_por_pagina(cliente):
+    primeira = cliente.get('/api/categorias?pagina=1&limite=2').get_json()
+    assert [c['nome'] for c in primeira['categorias']] == ['Bananinha', 'Bebidas']
+    assert primeira['total_categorias'] == 3
+    assert primeira['paginas_totais'] == 2
+
+    segunda = cliente.get('/api/categorias?pagina=2&limite=2').get_json()
+    assert [c['nome'] for c in segunda['categorias']] == ['Eletrônicos']
+
+    filtrada = cliente.get('/api/categorias?pagina=1&limite=5&prefixo=B').get_json()
+    assert [c['nome'] for c in filtrada['categorias']] == ['Bananinha', 'Bebidas']
+    assert filtrada['total_categorias'] == 2
+
+
+def test_registrar_eventos_em_lote(cliente):
+    antes = cliente.get('/api/categorias/Eletrônicos').get_json()['categoria']['peso_popularidade']
+    eventos = [{'caminho': 'Eletrônicos > Acessórios', 'produto': 'Cabo HDMI', 'tipo': 'clique'}] * 10
+    resposta = cliente.post('/api/eventos', json={'eventos': eventos})
+    assert resposta.status_code == 200
+    assert resposta.get_json()['aceitos'] == 10
+
+    depois = cliente.get('/api/categorias/Eletrônicos').get_json()['categoria']['peso_popularidade']
+    assert abs(depois - antes - 0.08) < 1e-9
+    assert cliente.post('/api/eventos', json={}).status_code == 400
+
+
+def test_salvar_colecao_em_disco(cliente, tmp_path, monkeypatch):
+    import app.flask.routes as routes
+    from app.services.persistencia_catalogo import carregar_catalogo
+    caminho = str(tmp_path / "catalogo.srhp")
+    monkeypatch.setattr(routes, "CAMINHO_CATALOGO", caminho)
+
+    resposta = cliente.post('/api/colecao/salvar')
+    assert resposta.status_code == 200
+    assert resposta.get_json()['total_categorias'] == 3
+    assert [c.nome for c in carregar_catalogo(caminho)] == ['Bananinha', 'Bebidas', 'Eletrônicos']
+
+
+def test_alteracoes_da_api_vao_para_o_diario(cliente, tmp_path, monkeypatch):
+    import app.flask.routes as routes
+    from app.core.arvore_avl import ArvoreAVL
+    from app.core.dados_iniciais import criar_categorias_iniciais
+    from app.services.diario_alteracoes import DiarioAlteracoes, reaplicar_diario
+    from app.services.recomendacao_service import RecomendacaoService
+
+    caminho = str(tmp_path / "catalogo.diario")
+    diario = DiarioAlteracoes(caminho)
+    monkeypatch.setattr(routes, "diario", diario)
+    monkeypatch.setattr(routes.recomendador, "diario", diario)
+
+    assert cliente.post('/api/categorias', json={'nome': 'Frutas'}).status_code == 201
+    assert cliente.post('/api/categorias/Frutas/subcategorias', json={'nome': 'Cítricas'}).status_code == 201
+    assert cliente.post('/api/produtos', json={'nome': 'Limão', 'categoria': 'Frutas',
+                                               'subcategoria': 'cítricas'}).status_code == 201
+    assert cliente.put('/api/produtos/Frutas/Limão').status_code == 200
+    assert cliente.delete('/api/produtos/Bebidas/Suco de Uva').status_code == 200
+    diario.fechar()
+
+    arvore = ArvoreAVL.from_iterable(criar_categorias_iniciais())
+    assert reaplicar_diario(caminho, arvore, RecomendacaoService(arvore)) == 5
+    limao = arvore.resolver_caminho("Frutas > Cítricas").obter_produto("Limão")
+    assert limao["peso_produto"] == pytest.approx(1.005)
+    assert arvore.buscar_publico("Bebidas").obter_produto("Suco de Uva") is None
+
+
+def test_arvore_compartilhada_recebe_o_diario(api, tmp_path, monkeypatch):
+    from app.core.arvore_avl_persistente import ArvoreAVLPersistente
+    from app.core.dados_iniciais import criar_categorias_iniciais
+    from app.services.diario_alteracoes import DiarioAlteracoes
+    from app.services.persistencia_catalogo import carregar_catalogo
+
+    for nome in ("arvore", "recomendador", "diario", "catalogo_mapeado",
+                 "CAMINHO_CATALOGO", "CAMINHO_DIARIO", "CAMINHO_CATALOGO_MAPEADO"):
+        monkeypatch.setattr(api, nome, getattr(api, nome))
+    catalogo = str(tmp_path / "catalogo.srhp")
+    monkeypatch.setenv("SRHP_CATALOGO", catalogo)
+    # Alteração de uma execução anterior que não chegou ao catálogo salvo
+    with DiarioAlteracoes(f"{catalogo}.diario") as anterior:
+        anterior.registrar("categoria_criada", "Frutas")
+
+    # Como na GUI: a árvore já vem carregada e a API passa a servi-la
+    compartilhada = ArvoreAVLPersistente()
+    compartilhada.carregar_em_lote(criar_categorias_iniciais())
+    api.inicializar(compartilhada)
+    try:
+        assert api.arvore is compartilhada
+        assert compartilhada.buscar_publico("Frutas") is not None
+        assert api.recomendador.diario is api.diario is not None
+
+        assert api.app.test_client().put('/api/produtos/Bebidas/Refrigerante').status_code == 200
+        assert os.path.getsize(f"{catalogo}.diario") > 0
+    finally:
+        api.encerrar()
+    assert "Frutas" in [c.nome for c in carregar_catalogo(catalogo)]
+    assert os.path.getsize(f"{catalogo}.diario") == 0
+
+
+def test_leituras_pelo_catalogo_mapeado(cliente, api, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "CAMINHO_CATALOGO", str(tmp_path / "catalogo.srhp"))
+    monkeypatch.setattr(api, "CAMINHO_CATALOGO_MAPEADO", str(tmp_path / "catalogo.srhpmap"))
+    api._recompilar_catalogo_mapeado()
+    mapeado = api.catalogo_mapeado
+    try:
+        with api._catalogo_mapeado_em_dia() as em_dia:
+            assert em_dia is mapeado
+
+        # A busca servida pelo arquivo continua contando para os pesos
+        antes = api.arvore.buscar_publico('Bebidas').peso_popularidade
+        sugestoes = cliente.get('/api/produtos/buscar?q=suco').get_json()['resultados']
+        assert [s['nome'] for s in sugestoes] == ['Suco de Uva']
+        api.recomendador.aplicar_eventos_pendentes()
+        assert api.arvore.buscar_publico('Bebidas').peso_popularidade > antes
+
+        # Leitura logo depois da escrita: o arquivo fica de lado até ser recompilado
+        assert cliente.post('/api/produtos', json={'nome': 'Suco de Caju', 'categoria': 'Bebidas'}).status_code == 201
+        with api._catalogo_mapeado_em_dia() as em_dia:
+            assert em_dia is None
+        sugestoes = cliente.get('/api/produtos/buscar?q=suco').get_json()['resultados']
+        assert {s['nome'] for s in sugestoes} == {'Suco de Uva', 'Suco de Caju'}
+        bebidas = cliente.get('/api/categorias/Bebidas').get_json()['categoria']
+        assert 'Suco de Caju' in [p['nome'] for p in bebidas['produtos']]
+
+        # Salvar recompila o arquivo e fecha o anterior
+        assert cliente.post('/api/colecao/salvar').status_code == 200
+        assert api.catalogo_mapeado is not mapeado and mapeado._mapa.closed
+        with api._catalogo_mapeado_em_dia() as em_dia:
+            assert em_dia is api.catalogo_mapeado
+            assert {s['nome'] for s in em_dia.sugerir_por_prefixo('suco')} == {'Suco de Uva', 'Suco de Caju'}
+        bebidas = cliente.get('/api/categorias/Bebidas?top=10').get_json()['categoria']
+        assert 'Suco de Caju' in [p['nome'] for p in bebidas['produtos']]
+    finally:
+        api._fechar_catalogo_mapeado()
+
+
+def test_importar_jsonl_pela_api(cliente):
+    import io
+    corpo = ('{"caminho": "Frutas > Cítricas > Laranja", "peso": 4}\n'
+             '{"categoria": "Bebidas", "produto": "Chá Gelado"}\n')
+    resposta = cliente.post('/api/importar', data={'arquivo': (io.BytesIO(corpo.encode('utf-8')), 'lote.jsonl')},
+                            content_type='multipart/form-data')
+    assert resposta.status_code == 200
+    assert resposta.get_json()['linhas'] == 2
+
+    direto = cliente.post('/api/importar?formato=csv', data='Frutas > Kiwi,2\n'.encode('utf-8'))
+    assert direto.get_json()['categorias_novas'] == 0
+
+    sugestoes = cliente.get('/api/produtos/buscar?q=laR').get_json()['resultados']
+    assert sugestoes[0]['categoria'] == 'Frutas > Cítricas'
+    assert cliente.get('/api/categorias/Frutas').status_code == 200
+    assert cliente.post('/api/importar', data=b'x').status_code == 400
+
+
+def test_colecao_e_produtos_em_ndjson(cliente):
+    import json
+    resposta = cliente.get('/api/colecao?stream=1')
+    assert resposta.mimetype == 'application/x-ndjson'
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert linhas[0]['metadata'] == {'total_categorias': 3, 'total_produtos': 12}
+    assert linhas[1:] == cliente.get('/api/colecao').get_json()['categorias']
+
+    todos = cliente.get('/api/produtos', headers={'Accept': 'application/x-ndjson'}).get_data(as_text=True)
+    produtos = [json.loads(linha) for linha in todos.splitlines()]
+    assert produtos[:5] == cliente.get('/api/produtos?limite=5').get_json()['produtos']
+    assert len(produtos) == 12
+
+    pagina = cliente.get('/api/produtos?stream=1&pagina=2&limite=5').get_data(as_text=True).splitlines()
+    assert [json.loads(linha) for linha in pagina] == produtos[5:10]
@@ -96,3 +96,136 @@ def test_listar_todas_ordenacao():
     lista = arv.listar_todas()
     nomes = [c.nome for c in lista]
     assert nomes == ["A", "B", "C"]
+
+
+def _verificar_avl(no):
+    """Retorna a altura da subárvore validando alturas, tamanhos e fatores de balanceamento."""
+    if no is None:
+        return 0
+    he = _verificar_avl(no.esquerda)
+    hd = _verificar_avl(no.direita)
+    assert abs(he - hd) <= 1
+    assert no.altura == 1 + max(he, hd)
+    assert no.tamanho == 1 + (no.esquerda.tamanho if no.esquerda else 0) + (no.direita.tamanho if no.direita else 0)
+    return no.altura
+
+
+def test_versao_iterativa_equivale_a_recursiva():
+    import random
+    rnd = random.Random(42)
+    nomes = [f"Cat{i:04d}" for i in range(400)]
+    rnd.shuffle(nomes)
+
+    iterativa = ArvoreAVL()
+    recursiva = ArvoreAVL(iterativa=False)
+    for nome in nomes:
+        iterativa.inserir_publico(Categoria(nome))
+        recursiva.inserir_publico(Categoria(nome))
+
+    for nome in rnd.sample(nomes, 250) + ["Inexistente"]:
+        assert iterativa.remover_publico(nome) == recursiva.remover_publico(nome)
+        _verificar_avl(iterativa.raiz)
+
+    assert iterativa.get_em_ordem() == recursiva.get_em_ordem()
+    assert iterativa.get_pre_ordem() == recursiva.get_pre_ordem()
+    assert iterativa.get_tamanho() == recursiva.get_tamanho() == 150
+    for nome in nomes:
+        assert (iterativa.buscar_publico(nome) is None) == (recursiva.buscar_publico(nome) is None)
+
+
+def test_carga_em_lote_balanceada_e_mesclada():
+    import pytest
+
+    gerador = (Categoria(f"Cat{i:03d}") for i in range(100))
+    arv = ArvoreAVL.from_iterable(gerador, ordenado=True)
+    assert arv.get_tamanho() == 100
+    assert _verificar_avl(arv.raiz) == 7  # ceil(log2(101))
+
+    # entrada desordenada é ordenada; nomes repetidos são ignorados
+    existente = arv.buscar_publico("Cat050")
+    inseridas = arv.carregar_em_lote([Categoria("Cat150"), Categoria("Cat050"), Categoria("Aaa")])
+    assert inseridas == 2
+    assert arv.buscar_publico("Cat050") is existente
+    nomes = [c.nome for c in arv.listar_todas()]
+    assert nomes == sorted(nomes) and len(nomes) == 102
+    _verificar_avl(arv.raiz)
+
+    # entre novas repetidas vale a primeira
+    primeira = Categoria("Zzz")
+    assert arv.carregar_em_lote([primeira, Categoria("Bbb"), Categoria("Zzz")]) == 2
+    assert arv.buscar_publico("Zzz") is primeira and arv.get_tamanho() == 104
+
+    with pytest.raises(ValueError):
+        ArvoreAVL.from_iterable([Categoria("B"), Categoria("A")], ordenado=True)
+
+
+def test_iteradores_sob_demanda():
+    arv = ArvoreAVL.from_iterable(Categoria(n) for n in "DBFACEG")
+
+    assert [c.nome for c in arv] == list("ABCDEFG")
+    assert [c.nome for c in arv.iter_em_ordem_reversa()] == list("GFEDCBA")
+    assert [c.nome for c in arv.iter_pre_ordem()] == [n for n, _ in arv.get_pre_ordem()]
+
+    iterador = arv.iter_em_ordem()
+    assert next(iterador).nome == "A"  # nada é materializado antes do consumo
+
+
+def test_consultas_de_intervalo_prefixo_e_vizinhos():
+    nomes = ["Bananas", "Bananinha", "Bebidas", "Doces", "Eletrônicos", "Frutas"]
+    arv = ArvoreAVL.from_iterable(Categoria(n) for n in nomes)
+
+    assert [c.nome for c in arv.iter_prefixo("Ban")] == ["Bananas", "Bananinha"]
+    assert [c.nome for c in arv.iter_prefixo("X")] == []
+    assert [c.nome for c in arv.iter_intervalo("Bebidas", "Frutas")] == ["Bebidas", "Doces", "Eletrônicos"]
+    assert [c.nome for c in arv.iter_intervalo(fim="Bc")] == ["Bananas", "Bananinha"]
+
+    assert arv.piso("C").nome == "Bebidas"
+    assert arv.piso("Doces").nome == "Doces"
+    assert arv.teto("C").nome == "Doces"
+    assert arv.teto("Z") is None
+    assert arv.sucessor("Doces").nome == "Eletrônicos"
+    assert arv.predecessor("Doces").nome == "Bebidas"
+    assert arv.predecessor("Bananas") is None
+
+
+def test_estatistica_de_ordem_selecionar_e_posicao():
+    import random
+    rnd = random.Random(7)
+    nomes = [f"Cat{i:03d}" for i in range(300)]
+    rnd.shuffle(nomes)
+
+    for arv in (ArvoreAVL(), ArvoreAVL(iterativa=False)):
+        for nome in nomes:
+            arv.inserir_publico(Categoria(nome))
+        for nome in rnd.sample(nomes, 100):
+            arv.remover_publico(nome)
+        _verificar_avl(arv.raiz)
+
+        ordenados = [c.nome for c in arv]
+        for i, nome in enumerate(ordenados):
+            assert arv.selecionar(i).nome == nome
+            assert arv.posicao(nome) == i
+        assert arv.selecionar(len(ordenados)) is None
+        assert arv.posicao("Zzz") == len(ordenados)
+        assert [c.nome for c in arv.iter_por_posicao(190)] == ordenados[190:]
+
+    lote = ArvoreAVL.from_iterable(Categoria(n) for n in "ACEG")
+    _verificar_avl(lote.raiz)
+    assert lote.posicao("D") == 2
+    assert [c.nome for c in lote.iter_por_posicao(1)] == ["C", "E", "G"]
+
+
+def test_resolver_caminho_em_hierarquia_profunda():
+    arv = ArvoreAVL()
+    atual = Categoria("Nivel0")
+    arv.inserir_publico(atual)
+    for i in range(1, 50):
+        sub = Categoria(f"Nivel{i}")
+        atual.adicionar_subcategoria(sub)
+        atual = sub
+
+    caminho = " > ".join(f"Nivel{i}" for i in range(50))
+    assert arv.resolver_caminho(caminho) is atual
+    assert arv.resolver_caminho("Nivel0").nome == "Nivel0"
+    assert arv.resolver_caminho("Nivel0 > Nivel2") is None
+    assert arv.resolver_caminho("Inexistente > Nivel1") is None
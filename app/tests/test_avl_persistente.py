@@ -0,0 +1,77 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import random
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.arvore_avl_persistente import ArvoreAVLPersistente
+from app.core.categoria import Categoria
+from app.services.recomendacao_service import RecomendacaoService
+from app.tests.test_avl import _verificar_avl
+
+
+def test_persistente_equivale_a_arvore_comum():
+    rnd = random.Random(7)
+    nomes = [f"Cat{i:04d}" for i in range(400)]
+    rnd.shuffle(nomes)
+
+    comum = ArvoreAVL()
+    persistente = ArvoreAVLPersistente()
+    for nome in nomes:
+        comum.inserir_publico(Categoria(nome))
+        persistente.inserir_publico(Categoria(nome))
+        _verificar_avl(persistente.raiz)
+
+    for nome in rnd.sample(nomes, 250) + ["Inexistente"]:
+        assert comum.remover_publico(nome) == persistente.remover_publico(nome)
+        _verificar_avl(persistente.raiz)
+
+    assert [c.nome for c in persistente] == [c.nome for c in comum]
+    assert persistente.get_tamanho() == comum.get_tamanho() == 150
+    assert persistente.selecionar(10).nome == comum.selecionar(10).nome
+
+
+def test_snapshot_nao_ve_alteracoes_posteriores():
+    arvore = ArvoreAVLPersistente.from_iterable(Categoria(f"Cat{i:02d}") for i in range(50))
+    raiz_antes = arvore.raiz
+    versao = arvore.snapshot()
+
+    arvore.inserir_publico(Categoria("Nova"))
+    arvore.remover_publico("Cat10")
+    arvore.remover_publico("Cat25")
+
+    assert versao.get_tamanho() == 50
+    assert versao.buscar_publico("Cat10") is not None
+    assert versao.buscar_publico("Nova") is None
+    assert [c.nome for c in versao] == [f"Cat{i:02d}" for i in range(50)]
+    assert arvore.get_tamanho() == 49
+    _verificar_avl(versao.raiz)
+    _verificar_avl(arvore.raiz)
+
+    # Versão antiga intacta e subárvores fora do caminho compartilhadas com a nova
+    assert versao.raiz is raiz_antes
+    assert versao.raiz is not arvore.raiz
+    compartilhados = {id(n) for n in arvore._iter_nos_em_ordem(arvore.raiz)}
+    assert any(id(n) in compartilhados for n in versao._iter_nos_em_ordem(versao.raiz))
+
+
+def test_snapshot_da_arvore_comum_e_copia_independente():
+    arvore = ArvoreAVL.from_iterable(Categoria(n) for n in ["A", "B", "C", "D"])
+    versao = arvore.snapshot()
+    arvore.remover_publico("B")
+    assert [c.nome for c in versao] == ["A", "B", "C", "D"]
+    assert versao.get_em_ordem() != arvore.get_em_ordem()
+
+
+def test_servico_sobre_arvore_persistente():
+    arvore = ArvoreAVLPersistente()
+    servico = RecomendacaoService(arvore)
+    arvore.inserir_publico(Categoria("Frutas", ["Banana", "Maçã"]))
+    versao = arvore.snapshot()
+    arvore.inserir_publico(Categoria("Bebidas", ["Suco"]))
+
+    assert servico.total_produtos_indexados() == 3
+    assert servico.contar_produtos(versao) == 2
+    relatorio = servico.gerar_relatorio_performance(versao)
+    assert relatorio["total_categorias"] == 1
+    assert servico.gerar_relatorio_performance()["total_categorias"] == 2
@@ -0,0 +1,77 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pickle
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.catalogo_fragmentado import CatalogoFragmentado
+from app.services.recomendacao_service import RecomendacaoService
+
+
+def _categorias():
+    categorias = []
+    for i in range(12):
+        produtos = [{"nome": f"Produto {i:02d}-{j}", "peso_produto": 1.0 + j} for j in range(4)]
+        cat = Categoria(f"Categoria {i:02d}", produtos, peso_popularidade=1.0 + i)
+        cat.adicionar_subcategoria(Categoria(f"Sub {i:02d}", [f"Produto Sub {i:02d}"], peso_popularidade=2.0))
+        categorias.append(cat)
+    return categorias
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    with CatalogoFragmentado(n_fragmentos=3, k_sugestoes=5) as catalogo:
+        assert catalogo.carregar_em_lote(_categorias()) == 12
+        yield catalogo
+
+
+def test_categoria_sobrevive_ao_pickle():
+    cat = _categorias()[0]
+    cat.adicionar_ouvinte(lambda *args: None)
+    copia = pickle.loads(pickle.dumps(cat))
+    assert copia.produtos == cat.produtos
+    assert copia.obter_subcategoria("Sub 00").get_total_produtos() == 1
+    assert copia._ouvintes == []
+    copia.adicionar_produto("Novo")   # trava recriada
+    assert copia.get_total_produtos() == 5
+
+
+def test_consultas_mescladas_iguais_ao_indice_unico(catalogo):
+    unico = RecomendacaoService(ArvoreAVL.from_iterable(_categorias()), k_sugestoes=5)
+
+    assert catalogo.get_tamanho() == 12
+    assert catalogo.total_produtos_indexados() == unico.total_produtos_indexados() == 60
+    assert catalogo.listar_todos_produtos() == unico.listar_todos_produtos()
+    assert catalogo.produtos_mais_populares(7) == unico.produtos_mais_populares(7)
+
+    esperadas = unico.sugerir_por_prefixo("Produto", 5, registrar_busca=False)
+    assert catalogo.sugerir_por_prefixo("Produto", 5, registrar_busca=False) == esperadas
+    assert [s["nome"] for s in esperadas[:2]] == ["Produto 11-3", "Produto 11-2"]
+
+
+def test_alteracoes_vao_para_o_fragmento_dono(catalogo):
+    assert catalogo.inserir_publico(Categoria("Frutas", ["Banana"])) is True
+    assert catalogo.inserir_publico(Categoria("Frutas")) is False
+    assert catalogo.buscar_publico("Frutas").get_total_produtos() == 1
+
+    assert catalogo.registrar_eventos([("Frutas", "Banana", "clique")]) == 1
+    assert catalogo.buscar_publico("Frutas").obter_produto("Banana")["peso_produto"] == pytest.approx(1.005)
+
+    assert catalogo.remover_publico("Frutas") is True
+    assert catalogo.buscar_publico("Frutas") is None
+    assert catalogo.get_tamanho() == 12
+
+
+def test_erro_em_um_fragmento_nao_defasa_os_canais(catalogo):
+    # Fragmento 0 falha e os demais respondem normalmente: nenhuma resposta fica no canal
+    pedidos = {i: ("produtos", ()) for i in range(catalogo.n_fragmentos)}
+    pedidos[0] = ("inexistente", ())
+    with pytest.raises(RuntimeError):
+        catalogo._chamar_varios(pedidos)
+
+    assert catalogo.get_tamanho() == 12
+    for i in range(12):
+        assert catalogo.buscar_publico(f"Categoria {i:02d}").nome == f"Categoria {i:02d}"
@@ -0,0 +1,73 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.services.catalogo_mmap import CatalogoMapeado, compilar_catalogo_mmap
+from app.services.recomendacao_service import RecomendacaoService
+
+
+def _arvore():
+    categorias = criar_categorias_iniciais()
+    for i in range(40):
+        produtos = [{"nome": f"Peça {i:02d}-{j}", "peso_produto": 0.1 + j / 10} for j in range(5)]
+        cat = Categoria(f"Loja {i:02d}", produtos, peso_popularidade=1.0 + i / 7)
+        cat.adicionar_subcategoria(Categoria(f"Outlet {i:02d}", [f"Peça Outlet {i:02d}"],
+                                             peso_popularidade=0.5 + i / 11))
+        categorias.append(cat)
+    return ArvoreAVL.from_iterable(categorias)
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    caminho = str(tmp_path / "catalogo.srhpmap")
+    assert compilar_catalogo_mmap(_arvore(), caminho) == RecomendacaoService(_arvore()).total_produtos_indexados()
+    return caminho
+
+
+def test_sugestoes_iguais_as_do_servico(caminho):
+    servico = RecomendacaoService(_arvore())
+    with CatalogoMapeado(caminho) as catalogo:
+        # "P" cobre quase todo o catálogo (percorre a ordem global); os demais, intervalos curtos
+        for prefixo, limite in [("p", 7), ("P", 3), ("peça 1", 4), ("PEÇA OUTLET 3", 7), ("ban", 15), ("x", 5)]:
+            esperadas = servico.sugerir_por_prefixo(prefixo, limite, registrar_busca=False)
+            assert catalogo.sugerir_por_prefixo(prefixo, limite) == esperadas
+
+
+def test_prefixo_longo_fora_dos_mais_pesados(tmp_path):
+    # "Beta" cobre boa parte do catálogo, mas nenhum produto dele está entre os mais pesados:
+    # a varredura da ordem global para cedo e cai no caminho do intervalo
+    arvore = ArvoreAVL.from_iterable([
+        Categoria("Pesados", [f"Alfa {i:03d}" for i in range(100)], peso_popularidade=5.0),
+        Categoria("Leves", [{"nome": f"Beta {i:02d}", "peso_produto": i / 10} for i in range(30)]),
+    ])
+    caminho = str(tmp_path / "catalogo.srhpmap")
+    compilar_catalogo_mmap(arvore, caminho)
+    servico = RecomendacaoService(arvore)
+    with CatalogoMapeado(caminho) as catalogo:
+        esperadas = servico.sugerir_por_prefixo("beta", 5, registrar_busca=False)
+        assert catalogo.sugerir_por_prefixo("beta", 5) == esperadas
+        assert esperadas[0]["nome"] == "Beta 29"
+
+
+def test_buscar_categoria_no_arquivo_mapeado(caminho):
+    arvore = _arvore()
+    with CatalogoMapeado(caminho) as catalogo, CatalogoMapeado(caminho) as outro:
+        assert catalogo.get_tamanho() == arvore.get_tamanho() == 43
+        assert list(catalogo.nomes_categorias()) == [c.nome for c in arvore]
+
+        loja = catalogo.buscar_publico("Loja 07")
+        assert loja.produtos == arvore.buscar_publico("Loja 07").produtos
+        assert loja.obter_subcategoria("Outlet 07").get_total_produtos() == 1
+        assert catalogo.buscar_publico("Loja 7") is None
+        assert outro.buscar_publico("Eletrônicos").obter_subcategoria("Acessórios") is not None
+
+
+def test_arquivo_invalido(tmp_path):
+    caminho = tmp_path / "lixo.srhpmap"
+    caminho.write_bytes(b"SRHPCAT\0" + bytes(200))
+    with pytest.raises(ValueError):
+        CatalogoMapeado(str(caminho))
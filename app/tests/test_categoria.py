@@ -98,3 +98,102 @@ def test_subcategoria_adicao():
     cat.adicionar_subcategoria(sub)
     assert len(cat.subcategorias) == 1
     assert cat.subcategorias[0].nome == "Filho"
+
+
+def test_indice_de_produtos_por_nome():
+    cat = Categoria("Cabos", ["Cabo HDMI", "Cabo USB", "Cabo HDMI"])
+    assert cat.get_total_produtos() == 2
+    assert [p["nome"] for p in cat.produtos] == ["Cabo HDMI", "Cabo USB"]
+
+    cat.adicionar_produto("Cabo USB")  # duplicado é ignorado
+    assert cat.get_total_produtos() == 2
+
+    cat.aumentar_peso_produto("cabo usb", 0.5)  # sem diferenciar maiúsculas
+    assert cat.obter_produto("Cabo USB")["peso_produto"] == 1.5
+
+    assert cat.remover_produto("Cabo HDMI") is True
+    assert cat.remover_produto("Cabo HDMI") is False
+    cat.aumentar_peso_produto("CABO HDMI", 0.5)
+    assert cat.obter_produto("Cabo HDMI") is None
+    assert [p["nome"] for p in cat.produtos] == ["Cabo USB"]
+
+
+def test_subcategorias_indexadas_e_resolver_caminho():
+    from app.core.categoria import dividir_caminho
+
+    raiz = Categoria("Eletrônicos")
+    acessorios = Categoria("Acessórios")
+    cabos = Categoria("Cabos", ["Cabo HDMI"])
+    raiz.adicionar_subcategoria(acessorios)
+    raiz.adicionar_subcategoria(Categoria("Acessórios"))  # duplicada é ignorada
+    acessorios.adicionar_subcategoria(cabos)
+
+    assert raiz.get_total_subcategorias() == 1
+    assert raiz.obter_subcategoria("Acessórios") is acessorios
+    assert raiz.obter_subcategoria("acessórios") is None
+    assert raiz.obter_subcategoria("acessórios", ignorar_caixa=True) is acessorios
+
+    assert dividir_caminho(" Acessórios >Cabos ") == ["Acessórios", "Cabos"]
+    assert raiz.resolver_caminho("Acessórios > Cabos") is cabos
+    assert raiz.resolver_caminho(["Acessórios", "Cabos"]) is cabos
+    assert raiz.resolver_caminho("acessórios > cabos", ignorar_caixa=True) is cabos
+    assert raiz.resolver_caminho("Acessórios > Fones") is None
+    assert raiz.resolver_caminho("") is raiz
+
+    assert raiz.incrementar_peso_popularidade_subcategoria("Acessórios", 1.0) is True
+    assert acessorios.peso_popularidade == 2.0
+    assert raiz.remover_subcategoria("ACESSÓRIOS") is True
+    assert raiz.subcategorias == ()
+
+
+def test_ordenacao_por_peso_em_cache():
+    cat = Categoria("Frutas", ["Banana", "Maçã", "Uva"])
+    primeira = cat.get_produtos_ordenados_por_peso()
+    assert [p["nome"] for p in primeira] == ["Banana", "Maçã", "Uva"]
+
+    primeira[0]["peso_produto"] = 99.0  # os dicionários também são cópias
+    primeira.clear()  # a lista devolvida é uma cópia
+    assert cat.get_produtos_ordenados_por_peso()[0]["peso_produto"] == 1.0
+    assert cat.obter_produto("Banana")["peso_produto"] == 1.0
+    assert cat._ordenados_por_peso is not None
+    assert len(cat.get_produtos_ordenados_por_peso()) == 3
+
+    cat.incrementar_peso_produto("Uva", 1.0)
+    assert cat._ordenados_por_peso is None
+    assert cat.get_produtos_ordenados_por_peso()[0]["nome"] == "Uva"
+
+    cat.aumentar_peso_produto("maçã", 2.0)
+    cat.adicionar_produto("Kiwi", peso_produto=2.5)
+    assert [p["nome"] for p in cat.get_produtos_ordenados_por_peso()] == ["Maçã", "Kiwi", "Uva", "Banana"]
+
+    cat.remover_produto("Maçã")
+    assert [p["nome"] for p in cat.get_produtos_ordenados_por_peso()] == ["Kiwi", "Uva", "Banana"]
+
+
+def test_pesos_em_colunas_e_operacoes_em_lote():
+    cat = Categoria("Frutas", ["Banana", "Maçã", "Uva", "Kiwi"])
+    cat.incrementar_peso_produto("Uva", 3.0)
+    cat.incrementar_peso_produto("Kiwi", 1.0)
+
+    # remoção troca linhas internamente, mas a ordem de inserção é preservada
+    cat.remover_produto("Banana")
+    assert [p["nome"] for p in cat.produtos] == ["Maçã", "Uva", "Kiwi"]
+    assert cat.obter_produto("Kiwi")["peso_produto"] == 2.0
+
+    assert [p["nome"] for p in cat.mais_populares_produtos(2)] == ["Uva", "Kiwi"]
+
+    cat.decair_pesos_produtos(0.5)
+    assert cat.obter_produto("Uva")["peso_produto"] == 2.0
+    cat.normalizar_pesos_produtos(1.0)
+    assert [p["peso_produto"] for p in cat.get_produtos_ordenados_por_peso()] == [1.0, 0.5, 0.25]
+
+
+def test_de_colunas_rejeita_produtos_repetidos():
+    import pytest
+    from array import array
+
+    pesos = array("d", [1.0, 2.0]).tobytes()
+    cat = Categoria.de_colunas("Frutas", ["Banana", "Uva"], pesos)
+    assert cat.obter_produto("Uva")["peso_produto"] == 2.0
+    with pytest.raises(ValueError):
+        Categoria.de_colunas("Frutas", ["Banana", "Banana"], pesos)
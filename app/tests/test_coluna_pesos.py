@@ -0,0 +1,48 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+
+from app.core.coluna_pesos import ColunaPesos, NUMPY_DISPONIVEL
+
+
+MODOS = [False, pytest.param(True, marks=pytest.mark.skipif(not NUMPY_DISPONIVEL, reason="NumPy não instalado"))]
+
+
+@pytest.mark.parametrize("usar_numpy", MODOS)
+def test_anexar_remover_trocando_e_maiores(usar_numpy):
+    coluna = ColunaPesos(capacidade=2, usar_numpy=usar_numpy)
+    for peso in [3.0, 1.0, 5.0, 2.0, 4.0]:
+        coluna.anexar(peso)
+    assert len(coluna) == 5
+    assert coluna.maiores(3) == [2, 4, 0]
+
+    assert coluna.remover_trocando(0) == 4  # a última linha (4.0) ocupa a linha 0
+    assert [coluna[i] for i in range(len(coluna))] == [4.0, 1.0, 5.0, 2.0]
+    assert coluna.remover_trocando(3) is None
+    assert len(coluna) == 3
+
+
+@pytest.mark.parametrize("usar_numpy", MODOS)
+def test_decaimento_e_normalizacao(usar_numpy):
+    coluna = ColunaPesos(usar_numpy=usar_numpy)
+    for peso in [2.0, 8.0, 4.0]:
+        coluna.anexar(peso)
+
+    coluna.multiplicar(0.5)
+    assert [coluna[i] for i in range(3)] == [1.0, 4.0, 2.0]
+    coluna.normalizar(1.0)
+    assert [coluna[i] for i in range(3)] == [0.25, 1.0, 0.5]
+    assert coluna.maiores(10) == [1, 2, 0]
+
+
+@pytest.mark.parametrize("usar_numpy", MODOS)
+def test_bytes_ida_e_volta(usar_numpy):
+    coluna = ColunaPesos(usar_numpy=usar_numpy)
+    for peso in [1.5, -2.0, 3.25]:
+        coluna.anexar(peso)
+    assert ColunaPesos.de_bytes(coluna.para_bytes(), usar_numpy).valores().tolist() == [1.5, -2.0, 3.25]
+    reordenada = ColunaPesos.de_bytes(coluna.para_bytes([2, 0]), usar_numpy)
+    assert [reordenada[i] for i in range(len(reordenada))] == [3.25, 1.5]
+    vazia = ColunaPesos.de_bytes(b"", usar_numpy)
+    assert len(vazia) == 0 and vazia.anexar(7.0) == 0
@@ -0,0 +1,121 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.services.diario_alteracoes import DiarioAlteracoes, _ler_registros, reaplicar_diario
+from app.services.persistencia_catalogo import carregar_catalogo, registro_do_catalogo, salvar_catalogo
+from app.services.recomendacao_service import RecomendacaoService
+
+
+def _catalogo():
+    arvore = ArvoreAVL.from_iterable(criar_categorias_iniciais())
+    return arvore, RecomendacaoService(arvore)
+
+
+def test_registros_simultaneos_dividem_o_fsync(tmp_path):
+    caminho = str(tmp_path / "catalogo.diario")
+    with DiarioAlteracoes(caminho, intervalo=0.01) as diario:
+        threads = [threading.Thread(target=diario.registrar, args=("categoria_criada", f"Nova {i}"))
+                   for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert diario.lotes_gravados < 20
+
+    with open(caminho, "rb") as arquivo:
+        registros, _ = _ler_registros(arquivo.read())
+    assert [numero for numero, *_ in registros] == list(range(1, 21))
+    assert sorted(nome for *_, nome in registros) == sorted(f"Nova {i}" for i in range(20))
+
+
+def test_reaplicar_refaz_alteracoes_e_eventos(tmp_path):
+    caminho = str(tmp_path / "catalogo.diario")
+    arvore, servico = _catalogo()
+    with DiarioAlteracoes(caminho) as diario:
+        servico.diario = diario
+        diario.registrar("categoria_criada", "Frutas")
+        diario.registrar("produto_criado", "Frutas", "Maçã")
+        diario.registrar("subcategoria_criada", "Eletrônicos", "Cabos")
+        diario.registrar("produto_criado", "Eletrônicos > cabos", "Cabo USB")
+        diario.registrar("produto_removido", "Bebidas", "Suco de Uva")
+        servico.registrar_eventos([("Bebidas", "Refrigerante", "clique")])   # gravado pelo próprio serviço
+
+    # Queda no meio da gravação: o registro final incompleto é descartado
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(b"\x40\x00\x00\x00lixo")
+
+    recuperada, recomendador = _catalogo()
+    assert reaplicar_diario(caminho, recuperada, recomendador) == 6
+    assert recuperada.buscar_publico("Frutas").obter_produto("Maçã") is not None
+    assert recuperada.resolver_caminho("Eletrônicos > Cabos").obter_produto("Cabo USB") is not None
+    bebidas = recuperada.buscar_publico("Bebidas")
+    assert bebidas.obter_produto("Suco de Uva") is None
+    assert bebidas.obter_produto("Refrigerante")["peso_produto"] == pytest.approx(1.005)
+    sugestoes = recomendador.sugerir_por_prefixo("cabo", registrar_busca=False)
+    assert {s["nome"] for s in sugestoes} == {"Cabo HDMI", "Cabo USB"}
+    with open(caminho, "rb") as arquivo:
+        assert _ler_registros(arquivo.read())[1] == os.path.getsize(caminho)
+
+
+def test_checkpoint_salva_catalogo_e_esvazia_diario(tmp_path):
+    caminho_catalogo = str(tmp_path / "catalogo.srhp")
+    caminho = str(tmp_path / "catalogo.diario")
+    arvore, _ = _catalogo()
+    with DiarioAlteracoes(caminho) as diario:
+        with diario.alteracao():
+            arvore.buscar_publico("Bebidas").adicionar_produto("Chá")
+            diario.registrar("produto_criado", "Bebidas", "Chá")
+        assert diario.checkpoint(lambda registro: salvar_catalogo(arvore, caminho_catalogo, registro)) == 3
+        assert os.path.getsize(caminho) == 0
+        diario.registrar("categoria_criada", "Depois")
+
+    recuperada = carregar_catalogo(caminho_catalogo)
+    assert recuperada.buscar_publico("Bebidas").obter_produto("Chá") is not None
+    assert reaplicar_diario(caminho, recuperada, RecomendacaoService(recuperada)) == 1
+    assert recuperada.buscar_publico("Depois") is not None
+
+
+def test_queda_entre_salvar_e_esvaziar_nao_reaplica_duas_vezes(tmp_path):
+    caminho_catalogo = str(tmp_path / "catalogo.srhp")
+    caminho = str(tmp_path / "catalogo.diario")
+    arvore, servico = _catalogo()
+    with DiarioAlteracoes(caminho) as diario:
+        servico.diario = diario
+        with diario.alteracao():
+            arvore.buscar_publico("Bebidas").adicionar_produto("Chá", 2.0)
+            diario.registrar("produto_criado", "Bebidas", "Chá", 2.0)
+        with diario.alteracao():
+            arvore.buscar_publico("Bebidas").aumentar_peso(0.5)
+            diario.registrar("peso_categoria", "Bebidas", 0.5)
+        servico.registrar_eventos([("Bebidas", "Refrigerante", "clique")])
+
+        def salvar_e_cair(registro):
+            salvar_catalogo(arvore, caminho_catalogo, registro)
+            raise RuntimeError("queda antes de esvaziar o diário")
+
+        with pytest.raises(RuntimeError):
+            diario.checkpoint(salvar_e_cair)
+    assert os.path.getsize(caminho) > 0
+    bebidas = arvore.buscar_publico("Bebidas")
+
+    # Reinício: o catálogo já contém os 3 registros, nenhum é aplicado de novo
+    ultimo_salvo = registro_do_catalogo(caminho_catalogo)
+    assert ultimo_salvo == 3
+    recuperada = carregar_catalogo(caminho_catalogo)
+    assert reaplicar_diario(caminho, recuperada, RecomendacaoService(recuperada), ultimo_salvo) == 0
+    recuperadas = recuperada.buscar_publico("Bebidas")
+    assert recuperadas.peso_popularidade == pytest.approx(bebidas.peso_popularidade)
+    assert recuperadas.produtos == bebidas.produtos
+
+    # A numeração continua depois dos registros já salvos
+    with DiarioAlteracoes(caminho, ultimo_registro=ultimo_salvo) as diario:
+        diario.registrar("categoria_criada", "Depois")
+    recuperada = carregar_catalogo(caminho_catalogo)
+    assert reaplicar_diario(caminho, recuperada, RecomendacaoService(recuperada), ultimo_salvo) == 1
+    assert recuperada.buscar_publico("Depois") is not None
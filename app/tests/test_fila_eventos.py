@@ -0,0 +1,89 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.fila_eventos import FilaEventosPopularidade
+from app.services.recomendacao_service import RecomendacaoService
+
+
+def test_lote_cheio_dispara_aplicacao_em_segundo_plano():
+    lotes = []
+    aplicado = threading.Event()
+
+    def aplicar(lote):
+        lotes.append(list(lote))
+        aplicado.set()
+        return len(lote)
+
+    fila = FilaEventosPopularidade(aplicar, intervalo=60, tamanho_lote=3).iniciar()
+    try:
+        fila.publicar(("A", "x", "busca"))
+        fila.publicar_varios([("A", "y", "busca"), ("A", "z", "busca")])
+        assert aplicado.wait(5)
+        assert lotes == [[("A", "x", "busca"), ("A", "y", "busca"), ("A", "z", "busca")]]
+        assert threading.current_thread().name != fila.nome
+    finally:
+        fila.parar()
+
+
+def test_flush_e_parar_aplicam_pendentes():
+    lotes = []
+    fila = FilaEventosPopularidade(lambda lote: lotes.append(lote) or len(lote), intervalo=60, tamanho_lote=100)
+    fila.iniciar()
+    fila.publicar(("A", "x", "clique"))
+    assert fila.flush() == 1
+    assert len(fila) == 0
+
+    fila.publicar(("A", "y", "clique"))
+    fila.parar()
+    assert [len(lote) for lote in lotes] == [1, 1]
+    assert fila.total_aplicados == 2
+    assert not fila.ativa
+
+    # Depois de parar, a fila recusa eventos em vez de guardá-los sem aplicar
+    assert fila.publicar(("A", "z", "clique")) is False
+    assert len(fila) == 0
+
+
+def test_eventos_publicados_durante_a_parada_nao_se_perdem():
+    arv = ArvoreAVL()
+    cat = Categoria("Frutas", ["Banana"], peso_popularidade=1.0)
+    arv.inserir_publico(cat)
+    svc = RecomendacaoService(arv)
+    svc.iniciar_fila_eventos(intervalo=60, tamanho_lote=1000)
+
+    def publicar():
+        for _ in range(200):
+            svc.publicar_eventos([("Frutas", "Banana", "busca")])
+
+    publicadores = [threading.Thread(target=publicar) for _ in range(4)]
+    for thread in publicadores:
+        thread.start()
+    svc.parar_fila_eventos()
+    for thread in publicadores:
+        thread.join()
+
+    # Todos os 800 eventos aplicados: antes da parada pela fila, depois dela na hora
+    assert abs(cat.peso_popularidade - (1.0 + 800 * 0.002)) < 1e-6
+
+
+def test_busca_com_fila_retorna_antes_de_aplicar_pesos():
+    arv = ArvoreAVL()
+    cat = Categoria("Frutas", ["Banana"], peso_popularidade=1.0)
+    arv.inserir_publico(cat)
+    svc = RecomendacaoService(arv)
+    svc.iniciar_fila_eventos(intervalo=60, tamanho_lote=1000)
+    try:
+        for _ in range(10):
+            assert svc.sugerir_por_prefixo("Ban")[0]["nome"] == "Banana"
+        assert cat.peso_popularidade == 1.0  # ainda na fila
+
+        svc.aplicar_eventos_pendentes()
+        assert abs(cat.peso_popularidade - (1.0 + 10 * 0.002)) < 1e-9
+        assert abs(cat.obter_produto("Banana")["peso_produto"] - 1.01) < 1e-9
+    finally:
+        svc.parar_fila_eventos()
+    assert svc.fila_eventos is None
@@ -0,0 +1,83 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import io
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.services.importador import formato_do_arquivo, importar_arquivo, ler_csv, ler_jsonl
+from app.services.recomendacao_service import RecomendacaoService
+from app.tests.test_avl import _verificar_avl
+
+CSV = """caminho,peso
+Frutas > Cítricas > Limão,2.5
+Frutas > Maçã
+Eletrônicos > acessórios > Cabo USB,0.5
+Eletrônicos > Tablet,abc
+Sem produto
+Hortaliças > Alface,1
+eletrônicos > Cabos > HDMI 2.1
+frutas > Pera
+"""
+
+
+def test_importar_csv_em_blocos_com_uma_reindexacao(tmp_path, monkeypatch):
+    caminho = tmp_path / "produtos.csv"
+    caminho.write_text(CSV, encoding="utf-8")
+    arvore = ArvoreAVL.from_iterable(criar_categorias_iniciais())
+    servico = RecomendacaoService(arvore)
+
+    chamadas = []
+    construir = servico._construir_indices
+
+    def contar():
+        chamadas.append(1)
+        construir()
+    monkeypatch.setattr(servico, "_construir_indices", contar)
+
+    resumo = importar_arquivo(str(caminho), formato_do_arquivo(str(caminho)), arvore, servico, tamanho_bloco=2)
+    assert resumo == {"linhas": 6, "duplicadas": 0, "rejeitadas": 2, "categorias_novas": 2}
+    assert chamadas == [1]
+
+    _verificar_avl(arvore.raiz)
+    assert arvore.resolver_caminho("Frutas > Cítricas").obter_produto("Limão")["peso_produto"] == 2.5
+    assert arvore.buscar_publico("Frutas").obter_produto("Maçã")["peso_produto"] == 1.0
+    assert arvore.resolver_caminho("Eletrônicos > Acessórios").obter_produto("Cabo USB") is not None
+    # A raiz também é encontrada ignorando maiúsculas/minúsculas (existente ou nova)
+    assert arvore.resolver_caminho("Eletrônicos > Cabos").obter_produto("HDMI 2.1") is not None
+    assert arvore.buscar_publico("Frutas").obter_produto("Pera") is not None
+    assert arvore.buscar_publico("eletrônicos") is None and arvore.buscar_publico("frutas") is None
+    assert servico.sugerir_por_prefixo("li", registrar_busca=False)[0]["categoria"] == "Frutas > Cítricas"
+
+    # Depois da importação, as alterações voltam a ser indexadas uma a uma
+    arvore.buscar_publico("Hortaliças").adicionar_produto("Rúcula")
+    assert servico.sugerir_por_prefixo("rúc", registrar_busca=False)[0]["nome"] == "Rúcula"
+
+
+def test_ler_csv_sem_cabecalho_e_produtos_repetidos():
+    # Primeira linha com peso inválido não é cabeçalho: é rejeitada, não descartada
+    linhas = list(ler_csv(io.StringIO("Frutas > Uva,abc\nFrutas > Uva,2\n")))
+    assert linhas == [None, (["Frutas"], "Uva", 2.0)]
+    assert list(ler_csv(io.StringIO("Sem produto\n"))) == [None]
+    assert list(ler_csv(io.StringIO("produto,peso\nFrutas > Uva\n"))) == [(["Frutas"], "Uva", 1.0)]
+
+    arvore = ArvoreAVL.from_iterable(criar_categorias_iniciais())
+    texto = io.StringIO("Bebidas > Refrigerante,9\nBebidas > Chá\nBebidas > Chá,3\n")
+    resumo = importar_arquivo(texto, "csv", arvore)
+    assert resumo == {"linhas": 1, "duplicadas": 2, "rejeitadas": 0, "categorias_novas": 0}
+    bebidas = arvore.buscar_publico("Bebidas")
+    assert bebidas.obter_produto("Refrigerante")["peso_produto"] == 1.0
+    assert bebidas.obter_produto("Chá")["peso_produto"] == 1.0
+
+
+def test_ler_jsonl_aceita_caminho_ou_categoria_e_produto():
+    texto = io.StringIO('{"caminho": "Frutas > Uva", "peso": 3}\n'
+                        '\n'
+                        '{"categoria": "Frutas > Secas", "produto": "Passas"}\n'
+                        'não é json\n')
+    assert list(ler_jsonl(texto)) == [(["Frutas"], "Uva", 3.0), (["Frutas", "Secas"], "Passas", 1.0), None]
+
+    with pytest.raises(ValueError):
+        formato_do_arquivo("produtos.xlsx")
@@ -0,0 +1,63 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.indice_popularidade import IndicePopularidade
+
+
+def _verificar(no):
+    if no is None:
+        return 0
+    he = _verificar(no.esquerda)
+    hd = _verificar(no.direita)
+    assert abs(he - hd) <= 1
+    assert no.tamanho == 1 + (no.esquerda.tamanho if no.esquerda else 0) + (no.direita.tamanho if no.direita else 0)
+    return 1 + max(he, hd)
+
+
+def test_ranking_ordenado_por_peso_e_nome():
+    indice = IndicePopularidade()
+    indice.inserir("Celular", 3.0)
+    indice.inserir("Notebook", 5.0)
+    indice.inserir("Cabo", 3.0)
+    indice.inserir("Mouse", 1.0)
+
+    assert indice.maiores(3) == [("Notebook", 5.0), ("Cabo", 3.0), ("Celular", 3.0)]
+    assert indice.posicao("Mouse") == 3
+    assert indice.selecionar(1) == ("Cabo", 3.0)
+    assert list(indice.iterar(2)) == [("Celular", 3.0), ("Mouse", 1.0)]
+    assert indice.posicao("Inexistente") == -1
+
+
+def test_atualizar_reposiciona_e_remover():
+    import random
+    rnd = random.Random(3)
+    indice = IndicePopularidade()
+    pesos = {f"P{i:03d}": float(rnd.randint(0, 20)) for i in range(200)}
+    for nome, peso in pesos.items():
+        indice.inserir(nome, peso, item=nome.lower())
+
+    for nome in rnd.sample(sorted(pesos), 80):
+        pesos[nome] += rnd.random() * 5
+        assert indice.atualizar(nome, pesos[nome]) is True
+    for nome in rnd.sample(sorted(pesos), 50):
+        assert indice.remover(nome) is True
+        del pesos[nome]
+    _verificar(indice.raiz)
+
+    esperado = sorted(pesos.items(), key=lambda x: (-x[1], x[0]))
+    assert list(indice.iterar()) == esperado
+    assert len(indice) == len(pesos)
+    assert indice.obter(esperado[0][0]) == esperado[0][0].lower()
+    assert indice.atualizar("Inexistente", 1.0) is False
+    assert indice.remover("Inexistente") is False
+
+
+def test_carregar_ordenado_monta_arvore_balanceada():
+    entradas = [(f"P{i:03d}", float(100 - i // 3), None) for i in range(100)]
+    indice = IndicePopularidade()
+    indice.carregar_ordenado(entradas)
+    _verificar(indice.raiz)
+    assert len(indice) == 100
+    assert list(indice.iterar()) == [(nome, peso) for nome, peso, _ in entradas]
+    assert indice.posicao("P050") == 50
+    assert indice.atualizar("P099", 1000.0) and indice.selecionar(0) == ("P099", 1000.0)
@@ -0,0 +1,62 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.core.dados_iniciais import criar_categorias_iniciais
+from app.services.persistencia_catalogo import (
+    carregar_catalogo, carregar_ou_inicializar, salvar_catalogo
+)
+from app.tests.test_avl import _verificar_avl
+
+
+def _resumo(categoria):
+    return (categoria.nome, categoria.peso_popularidade, categoria.produtos,
+            [_resumo(sub) for sub in categoria.subcategorias])
+
+
+def test_salvar_e_carregar_preserva_hierarquia_e_pesos(tmp_path):
+    arvore = ArvoreAVL.from_iterable(criar_categorias_iniciais())
+    eletronicos = arvore.buscar_publico("Eletrônicos")
+    eletronicos.aumentar_peso_produto("Celular", 2.5)
+    eletronicos.obter_subcategoria("Acessórios").adicionar_produto("Teclado Ç", 0.75)
+    eletronicos.remover_produto("Notebook")   # remoção troca linhas: a ordem de inserção deve voltar igual
+    arvore.inserir_publico(Categoria("Vazia", peso_popularidade=0.0))
+
+    caminho = str(tmp_path / "catalogo.srhp")
+    assert salvar_catalogo(arvore, caminho) == 4
+    assert not os.path.exists(caminho + ".tmp")
+
+    carregada = carregar_catalogo(caminho)
+    _verificar_avl(carregada.raiz)
+    assert [_resumo(c) for c in carregada] == [_resumo(c) for c in arvore]
+    assert carregada.resolver_caminho("Eletrônicos > acessórios", ignorar_caixa=True) is not None
+    assert carregada.buscar_publico("Eletrônicos").obter_produto("Celular")["peso_produto"] == 3.5
+
+
+def test_carregar_arquivo_invalido(tmp_path):
+    caminho = tmp_path / "lixo.srhp"
+    caminho.write_bytes(b"nao e um catalogo")
+    with pytest.raises(ValueError):
+        carregar_catalogo(str(caminho))
+
+    # Arquivo inválido não derruba a inicialização: usa os dados iniciais
+    arvore = ArvoreAVL()
+    assert carregar_ou_inicializar(arvore, str(caminho)) is False
+    assert arvore.get_tamanho() == 3
+
+
+def test_catalogo_truncado_nao_altera_a_arvore(tmp_path):
+    caminho = str(tmp_path / "catalogo.srhp")
+    salvar_catalogo(ArvoreAVL.from_iterable(criar_categorias_iniciais()), caminho)
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(dados[:-5])
+
+    arvore = ArvoreAVL.from_iterable([Categoria("Existente")])
+    with pytest.raises(ValueError):
+        carregar_catalogo(caminho, arvore)
+    assert [c.nome for c in arvore] == ["Existente"]
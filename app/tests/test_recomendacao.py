@@ -151,3 +151,200 @@ def test_selection_increments_produto_subcategoria_categoria_simulado():
     assert abs(prod_after["peso_produto"] - (p_before + 0.005)) < 1e-6
     assert abs(sub.peso_popularidade - (peso_sub_before + 0.003)) < 1e-6
     assert abs(cat.peso_popularidade - (peso_cat_before + 0.008)) < 1e-6
+
+
+def test_indices_atualizados_incrementalmente_sem_reindexar():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+    svc.reindexar()
+
+    # a partir daqui qualquer reconstrução completa é um erro
+    def falhar():
+        raise AssertionError("reindexação completa não deveria ocorrer")
+    svc._construir_indices = falhar
+
+    svc.sugerir_por_prefixo("Cel", limite=5)
+
+    cat.adicionar_produto("Tablet")
+    assert [p["nome"] for p in svc.sugerir_por_prefixo("Tab")] == ["Tablet"]
+
+    sub.adicionar_produto("Carregador")
+    assert svc.sugerir_por_prefixo("Carr")[0]["categoria"] == "Eletrônicos > Acessórios"
+
+    cat.remover_produto("Notebook")
+    assert svc.sugerir_por_prefixo("Note") == []
+
+    nova = Categoria("Bebidas", ["Suco de Uva"])
+    arv.inserir_publico(nova)
+    assert svc.sugerir_por_prefixo("Suco")[0]["categoria"] == "Bebidas"
+
+    arv.remover_publico("Bebidas")
+    assert svc.sugerir_por_prefixo("Suco") == []
+
+    cat.remover_subcategoria("Acessórios")
+    assert svc.sugerir_por_prefixo("Cabo") == []
+    # subcategoria removida deixa de ser observada
+    sub.adicionar_produto("Cabo HDMI")
+    assert svc.sugerir_por_prefixo("Cabo") == []
+
+
+def test_prefixo_longo_encontra_produto():
+    arv = ArvoreAVL()
+    arv.inserir_publico(Categoria("Doces", ["Banana com Chocolate", "Banana com Canela"]))
+    svc = RecomendacaoService(arv)
+    svc.reindexar()
+
+    resultados = svc.sugerir_por_prefixo("banana com choc")
+    assert [r["nome"] for r in resultados] == ["Banana com Chocolate"]
+
+
+def test_ranking_acompanha_mudancas_de_peso():
+    arv = ArvoreAVL()
+    frutas = Categoria("Frutas", ["Banana Prata", "Banana Nanica"], peso_popularidade=1.0)
+    doces = Categoria("Doces", ["Bananada"], peso_popularidade=2.0)
+    arv.inserir_publico(frutas)
+    arv.inserir_publico(doces)
+    svc = RecomendacaoService(arv)
+    svc.reindexar()
+
+    assert svc.indice_produtos.melhores("BANANA")[0]["nome"] == "Bananada"
+
+    frutas.aumentar_peso(3.0)
+    frutas.aumentar_peso_produto("Banana Nanica", 0.5)
+    nomes = [p["nome"] for p in svc.indice_produtos.melhores("BANANA")]
+    assert nomes == ["Banana Nanica", "Banana Prata", "Bananada"]
+
+
+def test_carga_em_lote_indexa_categorias_novas():
+    arv = ArvoreAVL()
+    svc = RecomendacaoService(arv)
+    svc.reindexar()
+
+    arv.carregar_em_lote([Categoria("Frutas", ["Banana"]), Categoria("Bebidas", ["Suco"])])
+    assert svc.sugerir_por_prefixo("Ban")[0]["categoria"] == "Frutas"
+    assert svc.sugerir_por_prefixo("Suc")[0]["categoria"] == "Bebidas"
+
+
+def test_reconstrucao_carrega_ranking_de_categorias_de_uma_vez(monkeypatch):
+    def categorias():
+        for i in range(20):
+            cat = Categoria(f"Cat {i:02d}", [f"Produto {i}"], peso_popularidade=1.0 + i % 3)
+            cat.adicionar_subcategoria(Categoria(f"Sub {i:02d}", peso_popularidade=1.0 + i % 5))
+            yield cat
+
+    # Ranking montado categoria a categoria, pelos ouvintes
+    incremental = RecomendacaoService(ArvoreAVL())
+    incremental.reindexar()
+    for cat in categorias():
+        incremental.arvore.inserir_publico(cat)
+
+    completo = RecomendacaoService(ArvoreAVL.from_iterable(categorias()))
+    inseridas = []
+    monkeypatch.setattr(completo.ranking_categorias, "inserir", lambda *args: inseridas.append(args))
+    completo.reindexar()
+    monkeypatch.undo()
+
+    assert inseridas == []   # carregar_ordenado, sem inserções uma a uma
+    assert completo.categorias_mais_populares(40) == incremental.categorias_mais_populares(40)
+
+    # Depois da carga, o ranking segue acompanhando os pesos
+    completo.arvore.buscar_publico("Cat 07").incrementar_peso_popularidade_categoria(50.0)
+    assert completo.categorias_mais_populares(1)[0]["caminho"] == "Cat 07"
+
+
+def test_iterar_produtos_percorre_hierarquia():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+
+    caminhos = {(p["nome"], p["categoria"]) for p in svc.iterar_produtos()}
+    assert ("Cabo USB", "Eletrônicos > Acessórios") in caminhos
+    assert svc.contar_produtos() == 4
+    assert len(svc.listar_todos_produtos()) == 4
+
+
+def test_ranking_de_popularidade_acompanha_os_pesos():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+
+    sub.incrementar_peso_produto("Cabo USB", 5.0)
+    assert svc.produtos_mais_populares(1)[0]["nome"] == "Cabo USB"
+    assert svc.listar_todos_produtos()[0]["categoria"] == "Eletrônicos > Acessórios"
+
+    cat.adicionar_produto("Tablet", peso_produto=20.0)
+    assert svc.produtos_mais_populares(1)[0]["nome"] == "Tablet"
+    cat.remover_produto("Tablet")
+    assert svc.total_produtos_indexados() == 4
+
+    sub.incrementar_peso_popularidade_categoria(50.0)
+    assert svc.categorias_mais_populares(1)[0]["caminho"] == "Eletrônicos > Acessórios"
+
+
+def test_decaimento_em_lote_atualiza_indices():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+    sub.incrementar_peso_produto("Cabo USB", 3.0)
+
+    svc.decair_popularidade(0.5)
+    assert sub.obter_produto("Cabo USB")["peso_produto"] == 2.0
+    assert cat.obter_produto("Celular")["peso_produto"] == 0.5
+    assert svc.produtos_mais_populares(1)[0] == {
+        "nome": "Cabo USB", "categoria": "Eletrônicos > Acessórios", "peso_popularidade": 2.0
+    }
+
+    svc.normalizar_popularidade(1.0)
+    assert svc.listar_todos_produtos()[0]["peso_popularidade"] == 1.0
+
+
+def test_registrar_eventos_em_lote_equivale_a_eventos_individuais():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+
+    eventos = [("Eletrônicos > Acessórios", "Cabo USB", "clique")] * 100
+    eventos += [("Eletrônicos", "Celular", "busca")] * 10
+    eventos += [("Inexistente", "X", "clique"), ("Eletrônicos", "Celular", "desconhecido")]
+
+    chamadas = []
+    svc.indice_produtos._recalcular = lambda no, original=svc.indice_produtos._recalcular: (chamadas.append(no), original(no))
+    assert svc.registrar_eventos(eventos) == 110
+
+    assert abs(cat.peso_popularidade - (1.0 + 100 * 0.008 + 10 * 0.002)) < 1e-9
+    assert abs(sub.peso_popularidade - (1.0 + 100 * 0.003)) < 1e-9
+    assert abs(_get_produto(sub, "Cabo USB")["peso_produto"] - 1.5) < 1e-9
+    assert abs(_get_produto(cat, "Celular")["peso_produto"] - 1.01) < 1e-9
+    # o top-k de cada nó da trie é recalculado no máximo uma vez para o lote inteiro
+    assert len(chamadas) == len({id(no) for no in chamadas})
+    assert svc.produtos_mais_populares(1)[0]["nome"] == "Cabo USB"
+
+
+def test_clique_respeita_teto_de_peso():
+    arv, cat, sub = preparar_estrutura()
+    svc = RecomendacaoService(arv)
+    svc.registrar_eventos([("Eletrônicos", "Mouse", "clique")] * 5000)
+    assert cat.peso_popularidade == 10.0
+    assert _get_produto(cat, "Mouse")["peso_produto"] == 10.0
+
+
+def test_reindexacao_paralela_equivale_a_serial():
+    def catalogo():
+        arvore = ArvoreAVL()
+        for i in range(30):
+            produtos = [{"nome": f"Produto {i % 7}-{j}", "peso_produto": 1.0 + (i * j) % 5} for j in range(3)]
+            cat = Categoria(f"Cat {i:02d}", produtos, peso_popularidade=1.0 + i % 4)
+            cat.adicionar_subcategoria(Categoria(f"Sub {i:02d}", [f"Banana {i}"], peso_popularidade=2.0))
+            arvore.inserir_publico(cat)
+        return arvore
+
+    serial = RecomendacaoService(catalogo())
+    paralelo = RecomendacaoService(catalogo())
+    paralelo.reindexar(paralelo=True, processos=2)
+
+    assert paralelo.indice_categorias == serial.indice_categorias
+    assert paralelo.listar_todos_produtos() == serial.listar_todos_produtos()
+    assert paralelo.categorias_mais_populares(10) == serial.categorias_mais_populares(10)
+    assert list(paralelo.indice_produtos.chaves()) == list(serial.indice_produtos.chaves())
+    for prefixo in ["P", "PRODUTO 3", "BAN", "BANANA 1"]:
+        assert (paralelo.sugestoes_pontuadas(prefixo, 10) == serial.sugestoes_pontuadas(prefixo, 10))
+
+    # Ouvintes continuam ativos depois da reindexação paralela
+    paralelo.arvore.buscar_publico("Cat 05").adicionar_produto("Novidade")
+    assert paralelo.sugerir_por_prefixo("NOVID", registrar_busca=False)[0]["categoria"] == "Cat 05"
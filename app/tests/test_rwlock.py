@@ -0,0 +1,101 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import threading
+
+import pytest
+
+from app.core.arvore_avl import ArvoreAVL
+from app.core.categoria import Categoria
+from app.services.recomendacao_service import RecomendacaoService
+from app.utils.rwlock import TravaLeituraEscrita
+
+
+def test_leitores_rodam_em_paralelo():
+    trava = TravaLeituraEscrita()
+    dentro = threading.Barrier(3, timeout=5)
+
+    def ler():
+        with trava.leitura():
+            dentro.wait()   # só passa se os três leitores estiverem dentro ao mesmo tempo
+
+    threads = [threading.Thread(target=ler) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert not dentro.broken
+
+
+def test_escrita_exclui_leitores():
+    trava = TravaLeituraEscrita()
+    leu = threading.Event()
+
+    def ler():
+        with trava.leitura():
+            leu.set()
+
+    with trava.escrita():
+        t = threading.Thread(target=ler)
+        t.start()
+        assert not leu.wait(0.1)
+    assert leu.wait(5)
+    t.join(5)
+
+
+def test_reentrancia_e_promocao():
+    trava = TravaLeituraEscrita()
+    with trava.escrita():
+        with trava.leitura(), trava.escrita():
+            pass
+    with trava.leitura():
+        with trava.leitura():
+            pass
+        with pytest.raises(RuntimeError):
+            trava.adquirir_escrita()
+    # Tudo liberado: outra thread consegue escrever
+    escreveu = threading.Event()
+
+    def escrever():
+        with trava.escrita():
+            escreveu.set()
+
+    threading.Thread(target=escrever).start()
+    assert escreveu.wait(5)
+
+
+def test_buscas_concorrentes_com_insercoes():
+    arvore = ArvoreAVL()
+    servico = RecomendacaoService(arvore)
+    erros = []
+    fim = threading.Event()
+
+    def escrever():
+        try:
+            for i in range(300):
+                arvore.inserir_publico(Categoria(f"Cat{i:03d}", produtos=[f"Produto {i}"]))
+        except Exception as e:
+            erros.append(e)
+        finally:
+            fim.set()
+
+    def ler():
+        try:
+            while not fim.is_set():
+                nomes = [c.nome for c in arvore]
+                assert nomes == sorted(nomes)
+                for i in range(0, 300, 37):
+                    arvore.buscar_publico(f"Cat{i:03d}")
+                servico.sugerir_por_prefixo("PROD", registrar_busca=False)
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=escrever)] + [threading.Thread(target=ler) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    assert not erros
+    assert arvore.get_tamanho() == 300
+    assert servico.total_produtos_indexados() == 300
@@ -0,0 +1,80 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.trie_prefixos import TriePrefixos
+
+
+def test_inserir_compartilha_prefixos_e_busca_sem_limite_de_tamanho():
+    trie = TriePrefixos()
+    trie.inserir("BANANA CHIPS", "chips")
+    trie.inserir("BANANA COM CHOCOLATE", "chocolate")
+    trie.inserir("BANANA PASSA", "passa")
+
+    assert len(trie) == 3
+    # raiz + "BANANA " + "C" + "HIPS" + "OM CHOCOLATE" + "PASSA"
+    assert trie.contar_nos() == 6
+    assert list(trie.buscar_prefixo("BANANA C")) == ["chips", "chocolate"]
+    assert list(trie.buscar_prefixo("BANANA COM CHOCO")) == ["chocolate"]
+    assert list(trie.buscar_prefixo("BANANAS")) == []
+    assert list(trie.chaves()) == ["BANANA CHIPS", "BANANA COM CHOCOLATE", "BANANA PASSA"]
+
+
+def test_remover_compacta_nos():
+    trie = TriePrefixos()
+    trie.inserir("CABO", "cabo")
+    trie.inserir("CABO HDMI", "hdmi")
+    trie.inserir("CABO HDMI", "hdmi")  # duplicado é ignorado
+    assert len(trie) == 2
+
+    assert trie.remover("CABO", "cabo") is True
+    assert trie.remover("CABO", "cabo") is False
+    assert trie.buscar("CABO") == []
+    assert list(trie.buscar_prefixo("CA")) == ["hdmi"]
+    # nó intermediário sem itens foi fundido com o filho
+    assert trie.contar_nos() == 2
+
+    trie.remover("CABO HDMI", "hdmi")
+    assert len(trie) == 0
+    assert trie.contar_nos() == 1
+
+
+def test_top_k_por_no_acompanha_pesos():
+    trie = TriePrefixos(k=2)
+    trie.inserir("BANANA CHIPS", "chips", 1.0)
+    trie.inserir("BANANA PASSA", "passa", 3.0)
+    trie.inserir("BANANADA", "bananada", 2.0)
+
+    assert trie.melhores("BAN") == ["passa", "bananada"]
+    assert trie.melhores("BANANA ") == ["passa", "chips"]
+
+    trie.atualizar_peso("BANANA CHIPS", "chips", 5.0)
+    assert trie.melhores("BAN") == ["chips", "passa"]
+
+    # redução de peso também reposiciona
+    with trie.lote():
+        trie.atualizar_peso("BANANA CHIPS", "chips", 0.5)
+        trie.atualizar_peso("BANANA PASSA", "passa", 0.1)
+    assert trie.melhores("BAN") == ["bananada", "chips"]
+
+    # pedido maior que k percorre a subárvore
+    assert trie.melhores("BAN", 5) == ["bananada", "chips", "passa"]
+
+    trie.remover("BANANADA", "bananada")
+    assert trie.melhores("BAN") == ["chips", "passa"]
+
+
+def test_mesclar_tries_parciais_equivale_a_trie_unica():
+    chaves = [("BANANA CHIPS", "chips", 1.0), ("BANANA PASSA", "passa", 3.0), ("BANANADA", "bananada", 2.0),
+              ("BANHO", "banho", 4.0), ("CELULAR", "celular", 0.5), ("BANANA", "banana", 6.0)]
+    unica = TriePrefixos(k=3)
+    a, b = TriePrefixos(k=3), TriePrefixos(k=3)
+    for i, (chave, item, peso) in enumerate(chaves):
+        unica.inserir(chave, item, peso)
+        (a if i % 2 else b).inserir(chave, item, peso)
+
+    a.mesclar(b)
+    assert len(a) == len(unica) == 6
+    assert list(a.chaves()) == list(unica.chaves())
+    for prefixo in ["B", "BAN", "BANANA", "BANANA ", "BANH", "C", "X"]:
+        assert a.melhores(prefixo) == unica.melhores(prefixo)
+    assert a.contar_nos() == unica.contar_nos()
@@ -0,0 +1,14 @@
+import gc
+from contextlib import contextmanager
+
+
+@contextmanager
+def coleta_de_lixo_pausada():
+    """Pausa o coletor cíclico durante cargas em massa (muitos objetos criados que vivem juntos)."""
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
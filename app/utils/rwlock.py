@@ -0,0 +1,119 @@
+import threading
+from contextlib import contextmanager
+
+
+class TravaLeituraEscrita:
+    """
+    Trava de leitura/escrita (vários leitores ou um escritor).
+
+    - Leituras de threads diferentes rodam em paralelo.
+    - Uma escrita espera as leituras em andamento e bloqueia novas leituras
+      enquanto aguarda (o escritor não fica esperando para sempre).
+    - É reentrante: a mesma thread pode repetir leituras, repetir escritas e
+      ler enquanto escreve. Promover leitura a escrita não é permitido
+      (dois leitores tentando isso travariam um ao outro).
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        self._leituras_por_thread = {}   # id da thread -> leituras abertas
+        self._leitores = 0               # threads com leitura aberta
+        self._escritor = None            # id da thread que está escrevendo
+        self._escritas = 0               # aninhamento da escrita (inclui leituras do escritor)
+        self._escritores_esperando = 0
+
+    # =============================================================
+    # 📖 LEITURA
+    # =============================================================
+    def adquirir_leitura(self) -> None:
+        eu = threading.get_ident()
+        with self._condicao:
+            if self._escritor == eu:
+                self._escritas += 1
+                return
+            abertas = self._leituras_por_thread.get(eu, 0)
+            if abertas == 0:
+                while self._escritor is not None or self._escritores_esperando:
+                    self._condicao.wait()
+                self._leitores += 1
+            self._leituras_por_thread[eu] = abertas + 1
+
+    def liberar_leitura(self) -> None:
+        eu = threading.get_ident()
+        with self._condicao:
+            if self._escritor == eu:
+                self._liberar_escrita_travada()
+                return
+            abertas = self._leituras_por_thread.get(eu, 0)
+            if abertas == 0:
+                raise RuntimeError("liberar_leitura sem leitura aberta nesta thread")
+            if abertas == 1:
+                del self._leituras_por_thread[eu]
+                self._leitores -= 1
+                if self._leitores == 0:
+                    self._condicao.notify_all()
+            else:
+                self._leituras_por_thread[eu] = abertas - 1
+
+    # =============================================================
+    # ✏️ ESCRITA
+    # =============================================================
+    def adquirir_escrita(self) -> None:
+        eu = threading.get_ident()
+        with self._condicao:
+            if self._escritor == eu:
+                self._escritas += 1
+                return
+            if self._leituras_por_thread.get(eu):
+                raise RuntimeError("Não é possível promover leitura a escrita na mesma thread")
+            self._escritores_esperando += 1
+            try:
+                while self._escritor is not None or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_esperando -= 1
+            self._escritor = eu
+            self._escritas = 1
+
+    def liberar_escrita(self) -> None:
+        with self._condicao:
+            if self._escritor != threading.get_ident():
+                raise RuntimeError("liberar_escrita por thread que não está escrevendo")
+            self._liberar_escrita_travada()
+
+    def _liberar_escrita_travada(self) -> None:
+        self._escritas -= 1
+        if self._escritas == 0:
+            self._escritor = None
+            self._condicao.notify_all()
+
+    # =============================================================
+    # 🔒 GERENCIADORES DE CONTEXTO
+    # =============================================================
+    @contextmanager
+    def leitura(self):
+        self.adquirir_leitura()
+        try:
+            yield self
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self):
+        self.adquirir_escrita()
+        try:
+            yield self
+        finally:
+            self.liberar_escrita()
+
+    def iterar(self, iteravel):
+        """Percorre o iterável segurando a leitura só enquanto avança cada passo
+        (um consumidor lento não bloqueia escritores entre dois itens)."""
+        iterador = iter(iteravel)
+        while True:
+            with self.leitura():
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+            yield item